@@ -10,15 +10,37 @@ Aplicación multi-plataforma (Android/Windows) con:
 import os
 # os.environ['KIVY_NO_CONSOLELOG'] = '1'  # Desactivar logs de consola en producción
 
-from kivy.app import App
-from kivy.core.window import Window
-from kivymd.app import MDApp
-from kivymd.uix.screen import MDScreen
-from kivymd.uix.screenmanager import MDScreenManager
-from kivy.properties import StringProperty
-import requests
-from datetime import datetime
+# Primero: marca el inicio del arranque para el reporte de tiempos
+from src.ui_kivy.arranque import medir, reporte_arranque
+
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+with medir('import kivy'):
+    from kivy.app import App
+    from kivy.clock import Clock
+    from kivy.core.window import Window
+    from kivy.metrics import dp
+    from kivy.properties import StringProperty, NumericProperty
+
+# Las pantallas (y sus widgets de KivyMD) se importan al mostrarse por
+# primera vez; aquí solo lo necesario para la pantalla de login
+with medir('import kivymd'):
+    from kivymd.app import MDApp
+    from kivymd.uix.boxlayout import MDBoxLayout
+    from kivymd.uix.progressbar import MDProgressBar
+    from kivymd.uix.screenmanager import MDScreenManager
+
+with medir('import requests'):
+    import requests
+
+with medir('import src.ui_kivy'):
+    from src.ui_kivy.api_client import ApiClient
+    from src.ui_kivy.cache import RespuestaCache
+    from src.ui_kivy.busqueda import IndiceClientes
+    from src.ui_kivy.local_store import LocalStore
+    from src.ui_kivy.sync import SyncEngine
 
 # Configurar logging
 logging.basicConfig(
@@ -35,6 +57,57 @@ logger = logging.getLogger(__name__)
 # Configuración de la API
 API_URL = os.getenv('API_URL', 'http://localhost:8000')
 
+# Hilos para peticiones en segundo plano (igual al pool de conexiones HTTP)
+API_WORKERS = 4
+
+# Segundos que una pantalla reutiliza sus datos al volver a ella si no hubo
+# cambios (cubre lo que otros usuarios modifican en el servidor)
+DATOS_VIGENCIA = float(os.getenv('DATOS_VIGENCIA', '60'))
+
+
+# Pantallas que se crean al navegar a ellas por primera vez (nombre -> clase)
+PANTALLAS = {
+    'home': 'HomeScreen',
+    'clientes': 'ClientesScreen',
+    'pagos': 'PagosScreen',
+    'usuarios': 'UsuariosScreen',
+}
+
+
+class GestorScreenManager(MDScreenManager):
+    """
+    ScreenManager que crea cada pantalla la primera vez que se muestra.
+    
+    Las pantallas navegan como siempre (manager.current = 'clientes'); si
+    la pantalla todavía no existe, se importa y se crea en ese momento.
+    """
+    
+    def on_current(self, instance, value):
+        if value in PANTALLAS and not self.has_screen(value):
+            with medir(f'pantalla {value}'):
+                from src.ui_kivy import screens
+                self.add_widget(getattr(screens, PANTALLAS[value])(name=value))
+            logger.info(f"Pantalla '{value}' creada")
+        super().on_current(instance, value)
+
+
+class PeticionAsync:
+    """
+    Petición en segundo plano.
+    
+    cancel() descarta su resultado: el callback ya no se llamará.
+    """
+    
+    def __init__(self):
+        self.cancelada = False
+        self.future = None
+    
+    def cancel(self):
+        """Cancela la petición (si aún no empezó, ni siquiera se envía)."""
+        self.cancelada = True
+        if self.future:
+            self.future.cancel()
+
 
 class GestorPrestamosApp(MDApp):
     """Aplicación principal de Gestor de Préstamos."""
@@ -45,8 +118,30 @@ class GestorPrestamosApp(MDApp):
     usuario_nombre = StringProperty('')
     es_admin = False
     
+    # Peticiones en curso (muestra la barra de carga mientras sea > 0)
+    peticiones_activas = NumericProperty(0)
+    
+    # Aumenta con cada cambio de datos (escrituras, sincronización, login)
+    version_datos = NumericProperty(0)
+    
     def build(self):
         """Construye la interfaz de usuario."""
+        # Sesión HTTP compartida por todas las pantallas (keep-alive)
+        self.http = ApiClient(API_URL)
+        
+        # Respuestas GET recientes para no repetir descargas al navegar
+        self.cache = RespuestaCache()
+        
+        # Las peticiones corren fuera del hilo de la UI
+        self._executor = ThreadPoolExecutor(max_workers=API_WORKERS)
+        self._peticiones = {}
+        
+        # Copia local de los datos y cola de operaciones para trabajar sin señal
+        self.store = LocalStore(os.path.join(self.user_data_dir, 'gestor_local.db'))
+        self.sync = SyncEngine(self, self.store)
+        self._indice_clientes = None
+        self._dialogo_rechazadas = None
+        
         self.title = "Gestor de Préstamos"
         self.theme_cls.primary_palette = "Green"
         self.theme_cls.primary_hue = "700"
@@ -56,62 +151,117 @@ class GestorPrestamosApp(MDApp):
         if not self.is_mobile():
             Window.size = (400, 700)  # Tamaño móvil en desktop
         
-        # Crear screen manager
-        from src.ui_kivy.screens import (
-            LoginScreen,
-            HomeScreen,
-            ClientesScreen,
-            PagosScreen,
-            UsuariosScreen
+        # Crear screen manager: solo el login al arrancar, el resto al navegar
+        with medir('pantalla login'):
+            from src.ui_kivy.screens.login_screen import LoginScreen
+            self.sm = GestorScreenManager()
+            self.sm.add_widget(LoginScreen(name='login'))
+        
+        # Barra de carga global sobre las pantallas
+        self.barra_carga = MDProgressBar(
+            type="indeterminate",
+            size_hint_y=None,
+            height=dp(4),
+            opacity=0
         )
+        self.bind(peticiones_activas=self._actualizar_barra_carga)
         
-        self.sm = MDScreenManager()
-        self.sm.add_widget(LoginScreen(name='login'))
-        self.sm.add_widget(HomeScreen(name='home'))
-        self.sm.add_widget(ClientesScreen(name='clientes'))
-        self.sm.add_widget(PagosScreen(name='pagos'))
-        self.sm.add_widget(UsuariosScreen(name='usuarios'))
+        root = MDBoxLayout(orientation='vertical')
+        root.add_widget(self.barra_carga)
+        root.add_widget(self.sm)
+        return root
+    
+    def _actualizar_barra_carga(self, instance, activas):
+        """Muestra la barra de carga mientras haya peticiones en curso."""
+        if activas > 0 and self.barra_carga.opacity == 0:
+            self.barra_carga.opacity = 1
+            self.barra_carga.start()
+        elif activas == 0 and self.barra_carga.opacity == 1:
+            self.barra_carga.stop()
+            self.barra_carga.opacity = 0
+    
+    def on_start(self):
+        """Termina el arranque: reporte de tiempos y verificación de la API."""
+        Window.bind(on_flip=self._primer_frame)
+    
+    def _primer_frame(self, *args):
+        """Primer frame en pantalla: el login ya se ve."""
+        Window.unbind(on_flip=self._primer_frame)
+        reporte_arranque()
         
-        return self.sm
+        # La API se verifica en segundo plano, sin retrasar la ventana
+        self.ejecutar_async(self._verificar_api, self._mostrar_estado_api, mostrar_carga=False)
+    
+    def _verificar_api(self):
+        """Consulta /health (hilo de trabajo)."""
+        response = self.http.request('GET', '/health')
+        if response.status_code == 200:
+            return True, "Conexión a API exitosa"
+        return False, f"API respondió con código {response.status_code}"
+    
+    def _mostrar_estado_api(self, success, mensaje):
+        """Informa en el login si no hay conexión con la API."""
+        if success:
+            logger.info(f"✅ {mensaje}: {API_URL}")
+        else:
+            logger.warning(f"❌ No se pudo conectar a la API ({API_URL}): {mensaje}")
+        self.sm.get_screen('login').mostrar_estado_api(success)
+    
+    def on_stop(self):
+        """Libera los hilos, las conexiones HTTP y la base local al cerrar la app."""
+        self.sync.detener()
+        for peticion in list(self._peticiones.values()):
+            peticion.cancel()
+        self._executor.shutdown(wait=False)
+        self.http.close()
+        self.store.close()
     
     def is_mobile(self):
         """Detecta si estamos en dispositivo móvil."""
         from kivy.utils import platform
         return platform in ('android', 'ios')
     
-    def login(self, username, password):
+    def login(self, username, password, callback):
         """
-        Realiza el login del usuario.
+        Realiza el login del usuario en segundo plano.
         
-        Returns:
-            tuple: (success, message)
+        Args:
+            username: Nombre de usuario
+            password: Contraseña
+            callback: Función (success, message) llamada en el hilo de la UI
         """
-        try:
-            response = requests.post(
-                f'{API_URL}/api/auth/login',
-                json={'username': username, 'password': password},
-                timeout=10
+        def pedir_token():
+            response = self.http.request(
+                'POST',
+                '/api/auth/login',
+                json={'username': username, 'password': password}
             )
-            
             if response.status_code == 200:
-                data = response.json()
+                return True, response.json()
+            return False, "Usuario o contraseña incorrectos"
+        
+        def terminar(success, data):
+            if success:
                 self.token = data['token']
                 usuario = data['usuario']
                 self.usuario_id = usuario['id']
                 self.usuario_nombre = usuario['nombre']
                 self.es_admin = usuario['es_admin']
                 logger.info(f"Login exitoso: {username}")
-                return True, "Login exitoso"
+                self.cache.limpiar()
+                self.marcar_datos_cambiados()
+                self.sync.iniciar()
+                callback(True, "Login exitoso")
             else:
                 logger.warning(f"Login fallido: {username}")
-                return False, "Usuario o contraseña incorrectos"
-                
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error de conexión: {e}")
-            return False, f"Error de conexión: {str(e)}"
+                callback(False, data)
+        
+        return self.ejecutar_async(pedir_token, terminar, clave='login')
     
     def logout(self):
         """Cierra la sesión del usuario."""
+        self.sync.detener()
+        self.cache.limpiar()
         self.token = ''
         self.usuario_id = 0
         self.usuario_nombre = ''
@@ -119,6 +269,86 @@ class GestorPrestamosApp(MDApp):
         self.sm.current = 'login'
         logger.info("Logout exitoso")
     
+    def avisar_rechazadas(self, operaciones):
+        """
+        Avisa qué registros hechos sin conexión rechazó el servidor.
+        
+        Ya se borraron de la copia local; al cerrar el aviso se marcan como
+        vistos para no repetirlo.
+        
+        Args:
+            operaciones: Resultado de store.rechazadas()
+        """
+        if self._dialogo_rechazadas is not None:
+            return
+        from kivymd.uix.dialog import MDDialog
+        from kivymd.uix.button import MDRaisedButton
+        
+        nombres = {'pago': 'Pago', 'gasto': 'Gasto'}
+        lineas = [
+            f"• {nombres.get(op['tipo'], op['tipo'])} de ${op['datos'].get('monto', 0):,.0f} "
+            f"({op['creado'][:10]}): {op['ultimo_error']}"
+            for op in operaciones
+        ]
+        
+        def cerrar(*args):
+            self.store.marcar_rechazadas_vistas([op['id'] for op in operaciones])
+            self._dialogo_rechazadas.dismiss()
+            self._dialogo_rechazadas = None
+        
+        self._dialogo_rechazadas = MDDialog(
+            title="Registros no aceptados",
+            text="El servidor no aceptó estos registros y se quitaron del "
+                 "dispositivo:\n\n" + "\n".join(lineas),
+            auto_dismiss=False,
+            buttons=[MDRaisedButton(text="ENTENDIDO", on_release=cerrar)]
+        )
+        self._dialogo_rechazadas.open()
+    
+    def marcar_datos_cambiados(self):
+        """Indica a las pantallas que deben recargar sus datos al mostrarse."""
+        self.version_datos += 1
+    
+    def marca_datos(self):
+        """
+        Marca de los datos que una pantalla está por cargar.
+        
+        Returns:
+            tuple: (version_datos, momento) para datos_vigentes()
+        """
+        return self.version_datos, time.monotonic()
+    
+    def datos_vigentes(self, marca):
+        """
+        Indica si los datos cargados con esta marca siguen vigentes.
+        
+        Args:
+            marca: Resultado de marca_datos() (None si no hay datos cargados)
+            
+        Returns:
+            bool: False si hubo cambios desde entonces o pasó DATOS_VIGENCIA
+        """
+        if marca is None:
+            return False
+        version, momento = marca
+        return version == self.version_datos and time.monotonic() - momento < DATOS_VIGENCIA
+    
+    def indice_clientes(self):
+        """
+        Índice de búsqueda de los clientes guardados del usuario.
+        
+        Se rehace solo cuando cambian los clientes de la base local. Admin
+        busca entre todos los clientes que ya cargó.
+        
+        Returns:
+            IndiceClientes
+        """
+        marca = (self.usuario_id, self.store.version_clientes)
+        if self._indice_clientes is None or self._indice_clientes[0] != marca:
+            usuario_id = None if self.es_admin else self.usuario_id
+            self._indice_clientes = (marca, IndiceClientes(self.store.clientes(usuario_id)))
+        return self._indice_clientes[1]
+    
     def get_headers(self):
         """Retorna los headers HTTP con el token de autenticación."""
         return {
@@ -126,36 +356,54 @@ class GestorPrestamosApp(MDApp):
             'Content-Type': 'application/json'
         }
     
-    def api_request(self, method, endpoint, data=None, params=None):
+    def api_request(self, method, endpoint, data=None, params=None, idempotency_key=None,
+                    usar_cache=True):
         """
         Realiza una petición a la API.
         
+        Los GET se responden desde la caché mientras estén vigentes; las
+        escrituras exitosas borran de la caché las respuestas relacionadas.
+        
         Args:
             method: Método HTTP ('GET', 'POST', 'PUT', 'DELETE')
             endpoint: Endpoint de la API (ej: '/api/clientes')
             data: Datos para enviar (POST, PUT)
             params: Parámetros de query string (GET)
+            idempotency_key: Clave para que un reintento del mismo POST no
+                se registre dos veces
+            usar_cache: False para ir siempre al servidor
             
         Returns:
             tuple: (success, response_data_or_error_message)
         """
+        if method not in ('GET', 'POST', 'PUT', 'DELETE'):
+            return False, "Método HTTP no soportado"
+        
+        if method == 'GET' and usar_cache:
+            entrada = self.cache.obtener(endpoint, params)
+            if entrada is not None and entrada[1]:
+                return True, entrada[0]
+        
+        headers = self.get_headers()
+        if idempotency_key:
+            headers['Idempotency-Key'] = idempotency_key
+        
         try:
-            url = f'{API_URL}{endpoint}'
-            headers = self.get_headers()
-            
-            if method == 'GET':
-                response = requests.get(url, headers=headers, params=params, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, headers=headers, json=data, timeout=10)
-            elif method == 'PUT':
-                response = requests.put(url, headers=headers, json=data, timeout=10)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=headers, timeout=10)
-            else:
-                return False, "Método HTTP no soportado"
+            response = self.http.request(
+                method,
+                endpoint,
+                headers=headers,
+                params=params,
+                json=data if method in ('POST', 'PUT') else None
+            )
             
             if response.status_code in (200, 201):
-                return True, response.json()
+                respuesta = response.json()
+                if method == 'GET':
+                    self.cache.guardar(endpoint, params, respuesta)
+                else:
+                    self.cache.invalidar(endpoint)
+                return True, respuesta
             else:
                 error_data = response.json()
                 return False, error_data.get('detail', 'Error desconocido')
@@ -163,6 +411,106 @@ class GestorPrestamosApp(MDApp):
         except requests.exceptions.RequestException as e:
             logger.error(f"Error en API request: {e}")
             return False, f"Error de conexión: {str(e)}"
+    
+    def api_request_async(self, method, endpoint, callback, data=None, params=None, clave=None,
+                          idempotency_key=None, revalidar=False):
+        """
+        Realiza una petición a la API sin bloquear la interfaz.
+        
+        Args:
+            method: Método HTTP ('GET', 'POST', 'PUT', 'DELETE')
+            endpoint: Endpoint de la API (ej: '/api/clientes')
+            callback: Función (success, data) llamada en el hilo de la UI
+            data: Datos para enviar (POST, PUT)
+            params: Parámetros de query string (GET)
+            clave: Si se indica, cancela la petición anterior con la misma
+                clave (ej: búsquedas mientras se escribe)
+            idempotency_key: Clave para que un reintento del mismo POST no
+                se registre dos veces
+            revalidar: Si la respuesta en caché está vencida, la entrega de
+                inmediato y vuelve a llamar a callback solo si el servidor
+                responde algo distinto (callback debe poder llamarse dos veces)
+            
+        Returns:
+            PeticionAsync: Permite cancelar la petición
+        """
+        previo = None
+        if method == 'GET' and revalidar:
+            entrada = self.cache.obtener(endpoint, params)
+            if entrada is not None and not entrada[1]:
+                previo = (True, entrada[0])
+        
+        def terminar(success, respuesta):
+            # Ya se mostró lo guardado: sin señal o sin cambios no hay nada que hacer
+            if previo is not None and (not success or respuesta == previo[1]):
+                return
+            # Una escritura exitosa deja desactualizadas las demás pantallas
+            if success and method != 'GET':
+                self.marcar_datos_cambiados()
+            callback(success, respuesta)
+        
+        return self.ejecutar_async(
+            lambda: self.api_request(method, endpoint, data, params, idempotency_key),
+            terminar,
+            clave=clave,
+            previo=previo
+        )
+    
+    def ejecutar_async(self, funcion, callback, clave=None, mostrar_carga=True, previo=None):
+        """
+        Ejecuta funcion() en un hilo y entrega su resultado con Clock.
+        
+        Args:
+            funcion: Función sin argumentos que retorna (success, data)
+            callback: Función (success, data) llamada en el hilo de la UI
+            clave: Cancela la petición anterior con la misma clave
+            mostrar_carga: False para tareas de fondo que no deben mostrar
+                la barra de carga (ej: sincronización periódica)
+            previo: Resultado (success, data) provisional a entregar de
+                inmediato mientras corre funcion (ej: respuesta en caché)
+            
+        Returns:
+            PeticionAsync: Permite cancelar la petición
+        """
+        if clave and clave in self._peticiones:
+            self._peticiones[clave].cancel()
+        
+        peticion = PeticionAsync()
+        if clave:
+            self._peticiones[clave] = peticion
+        if mostrar_carga:
+            self.peticiones_activas += 1
+        
+        if previo is not None:
+            # Se programa antes de lanzar funcion: siempre llega primero
+            Clock.schedule_once(lambda dt: peticion.cancelada or callback(*previo))
+        
+        def ejecutar():
+            try:
+                return funcion()
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Error en API request: {e}")
+                return False, f"Error de conexión: {str(e)}"
+            except Exception as e:
+                logger.error(f"Error en petición en segundo plano: {e}", exc_info=True)
+                return False, f"Error inesperado: {str(e)}"
+        
+        def entregar(resultado):
+            if mostrar_carga:
+                self.peticiones_activas -= 1
+            if clave and self._peticiones.get(clave) is peticion:
+                del self._peticiones[clave]
+            if not peticion.cancelada:
+                callback(*resultado)
+        
+        def terminado(future):
+            # Hilo de trabajo: volver al hilo de la UI antes de tocar widgets
+            resultado = (False, "Petición cancelada") if future.cancelled() else future.result()
+            Clock.schedule_once(lambda dt: entregar(resultado))
+        
+        peticion.future = self._executor.submit(ejecutar)
+        peticion.future.add_done_callback(terminado)
+        return peticion
 
 
 def main():
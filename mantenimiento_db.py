@@ -0,0 +1,91 @@
+# Script de mantenimiento de la base de datos
+# Ejecutar: python mantenimiento_db.py recalcular-saldos
+#           python mantenimiento_db.py verificar-saldos
+#           python mantenimiento_db.py reconstruir-resumen
+#           python mantenimiento_db.py verificar-resumen
+#           python mantenimiento_db.py limpiar-idempotencia
+
+import argparse
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mantenimiento de la base de datos")
+    parser.add_argument(
+        'comando',
+        choices=[
+            'recalcular-saldos', 'verificar-saldos', 'reconstruir-resumen', 'verificar-resumen',
+            'limpiar-idempotencia'
+        ],
+        help="Tarea a ejecutar"
+    )
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("  GESTOR DE PRÉSTAMOS - Mantenimiento de base de datos")
+    print("=" * 60)
+    print()
+    
+    # Cargar variables de entorno
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    from src.db.connection import Database
+    from src.db.saldos import recalcular_saldos, verificar_saldos
+    from src.db.resumen_diario import reconstruir_resumen, verificar_resumen
+    from src.db.idempotencia import limpiar_idempotencia
+    
+    db = Database()
+    try:
+        if args.comando == 'recalcular-saldos':
+            corregidos = recalcular_saldos(db)
+            print(f"✅ Saldos recalculados ({corregidos} clientes corregidos)")
+        
+        elif args.comando == 'verificar-saldos':
+            diferencias = verificar_saldos(db)
+            if not diferencias:
+                print("✅ Todos los saldos coinciden con el historial de pagos")
+                return
+            
+            print(f"❌ {len(diferencias)} clientes con saldo inconsistente:")
+            for fila in diferencias:
+                print(
+                    f"   #{fila['id']} {fila['nombre']}: guardado "
+                    f"${fila['total_pagado']:,.0f} ({fila['estado']}) / real "
+                    f"${fila['total_real']:,.0f} ({fila['estado_real']})"
+                )
+            print()
+            print("Para corregirlos ejecuta:")
+            print("   python mantenimiento_db.py recalcular-saldos")
+            sys.exit(1)
+        
+        elif args.comando == 'reconstruir-resumen':
+            filas = reconstruir_resumen(db)
+            print(f"✅ Resumen diario reconstruido ({filas} filas cobrador/día)")
+        
+        elif args.comando == 'verificar-resumen':
+            diferencias = verificar_resumen(db)
+            if not diferencias:
+                print("✅ El resumen diario coincide con pagos, clientes, gastos y bases")
+                return
+            
+            print(f"❌ {len(diferencias)} filas del resumen diario inconsistentes:")
+            for fila in diferencias:
+                print(
+                    f"   Cobrador #{fila['usuario_id']} {fila['fecha']}: guardado "
+                    f"${(fila['efectivo'] or 0) + (fila['digital'] or 0):,.0f} cobrado / real "
+                    f"${(fila['efectivo_real'] or 0) + (fila['digital_real'] or 0):,.0f}"
+                )
+            print()
+            print("Para corregirlo ejecuta:")
+            print("   python mantenimiento_db.py reconstruir-resumen")
+            sys.exit(1)
+        
+        elif args.comando == 'limpiar-idempotencia':
+            borradas = limpiar_idempotencia(db)
+            print(f"✅ Claves de idempotencia vencidas borradas ({borradas})")
+    finally:
+        db.close_all_connections()
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,6 @@
 # Ejecutar: python run_app.py
 
 import os
-import sys
 
 def main():
     print("=" * 60)
@@ -14,25 +13,12 @@ def main():
     from dotenv import load_dotenv
     load_dotenv()
     
-    # Verificar que la API esté corriendo
-    import requests
+    # La conexión con la API se verifica en segundo plano una vez que se
+    # ve el login (ver GestorPrestamosApp.on_start): no retrasa la ventana
     api_url = os.getenv('API_URL', 'http://localhost:8000')
-    
-    print(f"Verificando conexión a API: {api_url}")
-    try:
-        response = requests.get(f"{api_url}/health", timeout=5)
-        if response.status_code == 200:
-            print("✅ Conexión a API exitosa")
-        else:
-            print("⚠️  Advertencia: API respondió con código", response.status_code)
-    except requests.exceptions.RequestException as e:
-        print("❌ No se pudo conectar a la API")
-        print(f"   Error: {e}")
-        print()
-        print("Asegúrate de que el servidor API esté corriendo:")
-        print("   python run_api.py")
-        print()
-        sys.exit(1)
+    print(f"API: {api_url}")
+    print("Si la API no responde, el login lo indicará. Para iniciarla:")
+    print("   python run_api.py")
     
     print()
     print("Iniciando aplicación...")
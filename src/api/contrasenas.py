@@ -0,0 +1,158 @@
+"""
+Hash y verificación de contraseñas (bcrypt) fuera del event loop.
+
+Cada bcrypt tarda ~250 ms de CPU: llamado dentro de una ruta async
+detiene todas las demás peticiones mientras dura, y al inicio de la
+jornada (todos los cobradores haciendo login a la vez) la API se congela.
+Aquí:
+1. bcrypt corre en un pool propio de HASH_WORKERS hilos (bcrypt libera el
+   GIL, así que los hilos trabajan en paralelo)
+2. Si ya hay HASH_MAX_COLA operaciones esperando, la petición se rechaza
+   con 503 en vez de acumular esperas sin límite
+3. El costo (SecurityConfig.BCRYPT_ROUNDS) es configurable y las
+   contraseñas con otro costo se vuelven a hashear en el login
+4. Se mide la espera en cola y la duración de cada hash (ver /health)
+"""
+
+import os
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from src.config import SecurityConfig
+
+logger = logging.getLogger(__name__)
+
+# Hilos dedicados a bcrypt (por defecto, uno por núcleo)
+HASH_WORKERS = int(os.getenv('HASH_WORKERS', str(os.cpu_count() or 2)))
+
+# Operaciones que pueden esperar turno antes de rechazar con 503
+HASH_MAX_COLA = int(os.getenv('HASH_MAX_COLA', '32'))
+
+_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix='bcrypt')
+
+# Operaciones en el pool (ejecutándose o en cola); solo se toca desde el event loop
+_en_curso = 0
+
+_metricas = {
+    operacion: {'total': 0, 'espera_total': 0.0, 'espera_max': 0.0, 'duracion_total': 0.0, 'duracion_max': 0.0}
+    for operacion in ('hashear', 'verificar')
+}
+_rechazadas = 0
+
+
+async def _ejecutar(operacion: str, funcion, *args):
+    """
+    Ejecuta funcion(*args) en el pool de bcrypt y registra sus tiempos.
+
+    Raises:
+        HTTPException: 503 si la cola está llena
+    """
+    global _en_curso, _rechazadas
+
+    if _en_curso >= HASH_WORKERS + HASH_MAX_COLA:
+        _rechazadas += 1
+        logger.warning(f"⚠️ Cola de bcrypt llena ({_en_curso} operaciones): petición rechazada")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, intenta de nuevo en unos segundos",
+            headers={'Retry-After': '1'}
+        )
+
+    encolada = time.perf_counter()
+
+    def trabajo():
+        inicio = time.perf_counter()
+        resultado = funcion(*args)
+        return resultado, inicio - encolada, time.perf_counter() - inicio
+
+    _en_curso += 1
+    try:
+        loop = asyncio.get_running_loop()
+        resultado, espera, duracion = await loop.run_in_executor(_executor, trabajo)
+    finally:
+        _en_curso -= 1
+
+    metrica = _metricas[operacion]
+    metrica['total'] += 1
+    metrica['espera_total'] += espera
+    metrica['espera_max'] = max(metrica['espera_max'], espera)
+    metrica['duracion_total'] += duracion
+    metrica['duracion_max'] = max(metrica['duracion_max'], duracion)
+    return resultado
+
+
+async def hashear(password: str) -> str:
+    """
+    Genera el hash bcrypt de una contraseña con el costo configurado.
+
+    Args:
+        password: Contraseña en texto plano
+
+    Returns:
+        str: Hash para guardar en usuarios.password
+    """
+    hashed = await _ejecutar(
+        'hashear', bcrypt.hashpw,
+        password.encode('utf-8'), bcrypt.gensalt(SecurityConfig.BCRYPT_ROUNDS)
+    )
+    return hashed.decode('utf-8')
+
+
+async def verificar(password: str, hashed: str) -> bool:
+    """
+    Verifica una contraseña contra su hash bcrypt.
+
+    Args:
+        password: Contraseña en texto plano
+        hashed: Hash guardado en usuarios.password
+
+    Returns:
+        bool: True si la contraseña es correcta
+    """
+    return await _ejecutar('verificar', bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+def necesita_rehash(hashed: str) -> bool:
+    """Indica si el hash se generó con un costo distinto al configurado ($2b$12$...)."""
+    try:
+        return int(hashed.split('$')[2]) != SecurityConfig.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+def estadisticas() -> Dict:
+    """
+    Métricas del pool de bcrypt (tiempos en ms).
+
+    Returns:
+        Dict: Workers, operaciones en curso, rechazadas y, por operación,
+        total, espera en cola y duración (promedio y máxima)
+    """
+    stats = {
+        'workers': HASH_WORKERS,
+        'rounds': SecurityConfig.BCRYPT_ROUNDS,
+        'en_curso': _en_curso,
+        'max_cola': HASH_MAX_COLA,
+        'rechazadas': _rechazadas,
+    }
+    for operacion, metrica in _metricas.items():
+        total = metrica['total'] or 1
+        stats[operacion] = {
+            'total': metrica['total'],
+            'espera_promedio_ms': round(metrica['espera_total'] / total * 1000, 1),
+            'espera_max_ms': round(metrica['espera_max'] * 1000, 1),
+            'duracion_promedio_ms': round(metrica['duracion_total'] / total * 1000, 1),
+            'duracion_max_ms': round(metrica['duracion_max'] * 1000, 1),
+        }
+    return stats
+
+
+def cerrar():
+    """Detiene el pool de bcrypt (al apagar la API)."""
+    _executor.shutdown(wait=False)
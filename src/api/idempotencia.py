@@ -0,0 +1,144 @@
+"""
+Header Idempotency-Key para las rutas de escritura.
+
+Con redes móviles inestables la app puede dar la petición por fallida
+cuando el servidor ya la confirmó, y al reintentar registraría dos veces el
+mismo pago. Si la petición trae Idempotency-Key:
+1. La clave se reserva en la misma transacción que la escritura (si la
+   ruta falla, el rollback la libera)
+2. Un reintento con la misma clave espera a que termine la primera
+   petición y recibe su respuesta guardada, sin volver a escribir
+"""
+
+import json
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+
+from src.db.idempotencia import IDEMPOTENCIA_TTL_HORAS
+
+
+async def reservar_claves(db, usuario_id: int, claves: List[str], ruta: str) -> Dict[str, dict]:
+    """
+    Reserva las claves nuevas y retorna las ya usadas.
+
+    Una clave vencida se reutiliza como nueva.
+
+    Args:
+        db: Conexión de la petición
+        usuario_id: Usuario que hace la petición
+        claves: Claves sin repetir
+        ruta: Operación (ej: 'POST /api/pagos')
+
+    Returns:
+        Dict: {clave: {'ruta', 'respuesta'}} de las claves ya usadas
+    """
+    # Si otra petición tiene la misma clave sin confirmar, el INSERT espera
+    # a que termine: así nunca se ejecutan las dos
+    nuevas = await db.fetch_all('''
+        INSERT INTO idempotencia (usuario_id, clave, ruta)
+        SELECT %s, clave, %s FROM unnest(%s::text[]) AS clave
+        ON CONFLICT (usuario_id, clave) DO UPDATE
+            SET ruta = EXCLUDED.ruta, respuesta = NULL, creado = CURRENT_TIMESTAMP
+            WHERE idempotencia.creado < CURRENT_TIMESTAMP - make_interval(hours => %s)
+        RETURNING clave
+    ''', (usuario_id, ruta, claves, IDEMPOTENCIA_TTL_HORAS))
+
+    nuevas = {fila['clave'] for fila in nuevas}
+    usadas = [clave for clave in claves if clave not in nuevas]
+    if not usadas:
+        return {}
+
+    filas = await db.fetch_all(
+        'SELECT clave, ruta, respuesta FROM idempotencia WHERE usuario_id = %s AND clave = ANY(%s)',
+        (usuario_id, usadas)
+    )
+    return {fila['clave']: fila for fila in filas}
+
+
+async def guardar_respuestas(db, usuario_id: int, respuestas: Dict[str, dict]):
+    """
+    Guarda la respuesta de cada clave reservada.
+
+    Args:
+        db: Conexión de la petición
+        usuario_id: Usuario que hace la petición
+        respuestas: {clave: respuesta}
+    """
+    if not respuestas:
+        return
+
+    claves = list(respuestas)
+    await db.execute('''
+        UPDATE idempotencia i
+        SET respuesta = r.respuesta
+        FROM unnest(%s::text[], %s::jsonb[]) AS r(clave, respuesta)
+        WHERE i.usuario_id = %s AND i.clave = r.clave
+    ''', (
+        claves,
+        [json.dumps(jsonable_encoder(respuestas[clave])) for clave in claves],
+        usuario_id
+    ))
+
+
+async def liberar_claves(db, usuario_id: int, claves: List[str]):
+    """
+    Libera claves reservadas cuya operación no se realizó.
+
+    Args:
+        db: Conexión de la petición
+        usuario_id: Usuario que hace la petición
+        claves: Claves a liberar
+    """
+    if claves:
+        await db.execute(
+            'DELETE FROM idempotencia WHERE usuario_id = %s AND clave = ANY(%s) AND respuesta IS NULL',
+            (usuario_id, claves)
+        )
+
+
+async def respuesta_previa(db, usuario_id: int, clave: Optional[str], ruta: str) -> Optional[dict]:
+    """
+    Reserva la clave de la petición o retorna la respuesta ya guardada.
+
+    Args:
+        db: Conexión de la petición
+        usuario_id: Usuario que hace la petición
+        clave: Valor del header Idempotency-Key (None si no vino)
+        ruta: Operación (ej: 'POST /api/pagos')
+
+    Returns:
+        La respuesta original si la clave ya se usó, None si hay que ejecutar
+
+    Raises:
+        HTTPException: Si la clave se usó en otra operación
+    """
+    if clave is None:
+        return None
+
+    previas = await reservar_claves(db, usuario_id, [clave], ruta)
+    if clave not in previas:
+        return None
+
+    if previas[clave]['ruta'] != ruta:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key ya usada en otra operación"
+        )
+    return previas[clave]['respuesta']
+
+
+async def guardar_respuesta(db, usuario_id: int, clave: Optional[str], respuesta):
+    """
+    Guarda la respuesta de la petición (si trajo Idempotency-Key) y la retorna.
+
+    Args:
+        db: Conexión de la petición
+        usuario_id: Usuario que hace la petición
+        clave: Valor del header Idempotency-Key (None si no vino)
+        respuesta: Respuesta de la ruta
+    """
+    if clave is not None:
+        await guardar_respuestas(db, usuario_id, {clave: respuesta})
+    return respuesta
@@ -0,0 +1,167 @@
+"""
+Bloqueo de login tras intentos fallidos repetidos.
+
+Cada intento de login cuesta un bcrypt (~250 ms de CPU): una ráfaga de
+contraseñas erradas, por error o a propósito, consume la CPU de la API.
+Se cuentan los intentos fallidos de los últimos
+SecurityConfig.LOCKOUT_DURATION segundos (ventana deslizante) por usuario
+y por IP; al llegar al máximo, el login se rechaza con 429 antes de
+consultar usuarios o ejecutar bcrypt.
+
+Con un solo worker basta el registro en memoria (por defecto). Con varios,
+LOGIN_INTENTOS_BACKEND=postgres comparte los intentos en la tabla
+login_intentos (ver src/db/intentos_login.py).
+"""
+
+import os
+import math
+import time
+import logging
+from collections import OrderedDict, deque
+from typing import List, Tuple
+
+from fastapi import HTTPException, status
+
+from src.api import server
+from src.config import SecurityConfig
+
+logger = logging.getLogger(__name__)
+
+# 'memoria' (un worker) o 'postgres' (compartido entre workers)
+LOGIN_INTENTOS_BACKEND = os.getenv('LOGIN_INTENTOS_BACKEND', 'memoria')
+
+# Claves (usuario o IP) recordadas como máximo en memoria
+MAX_CLAVES_MEMORIA = 10000
+
+
+def claves_intento(username: str, ip: str) -> List[Tuple[str, int]]:
+    """
+    Claves que cuentan un intento de login, con su máximo de fallos.
+
+    La IP admite más fallos que el usuario: varios cobradores pueden salir
+    a internet por la misma IP (ej: la red de la oficina).
+    """
+    return [
+        (f"usuario:{username.strip().lower()}", SecurityConfig.MAX_LOGIN_ATTEMPTS),
+        (f"ip:{ip}", SecurityConfig.MAX_LOGIN_ATTEMPTS_IP),
+    ]
+
+
+def _segundos_bloqueo(fallos: List[float], limite: int, ahora: float) -> float:
+    """
+    Segundos que faltan para poder intentar de nuevo (0 si no hay bloqueo).
+
+    Args:
+        fallos: Momentos (segundos) de los fallos dentro de la ventana, en orden
+        limite: Máximo de fallos en la ventana
+        ahora: Momento actual en la misma escala
+    """
+    if len(fallos) < limite:
+        return 0
+    # Se desbloquea cuando sale de la ventana el fallo que sobra más antiguo
+    return max(fallos[len(fallos) - limite] + SecurityConfig.LOCKOUT_DURATION - ahora, 0)
+
+
+class IntentosMemoria:
+    """Intentos fallidos en memoria del proceso (un solo worker)."""
+
+    def __init__(self, max_claves: int = MAX_CLAVES_MEMORIA):
+        self.max_claves = max_claves
+        self._fallos = OrderedDict()
+
+    def _vigentes(self, clave: str, ahora: float) -> deque:
+        """Fallos de la clave dentro de la ventana (descarta los vencidos)."""
+        fallos = self._fallos.get(clave)
+        if fallos is None:
+            return deque()
+        while fallos and fallos[0] <= ahora - SecurityConfig.LOCKOUT_DURATION:
+            fallos.popleft()
+        if not fallos:
+            del self._fallos[clave]
+        return fallos
+
+    async def bloqueo(self, claves: List[Tuple[str, int]]) -> float:
+        """Segundos de bloqueo restantes para el intento (0 si puede intentar)."""
+        ahora = time.monotonic()
+        return max(
+            _segundos_bloqueo(list(self._vigentes(clave, ahora)), limite, ahora)
+            for clave, limite in claves
+        )
+
+    async def registrar_fallo(self, claves: List[Tuple[str, int]]):
+        """Anota un intento fallido en cada clave."""
+        ahora = time.monotonic()
+        for clave, limite in claves:
+            fallos = self._vigentes(clave, ahora)
+            fallos.append(ahora)
+            self._fallos[clave] = fallos
+            self._fallos.move_to_end(clave)
+
+        # Acotar la memoria ante ráfagas con muchos usuarios o IPs distintos
+        while len(self._fallos) > self.max_claves:
+            self._fallos.popitem(last=False)
+
+    async def limpiar(self, clave: str):
+        """Olvida los fallos de una clave (ej: tras un login exitoso)."""
+        self._fallos.pop(clave, None)
+
+
+class IntentosPostgres:
+    """
+    Intentos fallidos en la tabla login_intentos (compartidos entre workers).
+
+    Cada método es una sola consulta que toma una conexión del pool y la
+    devuelve con commit al terminar (así el fallo queda guardado aunque el
+    login responda 401). Debe llamarse sin tener otra conexión tomada: con
+    una ráfaga de logins, retener una y esperar otra agota el pool.
+    """
+
+    async def bloqueo(self, claves: List[Tuple[str, int]]) -> float:
+        """Segundos de bloqueo restantes para el intento (0 si puede intentar)."""
+        filas = await server.db_instance.fetch_all('''
+            SELECT clave, EXTRACT(EPOCH FROM creado - CURRENT_TIMESTAMP)::float AS momento
+            FROM login_intentos
+            WHERE clave = ANY(%s)
+              AND creado > CURRENT_TIMESTAMP - make_interval(secs => %s)
+            ORDER BY creado
+        ''', ([clave for clave, limite in claves], SecurityConfig.LOCKOUT_DURATION))
+
+        # Momentos relativos a ahora (negativos): ahora = 0
+        return max(
+            _segundos_bloqueo([f['momento'] for f in filas if f['clave'] == clave], limite, 0)
+            for clave, limite in claves
+        )
+
+    async def registrar_fallo(self, claves: List[Tuple[str, int]]):
+        """Anota un intento fallido en cada clave."""
+        await server.db_instance.execute(
+            'INSERT INTO login_intentos (clave) SELECT unnest(%s::text[])',
+            ([clave for clave, limite in claves],)
+        )
+
+    async def limpiar(self, clave: str):
+        """Olvida los fallos de una clave (ej: tras un login exitoso)."""
+        await server.db_instance.execute('DELETE FROM login_intentos WHERE clave = %s', (clave,))
+
+
+intentos = IntentosPostgres() if LOGIN_INTENTOS_BACKEND == 'postgres' else IntentosMemoria()
+
+
+async def verificar_bloqueo(claves: List[Tuple[str, int]]):
+    """
+    Rechaza el intento si el usuario o la IP están bloqueados.
+
+    Raises:
+        HTTPException: 429 con Retry-After si hay bloqueo
+    """
+    segundos = await intentos.bloqueo(claves)
+    if segundos <= 0:
+        return
+
+    minutos = math.ceil(segundos / 60)
+    logger.warning(f"🔒 Login bloqueado por intentos fallidos: {[clave for clave, _ in claves]}")
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=f"Demasiados intentos fallidos. Intenta de nuevo en {minutos} minuto(s)",
+        headers={'Retry-After': str(int(segundos) + 1)}
+    )
@@ -6,12 +6,14 @@ from .auth import (
     create_access_token,
     decode_access_token,
     get_current_user,
-    get_current_admin
+    get_current_admin,
+    estadisticas_tokens
 )
 
 __all__ = [
     'create_access_token',
     'decode_access_token',
     'get_current_user',
-    'get_current_admin'
+    'get_current_admin',
+    'estadisticas_tokens'
 ]
@@ -3,24 +3,35 @@ Middleware de autenticación JWT.
 
 Proporciona:
 - Generación de tokens JWT
-- Validación de tokens
+- Validación de tokens (con caché de tokens ya verificados)
 - Dependencias para rutas protegidas
 """
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional
 import os
+import time
 
 # Configuración JWT
 SECRET_KEY = os.getenv("JWT_SECRET", "tu_secret_key_super_segura_aqui")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 horas
 
+# Tokens verificados recordados como máximo (se descartan los menos usados)
+TOKEN_CACHE_MAX = int(os.getenv("TOKEN_CACHE_MAX", "1000"))
+
 security = HTTPBearer()
 
+# token -> (usuario, exp): la app envía el mismo token en cada petición de
+# la jornada, así que solo la primera paga el decode y la firma HMAC
+_tokens_verificados = OrderedDict()
+_cache_aciertos = 0
+_cache_fallos = 0
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -85,7 +96,21 @@ async def get_current_user(
     Raises:
         HTTPException: Si el token es inválido
     """
+    global _cache_aciertos, _cache_fallos
+    
     token = credentials.credentials
+    
+    # Token ya verificado y aún vigente: basta buscarlo en la caché
+    entrada = _tokens_verificados.get(token)
+    if entrada is not None:
+        usuario, exp = entrada
+        if time.time() < exp:
+            _cache_aciertos += 1
+            _tokens_verificados.move_to_end(token)
+            return dict(usuario)
+        del _tokens_verificados[token]
+    
+    _cache_fallos += 1
     payload = decode_access_token(token)
     
     usuario_id: int = payload.get("usuario_id")
@@ -99,11 +124,37 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return {
+    usuario = {
         "usuario_id": usuario_id,
         "username": username,
         "es_admin": es_admin
     }
+    
+    # Sin exp el token no vence: se verifica siempre en vez de guardarlo
+    exp = payload.get("exp")
+    if exp is not None:
+        _tokens_verificados[token] = (usuario, float(exp))
+        while len(_tokens_verificados) > TOKEN_CACHE_MAX:
+            _tokens_verificados.popitem(last=False)
+    
+    return dict(usuario)
+
+
+def estadisticas_tokens() -> Dict:
+    """
+    Métricas de la caché de tokens verificados (ver /health).
+    
+    Returns:
+        Dict: Tokens guardados, máximo, aciertos, fallos y tasa de aciertos
+    """
+    total = _cache_aciertos + _cache_fallos
+    return {
+        "entradas": len(_tokens_verificados),
+        "max_entradas": TOKEN_CACHE_MAX,
+        "aciertos": _cache_aciertos,
+        "fallos": _cache_fallos,
+        "tasa_aciertos": round(_cache_aciertos / total, 3) if total else 0.0
+    }
 
 
 async def get_current_admin(
@@ -0,0 +1,82 @@
+"""
+Paginación por cursor (keyset) para los listados de la API.
+
+El cursor es opaco para el cliente: codifica la fecha y el id de la
+última fila entregada, y la página siguiente se pide con
+WHERE (fecha, id) < (cursor_fecha, cursor_id), que usa el índice en
+vez de recorrer y descartar filas como haría OFFSET.
+"""
+
+import base64
+import binascii
+from datetime import date
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+# Tamaño de página por defecto y máximo permitido
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(fecha: date, row_id: int) -> str:
+    """
+    Codifica la posición (fecha, id) de la última fila de una página.
+
+    Args:
+        fecha: Fecha de la última fila
+        row_id: ID de la última fila
+
+    Returns:
+        Cursor opaco seguro para URLs
+    """
+    raw = f"{fecha.isoformat()}|{row_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    """
+    Decodifica un cursor generado por encode_cursor.
+
+    Args:
+        cursor: Cursor recibido del cliente
+
+    Returns:
+        Tupla (fecha, id)
+
+    Raises:
+        HTTPException: Si el cursor es inválido
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        fecha, row_id = raw.split('|')
+        return date.fromisoformat(fecha), int(row_id)
+    except (ValueError, UnicodeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
+        )
+
+
+def build_page(rows: List[dict], limit: int, fecha_key: str) -> dict:
+    """
+    Arma la respuesta paginada a partir de limit + 1 filas.
+
+    Args:
+        rows: Filas obtenidas con LIMIT limit + 1
+        limit: Tamaño de página pedido
+        fecha_key: Columna de fecha usada en el orden
+
+    Returns:
+        Dict con items y next_cursor (None si no hay más páginas)
+    """
+    next_cursor: Optional[str] = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last[fecha_key], last['id'])
+
+    return {
+        'items': rows,
+        'next_cursor': next_cursor
+    }
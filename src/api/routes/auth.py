@@ -2,12 +2,13 @@
 Rutas de autenticación (login, registro).
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
-import bcrypt
 
-from src.api.server import get_db
+from src.api.server import get_db_sin_transaccion
 from src.api.middleware.auth import create_access_token
+from src.api.contrasenas import hashear, necesita_rehash, verificar
+from src.api.intentos_login import claves_intento, intentos, verificar_bloqueo
 
 router = APIRouter()
 
@@ -34,29 +35,46 @@ class LoginResponse(BaseModel):
 
 
 @router.post("/login", response_model=LoginResponse)
-async def login(credentials: LoginRequest, db=Depends(get_db)):
+async def login(credentials: LoginRequest, request: Request, db=Depends(get_db_sin_transaccion)):
     """
     Endpoint de login.
     
-    Valida las credenciales y retorna un token JWT.
+    Valida las credenciales y retorna un token JWT. Tras varios intentos
+    fallidos el usuario (o la IP) queda bloqueado por unos minutos.
+    
+    Ninguna conexión del pool queda tomada mientras se espera a bcrypt:
+    cada consulta usa y devuelve la suya.
     """
+    # Rechazar intentos bloqueados antes de consultar usuarios o usar bcrypt
+    # (la ruta aún no tiene conexión tomada: un intento bloqueado no ocupa el pool)
+    ip = request.client.host if request.client else 'desconocida'
+    claves = claves_intento(credentials.username, ip)
+    await verificar_bloqueo(claves)
+    
     # Buscar usuario
-    user = db.fetch_one(
+    user = await db.fetch_one(
         'SELECT id, username, password, nombre, es_admin FROM usuarios WHERE username = %s',
         (credentials.username,)
     )
     
-    if not user:
+    # Validar contraseña (bcrypt corre fuera del event loop)
+    if not user or not await verificar(credentials.password, user['password']):
+        await intentos.registrar_fallo(claves)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuario o contraseña incorrectos"
         )
     
-    # Validar contraseña
-    if not bcrypt.checkpw(credentials.password.encode('utf-8'), user['password'].encode('utf-8')):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Usuario o contraseña incorrectos"
+    # Login correcto: se olvidan los fallos del usuario (no los de la IP)
+    await intentos.limpiar(claves[0][0])
+    
+    # Si cambió BCRYPT_ROUNDS, actualizar el hash ahora que se conoce la contraseña
+    # (primero el hash; la conexión se toma solo para el UPDATE)
+    if necesita_rehash(user['password']):
+        nuevo_hash = await hashear(credentials.password)
+        await db.execute(
+            'UPDATE usuarios SET password = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s',
+            (nuevo_hash, user['id'])
         )
     
     # Crear token JWT
@@ -81,14 +99,15 @@ async def login(credentials: LoginRequest, db=Depends(get_db)):
 
 
 @router.post("/register")
-async def register(data: RegisterRequest, db=Depends(get_db)):
+async def register(data: RegisterRequest, db=Depends(get_db_sin_transaccion)):
     """
     Endpoint de registro de nuevos usuarios.
     
-    Crea un nuevo usuario (cobrador) en el sistema.
+    Crea un nuevo usuario (cobrador) en el sistema. El hash se calcula sin
+    retener una conexión del pool.
     """
     # Verificar que el username no exista
-    existing = db.fetch_one(
+    existing = await db.fetch_one(
         'SELECT id FROM usuarios WHERE username = %s',
         (data.username,)
     )
@@ -100,13 +119,21 @@ async def register(data: RegisterRequest, db=Depends(get_db)):
         )
     
     # Hash de la contraseña
-    hashed_password = bcrypt.hashpw(data.password.encode('utf-8'), bcrypt.gensalt())
+    hashed_password = await hashear(data.password)
     
-    # Insertar usuario
-    db.execute('''
+    # Insertar usuario (otro registro pudo tomar el username mientras se hasheaba)
+    creado = await db.fetch_one('''
         INSERT INTO usuarios (username, password, nombre, es_admin)
         VALUES (%s, %s, %s, %s)
-    ''', (data.username, hashed_password.decode('utf-8'), data.nombre, False))
+        ON CONFLICT (username) DO NOTHING
+        RETURNING id
+    ''', (data.username, hashed_password, data.nombre, False))
+    
+    if not creado:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El nombre de usuario ya existe"
+        )
     
     return {
         "success": True,
@@ -2,7 +2,7 @@
 Rutas de gestión de clientes y préstamos.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import date
@@ -10,6 +10,8 @@ from decimal import Decimal
 
 from src.api.server import get_db
 from src.api.middleware.auth import get_current_user
+from src.api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, build_page
+from src.api.idempotencia import guardar_respuesta, respuesta_previa
 
 router = APIRouter()
 
@@ -53,6 +55,15 @@ class ClienteResponse(BaseModel):
     cuota_minima: float
     dias_plazo: int
     estado: str
+    total_pagado: float = 0
+    saldo_pendiente: Optional[float] = None
+    ultimo_pago_fecha: Optional[date] = None
+
+
+class ClientesPagina(BaseModel):
+    """Página de clientes con cursor para pedir la siguiente."""
+    items: List[ClienteResponse]
+    next_cursor: Optional[str] = None
 
 
 class ClienteDetalladoResponse(ClienteResponse):
@@ -63,25 +74,31 @@ class ClienteDetalladoResponse(ClienteResponse):
     total_a_pagar: float
 
 
-@router.get("/", response_model=List[ClienteResponse])
+@router.get("/", response_model=ClientesPagina)
 async def list_clientes(
     estado: Optional[str] = Query(None, description="Filtrar por estado: activo, pagado, atrasado"),
     search: Optional[str] = Query(None, description="Buscar por nombre o cédula"),
     usuario_id: Optional[int] = Query(None, description="Filtrar por cobrador (solo admin)"),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Clientes por página"),
     current_user: dict = Depends(get_current_user),
     db=Depends(get_db)
 ):
-    """Lista todos los clientes. Admin ve todos, cobrador solo los suyos."""
+    """
+    Lista clientes paginados por (fecha_prestamo, id) descendente.
+    
+    Admin ve todos, cobrador solo los suyos. Para la página siguiente se
+    envía el next_cursor recibido; es None cuando no hay más.
+    """
     current_usuario_id = current_user['usuario_id']
     es_admin = current_user.get('es_admin', False)
     
-    # Construir query con filtros (incluye total pagado)
+    # Construir query con filtros (el saldo ya está guardado en clientes)
     query = '''SELECT c.id, c.usuario_id, c.nombre, c.cedula, c.telefono, c.monto_prestado,
                       c.fecha_prestamo, c.tipo_plazo, c.tasa_interes, c.seguro, c.cuota_minima,
-                      c.dias_plazo, c.estado,
-                      COALESCE(SUM(p.monto), 0) as total_pagado
-               FROM clientes c
-               LEFT JOIN pagos p ON c.id = p.cliente_id'''
+                      c.dias_plazo, c.estado, c.total_pagado, c.saldo_pendiente,
+                      c.ultimo_pago_fecha
+               FROM clientes c'''
     
     # Construir condiciones WHERE
     conditions = []
@@ -106,19 +123,89 @@ async def list_clientes(
         search_pattern = f'%{search}%'
         params.extend([search_pattern, search_pattern])
     
+    # Continuar después de la última fila de la página anterior
+    if cursor:
+        cursor_fecha, cursor_id = decode_cursor(cursor)
+        conditions.append('(c.fecha_prestamo, c.id) < (%s, %s)')
+        params.extend([cursor_fecha, cursor_id])
+    
     # Agregar WHERE si hay condiciones
     if conditions:
         query += ' WHERE ' + ' AND '.join(conditions)
     
-    # Agregar GROUP BY y ORDER BY
-    query += ''' GROUP BY c.id, c.usuario_id, c.nombre, c.cedula, c.telefono, c.monto_prestado,
-                         c.fecha_prestamo, c.tipo_plazo, c.tasa_interes, c.seguro, c.cuota_minima,
-                         c.dias_plazo, c.estado
-                 ORDER BY c.fecha_prestamo DESC'''
+    # Una fila extra para saber si hay página siguiente
+    query += ' ORDER BY c.fecha_prestamo DESC, c.id DESC LIMIT %s'
+    params.append(limit + 1)
+    
+    clientes = await db.fetch_all(query, tuple(params))
+    
+    return build_page(clientes, limit, 'fecha_prestamo')
+
+
+def _escapar_like(texto: str) -> str:
+    """Escapa los comodines de LIKE para buscar el texto literal."""
+    return texto.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+@router.get("/buscar", response_model=List[ClienteResponse])
+async def buscar_clientes(
+    q: str = Query(..., min_length=3, description="Nombre, cédula o teléfono (mínimo 3 caracteres)"),
+    limit: int = Query(10, ge=1, le=20, description="Máximo de resultados"),
+    usuario_id: Optional[int] = Query(None, description="Filtrar por cobrador (solo admin)"),
+    current_user: dict = Depends(get_current_user),
+    db=Depends(get_db)
+):
+    """
+    Búsqueda rápida de clientes para autocompletar.
+    
+    Primero intenta la cédula exacta; si no hay coincidencia busca por
+    nombre, cédula o teléfono con los índices de trigramas, ordenando
+    primero los nombres que empiezan por el texto y luego por similitud.
+    Admin busca en todos los clientes (o en los de usuario_id), cobrador
+    solo en los suyos.
+    """
+    termino = q.strip()
+    es_admin = current_user.get('es_admin', False)
     
-    clientes = db.fetch_all(query, tuple(params))
+    columnas = '''c.id, c.usuario_id, c.nombre, c.cedula, c.telefono, c.monto_prestado,
+                  c.fecha_prestamo, c.tipo_plazo, c.tasa_interes, c.seguro, c.cuota_minima,
+                  c.dias_plazo, c.estado, c.total_pagado, c.saldo_pendiente,
+                  c.ultimo_pago_fecha'''
     
-    return clientes
+    # Limitar a la cartera del cobrador
+    filtro_usuario = ''
+    params_usuario = []
+    if not es_admin:
+        filtro_usuario = ' AND c.usuario_id = %s'
+        params_usuario.append(current_user['usuario_id'])
+    elif usuario_id:
+        filtro_usuario = ' AND c.usuario_id = %s'
+        params_usuario.append(usuario_id)
+    
+    # Cédula exacta (usa el índice normal de cédula)
+    exactos = await db.fetch_all(
+        f'SELECT {columnas} FROM clientes c WHERE c.cedula = %s{filtro_usuario} LIMIT %s',
+        (termino, *params_usuario, limit)
+    )
+    if exactos:
+        return exactos
+    
+    contiene = f'%{_escapar_like(termino)}%'
+    empieza = f'{_escapar_like(termino)}%'
+    
+    return await db.fetch_all(f'''
+        SELECT {columnas}
+        FROM clientes c
+        WHERE (c.nombre ILIKE %s OR c.cedula ILIKE %s OR c.telefono ILIKE %s
+               OR c.nombre %% %s){filtro_usuario}
+        ORDER BY c.nombre ILIKE %s DESC,
+                 GREATEST(similarity(c.nombre, %s),
+                          similarity(c.cedula, %s),
+                          similarity(c.telefono, %s)) DESC,
+                 c.nombre
+        LIMIT %s
+    ''', (contiene, contiene, contiene, termino, *params_usuario,
+          empieza, termino, termino, termino, limit))
 
 
 @router.get("/{cliente_id}", response_model=ClienteDetalladoResponse)
@@ -133,19 +220,19 @@ async def get_cliente(
     
     # Obtener cliente
     if es_admin:
-        cliente = db.fetch_one(
+        cliente = await db.fetch_one(
             '''SELECT id, usuario_id, nombre, cedula, telefono, monto_prestado,
                       fecha_prestamo, tipo_plazo, tasa_interes, seguro, cuota_minima,
-                      dias_plazo, estado
+                      dias_plazo, estado, total_pagado, saldo_pendiente, ultimo_pago_fecha
                FROM clientes
                WHERE id = %s''',
             (cliente_id,)
         )
     else:
-        cliente = db.fetch_one(
+        cliente = await db.fetch_one(
             '''SELECT id, usuario_id, nombre, cedula, telefono, monto_prestado,
                       fecha_prestamo, tipo_plazo, tasa_interes, seguro, cuota_minima,
-                      dias_plazo, estado
+                      dias_plazo, estado, total_pagado, saldo_pendiente, ultimo_pago_fecha
                FROM clientes
                WHERE id = %s AND usuario_id = %s''',
             (cliente_id, usuario_id)
@@ -154,21 +241,12 @@ async def get_cliente(
     if not cliente:
         raise HTTPException(status_code=404, detail="Cliente no encontrado")
     
-    # Calcular total pagado
-    total_pagado_result = db.fetch_one(
-        'SELECT COALESCE(SUM(monto), 0) as total FROM pagos WHERE cliente_id = %s',
-        (cliente_id,)
-    )
-    total_pagado = float(total_pagado_result['total']) if total_pagado_result else 0.0
-    
-    # Calcular total a pagar (monto + interés, sin seguro ya que es descuento automático)
-    monto = float(cliente['monto_prestado'])
-    interes = monto * float(cliente['tasa_interes'])
-    seguro = float(cliente['seguro'])
-    total_a_pagar = monto + interes
+    # Totales guardados en el cliente (mantenidos en cada pago)
+    total_pagado = float(cliente['total_pagado'])
+    saldo_pendiente = float(cliente['saldo_pendiente'])
     
-    # Calcular saldo pendiente
-    saldo_pendiente = total_a_pagar - total_pagado
+    # Total a pagar: monto + interés (sin seguro ya que es descuento automático)
+    total_a_pagar = total_pagado + saldo_pendiente
     
     # Calcular días transcurridos
     from datetime import date as dt_date
@@ -186,14 +264,23 @@ async def get_cliente(
 @router.post("/", response_model=ClienteResponse)
 async def create_cliente(
     data: ClienteSimpleRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=100),
     current_user: dict = Depends(get_current_user),
     db=Depends(get_db)
 ):
-    """Crea un nuevo cliente con préstamo (simplificado con cálculos automáticos)."""
+    """
+    Crea un nuevo cliente con préstamo (simplificado con cálculos automáticos).
+    
+    Con Idempotency-Key, un reintento retorna el cliente ya creado.
+    """
     from datetime import date as dt_date
     
     usuario_id = current_user['usuario_id']
     
+    previa = await respuesta_previa(db, usuario_id, idempotency_key, 'POST /api/clientes')
+    if previa is not None:
+        return previa
+    
     # Calcular campos automáticamente
     fecha_prestamo = dt_date.today()
     
@@ -216,7 +303,7 @@ async def create_cliente(
     seguro = cuota_minima
     
     # Insertar cliente
-    db.execute('''
+    await db.execute('''
         INSERT INTO clientes (
             usuario_id, nombre, cedula, telefono, monto_prestado,
             fecha_prestamo, tipo_plazo, tasa_interes, seguro,
@@ -230,17 +317,17 @@ async def create_cliente(
     ))
     
     # Obtener cliente creado
-    cliente = db.fetch_one(
+    cliente = await db.fetch_one(
         '''SELECT id, usuario_id, nombre, cedula, telefono, monto_prestado,
                   fecha_prestamo, tipo_plazo, tasa_interes, seguro, cuota_minima,
-                  dias_plazo, estado
+                  dias_plazo, estado, total_pagado, saldo_pendiente, ultimo_pago_fecha
            FROM clientes
            WHERE cedula = %s AND usuario_id = %s
            ORDER BY id DESC LIMIT 1''',
         (data.cedula, usuario_id)
     )
     
-    return cliente
+    return await guardar_respuesta(db, usuario_id, idempotency_key, cliente)
 
 
 @router.put("/{cliente_id}", response_model=ClienteResponse)
@@ -254,7 +341,7 @@ async def update_cliente(
     usuario_id = current_user['usuario_id']
     
     # Verificar que el cliente exista y pertenezca al usuario
-    cliente = db.fetch_one(
+    cliente = await db.fetch_one(
         'SELECT id FROM clientes WHERE id = %s AND usuario_id = %s',
         (cliente_id, usuario_id)
     )
@@ -263,7 +350,7 @@ async def update_cliente(
         raise HTTPException(status_code=404, detail="Cliente no encontrado")
     
     # Actualizar cliente
-    db.execute('''
+    await db.execute('''
         UPDATE clientes SET
             nombre = %s, cedula = %s, telefono = %s, monto_prestado = %s,
             fecha_prestamo = %s, tipo_plazo = %s, tasa_interes = %s,
@@ -278,10 +365,10 @@ async def update_cliente(
     ))
     
     # Obtener cliente actualizado
-    cliente_updated = db.fetch_one(
+    cliente_updated = await db.fetch_one(
         '''SELECT id, usuario_id, nombre, cedula, telefono, monto_prestado,
                   fecha_prestamo, tipo_plazo, tasa_interes, seguro, cuota_minima,
-                  dias_plazo, estado
+                  dias_plazo, estado, total_pagado, saldo_pendiente, ultimo_pago_fecha
            FROM clientes WHERE id = %s''',
         (cliente_id,)
     )
@@ -300,7 +387,7 @@ async def update_cliente_estado(
     usuario_id = current_user['usuario_id']
     
     # Verificar que el cliente exista
-    cliente = db.fetch_one(
+    cliente = await db.fetch_one(
         'SELECT id FROM clientes WHERE id = %s AND usuario_id = %s',
         (cliente_id, usuario_id)
     )
@@ -309,7 +396,7 @@ async def update_cliente_estado(
         raise HTTPException(status_code=404, detail="Cliente no encontrado")
     
     # Actualizar estado
-    db.execute(
+    await db.execute(
         'UPDATE clientes SET estado = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s',
         (estado, cliente_id)
     )
@@ -330,7 +417,7 @@ async def delete_cliente(
     usuario_id = current_user['usuario_id']
     
     # Verificar que el cliente exista
-    cliente = db.fetch_one(
+    cliente = await db.fetch_one(
         'SELECT id FROM clientes WHERE id = %s AND usuario_id = %s',
         (cliente_id, usuario_id)
     )
@@ -339,7 +426,7 @@ async def delete_cliente(
         raise HTTPException(status_code=404, detail="Cliente no encontrado")
     
     # Eliminar cliente (los pagos se eliminan automáticamente por CASCADE)
-    db.execute('DELETE FROM clientes WHERE id = %s', (cliente_id,))
+    await db.execute('DELETE FROM clientes WHERE id = %s', (cliente_id,))
     
     return {
         "success": True,
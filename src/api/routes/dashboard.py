@@ -0,0 +1,82 @@
+"""
+Rutas del tablero principal (resumen del día y de la semana).
+"""
+
+from fastapi import APIRouter, Depends
+
+from src.api.server import get_db
+from src.api.middleware.auth import get_current_user
+
+router = APIRouter()
+
+
+@router.get("")
+async def get_dashboard(
+    current_user: dict = Depends(get_current_user),
+    db=Depends(get_db)
+):
+    """
+    Resumen del día, de la semana y dinero en mano en una sola consulta.
+
+    Reemplaza las llamadas a /api/pagos/resumen/hoy y /resumen/semanal
+    de la pantalla principal. Admin ve el total de todos.
+    """
+    usuario_id = current_user['usuario_id']
+    es_admin = current_user.get('es_admin', False)
+
+    # Cobrador: limitar cada tabla a sus datos
+    filtro_clientes = '' if es_admin else ' AND c.usuario_id = %s'
+    filtro_resumen = '' if es_admin else ' AND r.usuario_id = %s'
+    params = () if es_admin else (usuario_id,) * 3
+
+    # Los montos salen del resumen diario (unas pocas filas por cobrador);
+    # solo los clientes que pagaron en la semana requieren leer pagos
+    row = await db.fetch_one(f'''
+        SELECT CURRENT_DATE AS fecha,
+            COALESCE(SUM(r.efectivo) FILTER (WHERE r.fecha = CURRENT_DATE), 0) AS hoy_efectivo,
+            COALESCE(SUM(r.digital) FILTER (WHERE r.fecha = CURRENT_DATE), 0) AS hoy_digital,
+            COALESCE(SUM(r.efectivo + r.digital) FILTER (WHERE r.fecha = CURRENT_DATE), 0) AS hoy_total,
+            COALESCE(SUM(r.num_pagos) FILTER (WHERE r.fecha = CURRENT_DATE), 0) AS hoy_num_pagos,
+            COALESCE(SUM(r.efectivo), 0) AS semana_efectivo,
+            COALESCE(SUM(r.digital), 0) AS semana_digital,
+            COALESCE(SUM(r.efectivo + r.digital), 0) AS semana_total,
+            COALESCE(SUM(r.gastos), 0) AS gastos,
+            COALESCE(SUM(r.base), 0) AS base,
+            (SELECT COUNT(*) FROM clientes c
+             WHERE c.estado = 'activo'{filtro_clientes}) AS clientes_activos,
+            (SELECT COUNT(DISTINCT p.cliente_id)
+             FROM pagos p
+             JOIN clientes c ON p.cliente_id = c.id
+             WHERE p.fecha >= DATE_TRUNC('week', CURRENT_DATE){filtro_clientes}) AS clientes_pagaron
+        FROM resumen_diario r
+        WHERE r.fecha >= DATE_TRUNC('week', CURRENT_DATE){filtro_resumen}
+    ''', params)
+
+    base = float(row['base'])
+    gastos = float(row['gastos'])
+    efectivo = float(row['semana_efectivo'])
+    cobrado = float(row['semana_total'])
+
+    return {
+        "fecha": row['fecha'].isoformat(),
+        "hoy": {
+            "efectivo": float(row['hoy_efectivo']),
+            "digital": float(row['hoy_digital']),
+            "total_cobrado": float(row['hoy_total']),
+            "num_pagos": row['hoy_num_pagos'],
+            "clientes_activos": row['clientes_activos']
+        },
+        "semanal": {
+            "efectivo": efectivo,
+            "digital": float(row['semana_digital']),
+            "total_cobrado": cobrado,
+            "clientes_pagaron": row['clientes_pagaron'],
+            "gastos": gastos,
+            "base": base,
+            "neto": cobrado - gastos
+        },
+        "en_mano": {
+            "total": base + cobrado - gastos,
+            "efectivo_real": base + efectivo - gastos
+        }
+    }
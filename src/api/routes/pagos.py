@@ -2,57 +2,22 @@
 Rutas de gestión de pagos.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import date
 from decimal import Decimal
 
 from src.api.server import get_db
 from src.api.middleware.auth import get_current_user
+from src.api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, build_page
+from src.api.idempotencia import (
+    guardar_respuesta, guardar_respuestas, liberar_claves, reservar_claves, respuesta_previa
+)
 
 router = APIRouter()
 
 
-def actualizar_estado_cliente(db, cliente_id: int):
-    """
-    Actualiza el estado del cliente según su saldo pendiente.
-    
-    Estados:
-    - 'pagado': Si el total pagado >= total a pagar
-    - 'activo': Si tiene saldo pendiente
-    """
-    # Obtener información del cliente
-    cliente = db.fetch_one(
-        '''SELECT monto_prestado, tasa_interes, seguro FROM clientes WHERE id = %s''',
-        (cliente_id,)
-    )
-    
-    if not cliente:
-        return
-    
-    # Calcular total a pagar (monto + interés, sin seguro ya que es descuento automático)
-    monto = float(cliente['monto_prestado'])
-    interes = monto * float(cliente['tasa_interes'])
-    seguro = float(cliente['seguro'])
-    total_a_pagar = monto + interes
-    
-    # Calcular total pagado
-    total_pagado_result = db.fetch_one(
-        'SELECT COALESCE(SUM(monto), 0) as total FROM pagos WHERE cliente_id = %s',
-        (cliente_id,)
-    )
-    total_pagado = float(total_pagado_result['total']) if total_pagado_result else 0.0
-    
-    # Actualizar estado
-    nuevo_estado = 'pagado' if total_pagado >= total_a_pagar else 'activo'
-    
-    db.execute(
-        'UPDATE clientes SET estado = %s WHERE id = %s',
-        (nuevo_estado, cliente_id)
-    )
-
-
 class PagoRequest(BaseModel):
     """Modelo para registrar un pago."""
     cliente_id: int
@@ -61,6 +26,17 @@ class PagoRequest(BaseModel):
     fecha: Optional[date] = None
 
 
+class PagoLoteItem(PagoRequest):
+    """Pago dentro de un lote (/batch)."""
+    # Equivale al header Idempotency-Key de POST / (mismo largo máximo)
+    idempotency_key: Optional[str] = Field(None, max_length=100)
+
+
+# Operación con la que se guardan las claves de idempotencia de los pagos
+# (la misma en POST / y en /batch: un pago reintentado por la otra vía no se duplica)
+RUTA_PAGO = 'POST /api/pagos'
+
+
 class PagoResponse(BaseModel):
     """Modelo de respuesta de pago."""
     id: int
@@ -71,15 +47,55 @@ class PagoResponse(BaseModel):
     cliente_nombre: Optional[str] = None
 
 
-@router.get("/", response_model=List[PagoResponse])
+class PagosPagina(BaseModel):
+    """Página de pagos con cursor para pedir la siguiente."""
+    items: List[PagoResponse]
+    next_cursor: Optional[str] = None
+
+
+class PagosLoteRequest(BaseModel):
+    """Modelo para registrar varios pagos en una sola petición."""
+    pagos: List[PagoLoteItem]
+
+
+class PagoLoteResultado(BaseModel):
+    """Resultado de un pago del lote (en el mismo orden del pedido)."""
+    indice: int
+    success: bool
+    pago: Optional[PagoResponse] = None
+    error: Optional[str] = None
+
+
+class PagosLoteResponse(BaseModel):
+    """Modelo de respuesta del registro por lotes."""
+    resultados: List[PagoLoteResultado]
+    registrados: int
+    fallidos: int
+
+
+# Máximo de pagos por lote
+MAX_PAGOS_LOTE = 500
+
+TIPOS_PAGO = ('efectivo', 'digital')
+
+
+@router.get("/", response_model=PagosPagina)
 async def list_pagos(
     cliente_id: Optional[int] = Query(None, description="Filtrar por cliente"),
     fecha_inicio: Optional[date] = Query(None, description="Fecha inicial"),
     fecha_fin: Optional[date] = Query(None, description="Fecha final"),
+    tipo_pago: Optional[str] = Query(None, description="Filtrar por tipo: efectivo o digital"),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Pagos por página"),
     current_user: dict = Depends(get_current_user),
     db=Depends(get_db)
 ):
-    """Lista pagos. Admin ve todos, cobrador solo los suyos."""
+    """
+    Lista pagos paginados por (fecha, id) descendente.
+    
+    Admin ve todos, cobrador solo los suyos. Para la página siguiente se
+    envía el next_cursor recibido; es None cuando no hay más.
+    """
     usuario_id = current_user['usuario_id']
     es_admin = current_user.get('es_admin', False)
     
@@ -110,10 +126,22 @@ async def list_pagos(
         query += ' AND p.fecha <= %s'
         params.append(fecha_fin)
     
-    query += ' ORDER BY p.fecha DESC, p.id DESC'
+    if tipo_pago:
+        query += ' AND p.tipo_pago = %s'
+        params.append(tipo_pago)
     
-    pagos = db.fetch_all(query, tuple(params))
-    return pagos
+    # Continuar después de la última fila de la página anterior
+    if cursor:
+        cursor_fecha, cursor_id = decode_cursor(cursor)
+        query += ' AND (p.fecha, p.id) < (%s, %s)'
+        params.extend([cursor_fecha, cursor_id])
+    
+    # Una fila extra para saber si hay página siguiente
+    query += ' ORDER BY p.fecha DESC, p.id DESC LIMIT %s'
+    params.append(limit + 1)
+    
+    pagos = await db.fetch_all(query, tuple(params))
+    return build_page(pagos, limit, 'fecha')
 
 
 @router.get("/cliente/{cliente_id}", response_model=List[PagoResponse])
@@ -126,7 +154,7 @@ async def get_pagos_by_cliente(
     usuario_id = current_user['usuario_id']
     
     # Verificar que el cliente pertenezca al usuario
-    cliente = db.fetch_one(
+    cliente = await db.fetch_one(
         'SELECT id FROM clientes WHERE id = %s AND usuario_id = %s',
         (cliente_id, usuario_id)
     )
@@ -135,7 +163,7 @@ async def get_pagos_by_cliente(
         raise HTTPException(status_code=404, detail="Cliente no encontrado")
     
     # Obtener pagos
-    pagos = db.fetch_all(
+    pagos = await db.fetch_all(
         '''SELECT p.id, p.cliente_id, p.fecha, p.monto, p.tipo_pago, c.nombre as cliente_nombre
            FROM pagos p
            JOIN clientes c ON p.cliente_id = c.id
@@ -150,44 +178,196 @@ async def get_pagos_by_cliente(
 @router.post("/", response_model=PagoResponse)
 async def create_pago(
     data: PagoRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=100),
     current_user: dict = Depends(get_current_user),
     db=Depends(get_db)
 ):
-    """Registra un nuevo pago."""
-    usuario_id = current_user['usuario_id']
+    """
+    Registra un nuevo pago en una sola sentencia.
     
-    # Verificar que el cliente pertenezca al usuario
-    cliente = db.fetch_one(
-        'SELECT id, nombre FROM clientes WHERE id = %s AND usuario_id = %s',
-        (data.cliente_id, usuario_id)
-    )
+    El UPDATE sobre el cliente verifica que sea del usuario, lo bloquea y
+    acumula el pago en total_pagado; como en READ COMMITTED el UPDATE se
+    reevalúa sobre la última versión de la fila, los pagos simultáneos de
+    un mismo cliente se serializan y el estado nunca queda desactualizado.
+    Con Idempotency-Key, un reintento retorna el pago ya registrado.
+    """
+    # Las mismas validaciones que /batch
+    if data.monto <= 0:
+        raise HTTPException(status_code=400, detail="El monto debe ser mayor a cero")
+    if data.tipo_pago not in TIPOS_PAGO:
+        raise HTTPException(status_code=400, detail="Tipo de pago inválido")
     
-    if not cliente:
-        raise HTTPException(status_code=404, detail="Cliente no encontrado")
+    usuario_id = current_user['usuario_id']
+    
+    previa = await respuesta_previa(db, usuario_id, idempotency_key, RUTA_PAGO)
+    if previa is not None:
+        return previa
     
     # Usar fecha actual si no se proporciona
     fecha = data.fecha or date.today()
     
-    # Insertar pago
-    db.execute('''
-        INSERT INTO pagos (cliente_id, fecha, monto, tipo_pago)
-        VALUES (%s, %s, %s, %s)
-    ''', (data.cliente_id, fecha, data.monto, data.tipo_pago))
+    # Acumular saldo y estado ('pagado' si lo pagado cubre monto + interés;
+    # el seguro no cuenta porque se descontó al prestar), insertar el pago
+    # y retornarlo con el nombre del cliente
+    pago = await db.fetch_one('''
+        WITH cliente AS (
+            UPDATE clientes
+            SET total_pagado = total_pagado + %s::numeric,
+                ultimo_pago_fecha = GREATEST(ultimo_pago_fecha, %s::date),
+                estado = CASE
+                    WHEN total_pagado + %s::numeric >= monto_prestado + monto_prestado * tasa_interes
+                    THEN 'pagado' ELSE 'activo'
+                END
+            WHERE id = %s AND usuario_id = %s
+            RETURNING id, nombre
+        ), nuevo AS (
+            INSERT INTO pagos (cliente_id, fecha, monto, tipo_pago)
+            SELECT id, %s::date, %s::numeric, %s FROM cliente
+            RETURNING id, cliente_id, fecha, monto, tipo_pago
+        )
+        SELECT nuevo.id, nuevo.cliente_id, nuevo.fecha, nuevo.monto, nuevo.tipo_pago,
+               cliente.nombre AS cliente_nombre
+        FROM nuevo
+        JOIN cliente ON cliente.id = nuevo.cliente_id
+    ''', (
+        data.monto, fecha, data.monto, data.cliente_id, usuario_id,
+        fecha, data.monto, data.tipo_pago
+    ))
     
-    # Actualizar estado del cliente según el saldo
-    actualizar_estado_cliente(db, data.cliente_id)
+    if not pago:
+        raise HTTPException(status_code=404, detail="Cliente no encontrado")
     
-    # Obtener pago creado
-    pago = db.fetch_one(
-        '''SELECT p.id, p.cliente_id, p.fecha, p.monto, p.tipo_pago, c.nombre as cliente_nombre
-           FROM pagos p
-           JOIN clientes c ON p.cliente_id = c.id
-           WHERE p.cliente_id = %s
-           ORDER BY p.id DESC LIMIT 1''',
-        (data.cliente_id,)
-    )
+    return await guardar_respuesta(db, usuario_id, idempotency_key, pago)
+
+
+@router.post("/batch", response_model=PagosLoteResponse)
+async def create_pagos_lote(
+    data: PagosLoteRequest,
+    current_user: dict = Depends(get_current_user),
+    db=Depends(get_db)
+):
+    """
+    Registra varios pagos en una transacción (fin de ruta o cola sin conexión).
+    
+    Verifica en una consulta que todos los clientes sean del usuario (y los
+    bloquea en orden de id, como haría create_pago con cada uno), inserta
+    los pagos válidos con un solo INSERT y actualiza saldo y estado una vez
+    por cliente. Retorna el resultado de cada pago en el orden recibido; los
+    pagos inválidos no impiden registrar los demás. Los pagos con una
+    idempotency_key ya usada retornan el pago registrado originalmente.
+    """
+    if len(data.pagos) > MAX_PAGOS_LOTE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Máximo {MAX_PAGOS_LOTE} pagos por lote"
+        )
     
-    return pago
+    usuario_id = current_user['usuario_id']
+    hoy = date.today()
+    
+    # Reservar las claves de idempotencia del lote en una consulta
+    claves = list(dict.fromkeys(p.idempotency_key for p in data.pagos if p.idempotency_key))
+    previas = await reservar_claves(db, usuario_id, claves, RUTA_PAGO) if claves else {}
+    
+    # Clientes del usuario entre los pedidos (bloqueados hasta el final)
+    cliente_ids = sorted({p.cliente_id for p in data.pagos})
+    propios = await db.fetch_all('''
+        SELECT id FROM clientes
+        WHERE id = ANY(%s) AND usuario_id = %s
+        ORDER BY id
+        FOR UPDATE
+    ''', (cliente_ids, usuario_id))
+    propios = {c['id'] for c in propios}
+    
+    resultados = [None] * len(data.pagos)
+    validos = []
+    en_lote = set()
+    for indice, pago in enumerate(data.pagos):
+        clave = pago.idempotency_key
+        if clave and clave in en_lote:
+            error = "Idempotency-Key repetida en el lote"
+        elif clave in previas:
+            if previas[clave]['ruta'] != RUTA_PAGO:
+                error = "Idempotency-Key ya usada en otra operación"
+            else:
+                # Reintento: el pago ya se registró
+                resultados[indice] = {'indice': indice, 'success': True, 'pago': previas[clave]['respuesta']}
+                en_lote.add(clave)
+                continue
+        elif pago.cliente_id not in propios:
+            error = "Cliente no encontrado"
+        elif pago.monto <= 0:
+            error = "El monto debe ser mayor a cero"
+        elif pago.tipo_pago not in TIPOS_PAGO:
+            error = "Tipo de pago inválido"
+        else:
+            validos.append((indice, pago))
+            if clave:
+                en_lote.add(clave)
+            continue
+        if clave:
+            en_lote.add(clave)
+        resultados[indice] = {'indice': indice, 'success': False, 'error': error}
+    
+    # Las claves de los pagos rechazados quedan libres para reintentar
+    claves_validas = {p.idempotency_key for _, p in validos}
+    await liberar_claves(db, usuario_id, [
+        clave for clave in claves if clave not in previas and clave not in claves_validas
+    ])
+    
+    if validos:
+        # Los ids se toman antes de insertar para devolver cada pago en su
+        # posición; saldo y estado se recalculan una vez por cliente
+        insertados = await db.fetch_all('''
+            WITH datos AS (
+                SELECT nextval(pg_get_serial_sequence('pagos', 'id')) AS id, t.*
+                FROM unnest(%s::int[], %s::int[], %s::date[], %s::numeric[], %s::text[])
+                     AS t(indice, cliente_id, fecha, monto, tipo_pago)
+            ), nuevos AS (
+                INSERT INTO pagos (id, cliente_id, fecha, monto, tipo_pago)
+                SELECT id, cliente_id, fecha, monto, tipo_pago FROM datos
+            ), totales AS (
+                SELECT cliente_id, SUM(monto) AS total, MAX(fecha) AS ultima
+                FROM datos
+                GROUP BY cliente_id
+            ), cliente AS (
+                UPDATE clientes c
+                SET total_pagado = c.total_pagado + t.total,
+                    ultimo_pago_fecha = GREATEST(c.ultimo_pago_fecha, t.ultima),
+                    estado = CASE
+                        WHEN c.total_pagado + t.total >= c.monto_prestado + c.monto_prestado * c.tasa_interes
+                        THEN 'pagado' ELSE 'activo'
+                    END
+                FROM totales t
+                WHERE c.id = t.cliente_id
+                RETURNING c.id, c.nombre
+            )
+            SELECT datos.indice, datos.id, datos.cliente_id, datos.fecha, datos.monto,
+                   datos.tipo_pago, cliente.nombre AS cliente_nombre
+            FROM datos
+            JOIN cliente ON cliente.id = datos.cliente_id
+        ''', (
+            [indice for indice, _ in validos],
+            [p.cliente_id for _, p in validos],
+            [p.fecha or hoy for _, p in validos],
+            [p.monto for _, p in validos],
+            [p.tipo_pago for _, p in validos]
+        ))
+    
+        respuestas = {}
+        for fila in insertados:
+            indice = fila.pop('indice')
+            resultados[indice] = {'indice': indice, 'success': True, 'pago': fila}
+            if data.pagos[indice].idempotency_key:
+                respuestas[data.pagos[indice].idempotency_key] = fila
+        await guardar_respuestas(db, usuario_id, respuestas)
+    
+    registrados = sum(1 for r in resultados if r['success'])
+    return {
+        'resultados': resultados,
+        'registrados': registrados,
+        'fallidos': len(resultados) - registrados
+    }
 
 
 @router.delete("/{pago_id}")
@@ -196,23 +376,36 @@ async def delete_pago(
     current_user: dict = Depends(get_current_user),
     db=Depends(get_db)
 ):
-    """Elimina un pago."""
+    """Elimina un pago y descuenta su monto del saldo del cliente."""
     usuario_id = current_user['usuario_id']
     
-    # Verificar que el pago exista y pertenezca a un cliente del usuario
-    pago = db.fetch_one(
-        '''SELECT p.id FROM pagos p
-           JOIN clientes c ON p.cliente_id = c.id
-           WHERE p.id = %s AND c.usuario_id = %s''',
-        (pago_id, usuario_id)
-    )
+    # Eliminar el pago (solo si es de un cliente del usuario) y actualizar
+    # total pagado, fecha del último pago y estado del cliente
+    cliente = await db.fetch_one('''
+        WITH borrado AS (
+            DELETE FROM pagos p
+            USING clientes c
+            WHERE p.id = %s AND p.cliente_id = c.id AND c.usuario_id = %s
+            RETURNING p.id, p.cliente_id, p.monto
+        )
+        UPDATE clientes c
+        SET total_pagado = c.total_pagado - borrado.monto,
+            ultimo_pago_fecha = (
+                SELECT MAX(p.fecha) FROM pagos p
+                WHERE p.cliente_id = c.id AND p.id <> borrado.id
+            ),
+            estado = CASE
+                WHEN c.total_pagado - borrado.monto >= c.monto_prestado + c.monto_prestado * c.tasa_interes
+                THEN 'pagado' ELSE 'activo'
+            END
+        FROM borrado
+        WHERE c.id = borrado.cliente_id
+        RETURNING c.id
+    ''', (pago_id, usuario_id))
     
-    if not pago:
+    if not cliente:
         raise HTTPException(status_code=404, detail="Pago no encontrado")
     
-    # Eliminar pago
-    db.execute('DELETE FROM pagos WHERE id = %s', (pago_id,))
-    
     return {
         "success": True,
         "message": "Pago eliminado exitosamente"
@@ -229,39 +422,38 @@ async def get_resumen_hoy(
     es_admin = current_user.get('es_admin', False)
     fecha_hoy = date.today()
     
-    # Total cobrado hoy
+    # Total cobrado hoy (desde el resumen diario)
     if es_admin:
-        result = db.fetch_one(
+        result = await db.fetch_one(
             '''SELECT 
-                COALESCE(SUM(CASE WHEN p.tipo_pago = 'efectivo' THEN p.monto ELSE 0 END), 0) as efectivo,
-                COALESCE(SUM(CASE WHEN p.tipo_pago = 'digital' THEN p.monto ELSE 0 END), 0) as digital,
-                COALESCE(SUM(p.monto), 0) as total,
-                COUNT(p.id) as num_pagos
-               FROM pagos p
-               WHERE p.fecha = %s''',
+                COALESCE(SUM(efectivo), 0) as efectivo,
+                COALESCE(SUM(digital), 0) as digital,
+                COALESCE(SUM(efectivo + digital), 0) as total,
+                COALESCE(SUM(num_pagos), 0) as num_pagos
+               FROM resumen_diario
+               WHERE fecha = %s''',
             (fecha_hoy,)
         )
     else:
-        result = db.fetch_one(
+        result = await db.fetch_one(
             '''SELECT 
-                COALESCE(SUM(CASE WHEN p.tipo_pago = 'efectivo' THEN p.monto ELSE 0 END), 0) as efectivo,
-                COALESCE(SUM(CASE WHEN p.tipo_pago = 'digital' THEN p.monto ELSE 0 END), 0) as digital,
-                COALESCE(SUM(p.monto), 0) as total,
-                COUNT(p.id) as num_pagos
-               FROM pagos p
-               JOIN clientes c ON p.cliente_id = c.id
-               WHERE c.usuario_id = %s AND p.fecha = %s''',
+                COALESCE(SUM(efectivo), 0) as efectivo,
+                COALESCE(SUM(digital), 0) as digital,
+                COALESCE(SUM(efectivo + digital), 0) as total,
+                COALESCE(SUM(num_pagos), 0) as num_pagos
+               FROM resumen_diario
+               WHERE usuario_id = %s AND fecha = %s''',
             (usuario_id, fecha_hoy)
         )
     
     # Clientes activos
     if es_admin:
-        clientes_activos = db.fetch_one(
+        clientes_activos = await db.fetch_one(
             '''SELECT COUNT(*) as total
                FROM clientes
                WHERE estado = 'activo' ''')
     else:
-        clientes_activos = db.fetch_one(
+        clientes_activos = await db.fetch_one(
             '''SELECT COUNT(*) as total
                FROM clientes
                WHERE usuario_id = %s AND estado = 'activo' ''',
@@ -287,58 +479,38 @@ async def get_resumen_semanal(
     usuario_id = current_user['usuario_id']
     es_admin = current_user.get('es_admin', False)
     
-    # Obtener cobros de la semana
+    # Cobros, gastos y base de la semana desde el resumen diario; solo
+    # los clientes que pagaron requieren leer pagos
     if es_admin:
-        result = db.fetch_one(
+        result = await db.fetch_one(
             '''SELECT 
-                COALESCE(SUM(CASE WHEN p.tipo_pago = 'efectivo' THEN p.monto ELSE 0 END), 0) as efectivo,
-                COALESCE(SUM(CASE WHEN p.tipo_pago = 'digital' THEN p.monto ELSE 0 END), 0) as digital,
-                COALESCE(SUM(p.monto), 0) as total,
-                COUNT(DISTINCT p.cliente_id) as clientes_pagaron
-               FROM pagos p
-               WHERE p.fecha >= DATE_TRUNC('week', CURRENT_DATE)''')
+                COALESCE(SUM(r.efectivo), 0) as efectivo,
+                COALESCE(SUM(r.digital), 0) as digital,
+                COALESCE(SUM(r.efectivo + r.digital), 0) as total,
+                COALESCE(SUM(r.gastos), 0) as gastos,
+                COALESCE(SUM(r.base), 0) as base,
+                (SELECT COUNT(DISTINCT p.cliente_id)
+                 FROM pagos p
+                 WHERE p.fecha >= DATE_TRUNC('week', CURRENT_DATE)) as clientes_pagaron
+               FROM resumen_diario r
+               WHERE r.fecha >= DATE_TRUNC('week', CURRENT_DATE)''')
     else:
-        result = db.fetch_one(
+        result = await db.fetch_one(
             '''SELECT 
-                COALESCE(SUM(CASE WHEN p.tipo_pago = 'efectivo' THEN p.monto ELSE 0 END), 0) as efectivo,
-                COALESCE(SUM(CASE WHEN p.tipo_pago = 'digital' THEN p.monto ELSE 0 END), 0) as digital,
-                COALESCE(SUM(p.monto), 0) as total,
-                COUNT(DISTINCT p.cliente_id) as clientes_pagaron
-               FROM pagos p
-               JOIN clientes c ON p.cliente_id = c.id
-               WHERE c.usuario_id = %s 
-               AND p.fecha >= DATE_TRUNC('week', CURRENT_DATE)''',
-            (usuario_id,)
-        )
-    
-    # Gastos de la semana
-    if es_admin:
-        gastos = db.fetch_one(
-            '''SELECT COALESCE(SUM(monto), 0) as total
-               FROM gastos_semanales
-               WHERE fecha >= DATE_TRUNC('week', CURRENT_DATE)''')
-    else:
-        gastos = db.fetch_one(
-            '''SELECT COALESCE(SUM(monto), 0) as total
-               FROM gastos_semanales
-               WHERE usuario_id = %s
-               AND fecha >= DATE_TRUNC('week', CURRENT_DATE)''',
-            (usuario_id,)
-        )
-    
-    # Base semanal
-    if es_admin:
-        base = db.fetch_one(
-            '''SELECT COALESCE(SUM(monto), 0) as total
-               FROM bases_semanales
-               WHERE fecha >= DATE_TRUNC('week', CURRENT_DATE)''')
-    else:
-        base = db.fetch_one(
-            '''SELECT COALESCE(SUM(monto), 0) as total
-               FROM bases_semanales
-               WHERE usuario_id = %s
-               AND fecha >= DATE_TRUNC('week', CURRENT_DATE)''',
-            (usuario_id,)
+                COALESCE(SUM(r.efectivo), 0) as efectivo,
+                COALESCE(SUM(r.digital), 0) as digital,
+                COALESCE(SUM(r.efectivo + r.digital), 0) as total,
+                COALESCE(SUM(r.gastos), 0) as gastos,
+                COALESCE(SUM(r.base), 0) as base,
+                (SELECT COUNT(DISTINCT p.cliente_id)
+                 FROM pagos p
+                 JOIN clientes c ON p.cliente_id = c.id
+                 WHERE c.usuario_id = %s
+                 AND p.fecha >= DATE_TRUNC('week', CURRENT_DATE)) as clientes_pagaron
+               FROM resumen_diario r
+               WHERE r.usuario_id = %s
+               AND r.fecha >= DATE_TRUNC('week', CURRENT_DATE)''',
+            (usuario_id, usuario_id)
         )
     
     return {
@@ -346,7 +518,7 @@ async def get_resumen_semanal(
         "digital": float(result['digital']),
         "total_cobrado": float(result['total']),
         "clientes_pagaron": result['clientes_pagaron'],
-        "gastos": float(gastos['total']),
-        "base": float(base['total']),
-        "neto": float(result['total']) - float(gastos['total'])
+        "gastos": float(result['gastos']),
+        "base": float(result['base']),
+        "neto": float(result['total']) - float(result['gastos'])
     }
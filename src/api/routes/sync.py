@@ -0,0 +1,200 @@
+"""
+Rutas de sincronización de los dispositivos.
+
+Un dispositivo pide GET /api/sync sin cursor la primera vez (recibe todo
+lo de su alcance) y después GET /api/sync?since=<cursor> con el cursor de
+la respuesta anterior, para recibir solo lo que cambió desde entonces.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from datetime import date
+
+from src.api.server import get_db
+from src.api.middleware.auth import get_current_user
+from src.api.routes.clientes import ClienteResponse
+from src.api.routes.pagos import PagoResponse
+from src.db.cambios import CURSOR_SQL, CURSOR_VENCIDO_SQL
+
+router = APIRouter()
+
+
+class GastoSync(BaseModel):
+    """Gasto semanal de un cobrador."""
+    id: int
+    usuario_id: int
+    fecha: date
+    monto: float
+    descripcion: Optional[str] = None
+
+
+class BaseSync(BaseModel):
+    """Base registrada por un cobrador."""
+    id: int
+    usuario_id: int
+    fecha: date
+    monto: float
+
+
+class ClientesCambios(BaseModel):
+    """Clientes creados/modificados y eliminados."""
+    actualizados: List[ClienteResponse] = []
+    eliminados: List[int] = []
+
+
+class PagosCambios(BaseModel):
+    """Pagos creados/modificados y eliminados."""
+    actualizados: List[PagoResponse] = []
+    eliminados: List[int] = []
+
+
+class GastosCambios(BaseModel):
+    """Gastos creados/modificados y eliminados."""
+    actualizados: List[GastoSync] = []
+    eliminados: List[int] = []
+
+
+class BasesCambios(BaseModel):
+    """Bases creadas/modificadas y eliminadas."""
+    actualizados: List[BaseSync] = []
+    eliminados: List[int] = []
+
+
+class SyncResponse(BaseModel):
+    """Cambios desde el cursor y cursor para la próxima sincronización."""
+    cursor: str
+    completo: bool
+    clientes: ClientesCambios
+    pagos: PagosCambios
+    gastos: GastosCambios
+    bases: BasesCambios
+
+
+# Por tabla: clave de la respuesta, consulta, columna id y columna del cobrador
+_TABLAS = {
+    'clientes': (
+        'clientes',
+        '''SELECT c.id, c.usuario_id, c.nombre, c.cedula, c.telefono, c.monto_prestado,
+                  c.fecha_prestamo, c.tipo_plazo, c.tasa_interes, c.seguro, c.cuota_minima,
+                  c.dias_plazo, c.estado, c.total_pagado, c.saldo_pendiente,
+                  c.ultimo_pago_fecha
+           FROM clientes c''',
+        'c.id', 'c.usuario_id'
+    ),
+    'pagos': (
+        'pagos',
+        '''SELECT p.id, p.cliente_id, p.fecha, p.monto, p.tipo_pago,
+                  c.nombre AS cliente_nombre
+           FROM pagos p
+           JOIN clientes c ON c.id = p.cliente_id''',
+        'p.id', 'c.usuario_id'
+    ),
+    'gastos_semanales': (
+        'gastos',
+        'SELECT g.id, g.usuario_id, g.fecha, g.monto, g.descripcion FROM gastos_semanales g',
+        'g.id', 'g.usuario_id'
+    ),
+    'bases_semanales': (
+        'bases',
+        'SELECT b.id, b.usuario_id, b.fecha, b.monto FROM bases_semanales b',
+        'b.id', 'b.usuario_id'
+    ),
+}
+
+
+async def _leer_registros(db, tabla: str, ids: Optional[List[int]], usuario_id: Optional[int]) -> List[dict]:
+    """
+    Lee el estado actual de los registros de una tabla.
+
+    Args:
+        db: Conexión de la petición
+        tabla: Tabla de _TABLAS
+        ids: IDs a leer (None para todos)
+        usuario_id: Cobrador dueño (None para admin)
+    """
+    _, query, columna_id, columna_usuario = _TABLAS[tabla]
+    condiciones = []
+    params = []
+    if ids is not None:
+        condiciones.append(f'{columna_id} = ANY(%s)')
+        params.append(ids)
+    if usuario_id is not None:
+        condiciones.append(f'{columna_usuario} = %s')
+        params.append(usuario_id)
+    if condiciones:
+        query += ' WHERE ' + ' AND '.join(condiciones)
+
+    return await db.fetch_all(query + f' ORDER BY {columna_id}', tuple(params))
+
+
+@router.get("", response_model=SyncResponse)
+async def sincronizar(
+    since: Optional[str] = Query(None, description="cursor de la sincronización anterior"),
+    current_user: dict = Depends(get_current_user),
+    db=Depends(get_db)
+):
+    """
+    Cambios de clientes, pagos, gastos y bases desde el cursor.
+
+    Admin recibe los de todos, cobrador solo los suyos. 'actualizados' trae
+    el estado actual de cada registro creado o modificado (se aplica como
+    upsert) y 'eliminados' los IDs a borrar; al eliminar un cliente el
+    dispositivo descarta también sus pagos. Sin 'since' se envía todo
+    (completo=True). Un registro puede repetirse en la sincronización
+    siguiente; aplicarlo de nuevo no cambia nada. Si los cambios desde
+    'since' ya se borraron del registro, también se envía todo.
+    """
+    if since is not None and not since.isdigit():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
+        )
+
+    usuario_id = None if current_user.get('es_admin', False) else current_user['usuario_id']
+
+    # Antes de leer: todo lo escrito por transacciones anteriores al cursor
+    # ya está confirmado y será visible en las consultas siguientes
+    cursor = (await db.fetch_one(CURSOR_SQL))['cursor']
+
+    # Cursor más viejo que la retención del registro de cambios: copia completa
+    if since is not None and await db.fetch_one(CURSOR_VENCIDO_SQL, (since,)):
+        since = None
+
+    respuesta: Dict = {'cursor': cursor, 'completo': since is None}
+    for clave, *_ in _TABLAS.values():
+        respuesta[clave] = {'actualizados': [], 'eliminados': []}
+
+    if since is None:
+        for tabla, (clave, *_) in _TABLAS.items():
+            respuesta[clave]['actualizados'] = await _leer_registros(db, tabla, None, usuario_id)
+        return respuesta
+
+    # Último cambio de cada registro dentro del rango [since, cursor)
+    query = '''
+        SELECT DISTINCT ON (tabla, registro_id) tabla, registro_id, operacion
+        FROM cambios
+        WHERE txid >= %s::xid8 AND txid < %s::xid8
+    '''
+    params = [since, cursor]
+    if usuario_id is not None:
+        query += ' AND usuario_id = %s'
+        params.append(usuario_id)
+    query += ' ORDER BY tabla, registro_id, txid DESC, id DESC'
+
+    actualizados: Dict[str, List[int]] = {tabla: [] for tabla in _TABLAS}
+    for cambio in await db.fetch_all(query, tuple(params)):
+        if cambio['tabla'] not in _TABLAS:
+            continue
+        if cambio['operacion'] == 'D':
+            respuesta[_TABLAS[cambio['tabla']][0]]['eliminados'].append(cambio['registro_id'])
+        else:
+            actualizados[cambio['tabla']].append(cambio['registro_id'])
+
+    # Estado actual de lo modificado; si se borró después del cursor, su
+    # borrado llegará en la próxima sincronización
+    for tabla, ids in actualizados.items():
+        if ids:
+            respuesta[_TABLAS[tabla][0]]['actualizados'] = await _leer_registros(db, tabla, ids, usuario_id)
+
+    return respuesta
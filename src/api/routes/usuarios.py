@@ -2,13 +2,16 @@
 Rutas de gestión de usuarios.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
 from pydantic import BaseModel
 from typing import List, Optional
-import bcrypt
+from datetime import date, timedelta
 
-from src.api.server import get_db
+from src.api.server import get_db, get_db_sin_transaccion
+from src.api.contrasenas import hashear, verificar
 from src.api.middleware.auth import get_current_user, get_current_admin
+from src.api.idempotencia import guardar_respuesta, respuesta_previa
+from src.db.resumen_diario import HISTORIAL_SQL
 
 router = APIRouter()
 
@@ -38,7 +41,7 @@ class ChangePasswordRequest(BaseModel):
 @router.get("/me", response_model=UsuarioResponse)
 async def get_current_user_info(current_user: dict = Depends(get_current_user), db=Depends(get_db)):
     """Obtiene información del usuario actual."""
-    user = db.fetch_one(
+    user = await db.fetch_one(
         'SELECT id, username, nombre, es_admin FROM usuarios WHERE id = %s',
         (current_user['usuario_id'],)
     )
@@ -55,7 +58,7 @@ async def list_usuarios(
     db=Depends(get_db)
 ):
     """Lista todos los usuarios (solo admin)."""
-    users = db.fetch_all(
+    users = await db.fetch_all(
         'SELECT id, username, nombre, es_admin FROM usuarios ORDER BY nombre'
     )
     return users
@@ -68,7 +71,7 @@ async def get_usuario(
     db=Depends(get_db)
 ):
     """Obtiene información de un usuario específico (solo admin)."""
-    user = db.fetch_one(
+    user = await db.fetch_one(
         'SELECT id, username, nombre, es_admin FROM usuarios WHERE id = %s',
         (usuario_id,)
     )
@@ -79,15 +82,70 @@ async def get_usuario(
     return user
 
 
+@router.get("/{usuario_id}/historial")
+async def get_historial_usuario(
+    usuario_id: int,
+    dias: int = Query(7, ge=1, le=366, description="Días hacia atrás"),
+    hasta: Optional[date] = Query(None, description="Último día (por defecto, hoy)"),
+    current_user: dict = Depends(get_current_user),
+    db=Depends(get_db)
+):
+    """
+    Historial diario de un cobrador (días sin movimiento en cero).
+    
+    Admin puede ver cualquier cobrador; un cobrador solo el suyo.
+    """
+    if usuario_id != current_user['usuario_id'] and not current_user['es_admin']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permiso para ver este historial"
+        )
+    
+    hasta = hasta or date.today()
+    desde = hasta - timedelta(days=dias - 1)
+    
+    filas = await db.fetch_all(HISTORIAL_SQL, (usuario_id, desde, hasta, usuario_id))
+    
+    if not filas:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    
+    return {
+        'usuario_id': usuario_id,
+        'nombre': filas[0]['nombre'],
+        'username': filas[0]['username'],
+        'clientes_activos': filas[0]['clientes_activos'],
+        'fecha_inicio': desde.isoformat(),
+        'fecha_fin': hasta.isoformat(),
+        'dias': [
+            {
+                'fecha': f['fecha'].isoformat(),
+                'efectivo': float(f['efectivo']),
+                'digital': float(f['digital']),
+                'cobrado': float(f['cobrado']),
+                'num_pagos': f['num_pagos'],
+                'prestado': float(f['prestado']),
+                'seguros': float(f['seguros']),
+                'gastos': float(f['gastos']),
+                'base': float(f['base'])
+            }
+            for f in filas
+        ]
+    }
+
+
 @router.post("/", response_model=UsuarioResponse)
 async def create_usuario(
     data: CreateUsuarioRequest,
     current_user: dict = Depends(get_current_admin),
-    db=Depends(get_db)
+    db=Depends(get_db_sin_transaccion)
 ):
-    """Crea un nuevo usuario (solo admin)."""
+    """
+    Crea un nuevo usuario (solo admin).
+    
+    El hash se calcula sin retener una conexión del pool.
+    """
     # Verificar que el username no exista
-    existing = db.fetch_one(
+    existing = await db.fetch_one(
         'SELECT id FROM usuarios WHERE username = %s',
         (data.username,)
     )
@@ -99,19 +157,21 @@ async def create_usuario(
         )
     
     # Hash de la contraseña
-    hashed_password = bcrypt.hashpw(data.password.encode('utf-8'), bcrypt.gensalt())
+    hashed_password = await hashear(data.password)
     
-    # Insertar usuario
-    db.execute('''
+    # Insertar usuario (otro alta pudo tomar el username mientras se hasheaba)
+    user = await db.fetch_one('''
         INSERT INTO usuarios (username, password, nombre, es_admin)
         VALUES (%s, %s, %s, %s)
-    ''', (data.username, hashed_password.decode('utf-8'), data.nombre, data.es_admin))
+        ON CONFLICT (username) DO NOTHING
+        RETURNING id, username, nombre, es_admin
+    ''', (data.username, hashed_password, data.nombre, data.es_admin))
     
-    # Obtener usuario creado
-    user = db.fetch_one(
-        'SELECT id, username, nombre, es_admin FROM usuarios WHERE username = %s',
-        (data.username,)
-    )
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El nombre de usuario ya existe"
+        )
     
     return user
 
@@ -121,9 +181,14 @@ async def change_password(
     usuario_id: int,
     data: ChangePasswordRequest,
     current_user: dict = Depends(get_current_user),
-    db=Depends(get_db)
+    db=Depends(get_db_sin_transaccion)
 ):
-    """Cambia la contraseña de un usuario."""
+    """
+    Cambia la contraseña de un usuario.
+    
+    bcrypt corre sin retener una conexión del pool: cada consulta usa y
+    devuelve la suya.
+    """
     # Solo admin puede cambiar contraseña de otros, o el usuario su propia contraseña
     if usuario_id != current_user['usuario_id'] and not current_user['es_admin']:
         raise HTTPException(
@@ -132,7 +197,7 @@ async def change_password(
         )
     
     # Obtener usuario
-    user = db.fetch_one(
+    user = await db.fetch_one(
         'SELECT id, password FROM usuarios WHERE id = %s',
         (usuario_id,)
     )
@@ -142,19 +207,19 @@ async def change_password(
     
     # Verificar contraseña actual (solo si no es admin cambiando otra contraseña)
     if usuario_id == current_user['usuario_id']:
-        if not bcrypt.checkpw(data.password_actual.encode('utf-8'), user['password'].encode('utf-8')):
+        if not await verificar(data.password_actual, user['password']):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Contraseña actual incorrecta"
             )
     
     # Hash de la nueva contraseña
-    new_hashed = bcrypt.hashpw(data.password_nueva.encode('utf-8'), bcrypt.gensalt())
+    new_hashed = await hashear(data.password_nueva)
     
     # Actualizar contraseña
-    db.execute(
+    await db.execute(
         'UPDATE usuarios SET password = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s',
-        (new_hashed.decode('utf-8'), usuario_id)
+        (new_hashed, usuario_id)
     )
     
     return {
@@ -172,11 +237,13 @@ class GastoRequest(BaseModel):
     """Modelo para registrar gasto."""
     monto: float
     descripcion: str
+    fecha: Optional[date] = None
 
 
 @router.post("/base")
 async def agregar_base(
     data: BaseRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=100),
     current_user: dict = Depends(get_current_user),
     db=Depends(get_db)
 ):
@@ -186,52 +253,69 @@ async def agregar_base(
     fecha = datetime.now().date()
     usuario_id = current_user['usuario_id']
     
+    previa = await respuesta_previa(db, usuario_id, idempotency_key, 'POST /api/usuarios/base')
+    if previa is not None:
+        return previa
+    
     # Verificar si ya hay una base para hoy
-    existing = db.fetch_one(
+    existing = await db.fetch_one(
         'SELECT id FROM bases_semanales WHERE usuario_id = %s AND fecha = %s',
         (usuario_id, fecha)
     )
     
     if existing:
         # Actualizar la base existente
-        db.execute(
+        await db.execute(
             'UPDATE bases_semanales SET monto = %s WHERE usuario_id = %s AND fecha = %s',
             (data.monto, usuario_id, fecha)
         )
     else:
         # Insertar nueva base
-        db.execute(
+        await db.execute(
             'INSERT INTO bases_semanales (usuario_id, monto, fecha) VALUES (%s, %s, %s)',
             (usuario_id, data.monto, fecha)
         )
     
-    return {
+    return await guardar_respuesta(db, usuario_id, idempotency_key, {
         "success": True,
         "message": "Base registrada exitosamente"
-    }
+    })
 
 
 @router.post("/gasto")
 async def registrar_gasto(
     data: GastoRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=100),
     current_user: dict = Depends(get_current_user),
     db=Depends(get_db)
 ):
-    """Registra un gasto para el usuario actual."""
+    """
+    Registra un gasto para el usuario actual.
+    
+    La app envía la fecha en que se registró el gasto en el dispositivo,
+    que puede ser anterior si estuvo sin conexión. Con Idempotency-Key, un
+    reintento no registra el gasto dos veces.
+    """
     from datetime import datetime
     
-    fecha = datetime.now().date()
+    fecha = data.fecha or datetime.now().date()
     usuario_id = current_user['usuario_id']
     
-    db.execute('''
+    previa = await respuesta_previa(db, usuario_id, idempotency_key, 'POST /api/usuarios/gasto')
+    if previa is not None:
+        return previa
+    
+    gasto = await db.fetch_one('''
         INSERT INTO gastos_semanales (usuario_id, monto, descripcion, fecha)
         VALUES (%s, %s, %s, %s)
+        RETURNING id
     ''', (usuario_id, data.monto, data.descripcion, fecha))
     
-    return {
+    return await guardar_respuesta(db, usuario_id, idempotency_key, {
         "success": True,
-        "message": "Gasto registrado exitosamente"
-    }
+        "message": "Gasto registrado exitosamente",
+        "id": gasto['id']
+    })
 
 
 @router.delete("/{usuario_id}")
@@ -249,12 +333,12 @@ async def delete_usuario(
         )
     
     # Verificar que el usuario exista
-    user = db.fetch_one('SELECT id FROM usuarios WHERE id = %s', (usuario_id,))
+    user = await db.fetch_one('SELECT id FROM usuarios WHERE id = %s', (usuario_id,))
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
     # Eliminar usuario
-    db.execute('DELETE FROM usuarios WHERE id = %s', (usuario_id,))
+    await db.execute('DELETE FROM usuarios WHERE id = %s', (usuario_id,))
     
     return {
         "success": True,
@@ -262,63 +346,127 @@ async def delete_usuario(
     }
 
 
+# Columnas permitidas para ordenar el resumen de cobradores
+ORDEN_RESUMEN = {
+    'nombre': 'nombre',
+    'clientes': 'clientes_activos',
+    'cobrado': 'cobrado',
+    'base': 'base',
+    'gastos': 'gastos',
+    'ganancia': 'ganancia'
+}
+
+
 @router.get("/cobradores/resumen")
 async def get_resumen_cobradores(
+    fecha: Optional[date] = Query(None, description="Día a resumir (default: hoy)"),
+    fecha_inicio: Optional[date] = Query(None, description="Inicio del rango (en vez de fecha)"),
+    fecha_fin: Optional[date] = Query(None, description="Fin del rango (en vez de fecha)"),
+    orden: str = Query('nombre', description="nombre, clientes, cobrado, base, gastos o ganancia"),
+    descendente: bool = Query(False, description="Orden descendente"),
+    limit: int = Query(50, ge=1, le=500, description="Cobradores por página"),
+    offset: int = Query(0, ge=0, description="Cobradores a saltar"),
     current_user: dict = Depends(get_current_admin),
     db=Depends(get_db)
 ):
-    """Obtiene resumen de actividad de todos los cobradores (solo admin)."""
-    from datetime import date as dt_date
-    hoy = dt_date.today()
+    """
+    Obtiene resumen de actividad de todos los cobradores (solo admin).
     
-    # Obtener todos los cobradores (no admin)
-    cobradores = db.fetch_all(
-        'SELECT id, username, nombre FROM usuarios WHERE es_admin = FALSE ORDER BY nombre'
-    )
-    
-    resumen = []
-    for cobrador in cobradores:
-        cobrador_id = cobrador['id']
-        
-        # Clientes activos
-        clientes = db.fetch_one(
-            'SELECT COUNT(*) as total FROM clientes WHERE usuario_id = %s AND estado = %s',
-            (cobrador_id, 'activo')
-        )
-        
-        # Cobrado hoy
-        cobrado_hoy = db.fetch_one(
-            '''SELECT COALESCE(SUM(p.monto), 0) as total
-               FROM pagos p
-               JOIN clientes c ON p.cliente_id = c.id
-               WHERE c.usuario_id = %s AND p.fecha = %s''',
-            (cobrador_id, hoy)
+    Todo se calcula en una sola consulta agrupada (sin una consulta por
+    cobrador) sobre el resumen diario: la página pedida y los totales del
+    equipo completo.
+    """
+    if orden not in ORDEN_RESUMEN:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Orden inválido. Opciones: {', '.join(ORDEN_RESUMEN)}"
         )
-        
-        # Base del día
-        base_hoy = db.fetch_one(
-            '''SELECT COALESCE(SUM(monto), 0) as total
-               FROM bases_semanales
-               WHERE usuario_id = %s AND fecha = %s''',
-            (cobrador_id, hoy)
+    
+    hoy = date.today()
+    if fecha:
+        desde = hasta = fecha
+    else:
+        desde = fecha_inicio or hoy
+        hasta = fecha_fin or hoy
+    
+    if desde > hasta:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="fecha_inicio no puede ser posterior a fecha_fin"
         )
-        
-        # Gastos del día
-        gastos_hoy = db.fetch_one(
-            '''SELECT COALESCE(SUM(monto), 0) as total
-               FROM gastos_semanales
-               WHERE usuario_id = %s AND fecha = %s''',
-            (cobrador_id, hoy)
+    
+    direccion = 'DESC' if descendente else 'ASC'
+    order_by = f"{ORDEN_RESUMEN[orden]} {direccion}, id"
+    
+    result = await db.fetch_one(f'''
+        WITH clientes_activos AS (
+            SELECT usuario_id, COUNT(*) AS total
+            FROM clientes
+            WHERE estado = 'activo'
+            GROUP BY usuario_id
+        ), periodo AS (
+            SELECT usuario_id,
+                   SUM(efectivo + digital) AS cobrado,
+                   SUM(base) AS base,
+                   SUM(gastos) AS gastos
+            FROM resumen_diario
+            WHERE fecha BETWEEN %s AND %s
+            GROUP BY usuario_id
+        ), resumen AS (
+            SELECT u.id, u.nombre, u.username,
+                   COALESCE(ca.total, 0) AS clientes_activos,
+                   COALESCE(pe.cobrado, 0) AS cobrado,
+                   COALESCE(pe.base, 0) AS base,
+                   COALESCE(pe.gastos, 0) AS gastos,
+                   COALESCE(pe.cobrado, 0) - COALESCE(pe.gastos, 0) AS ganancia
+            FROM usuarios u
+            LEFT JOIN clientes_activos ca ON ca.usuario_id = u.id
+            LEFT JOIN periodo pe ON pe.usuario_id = u.id
+            WHERE u.es_admin = FALSE
         )
-        
-        resumen.append({
-            'id': cobrador_id,
-            'nombre': cobrador['nombre'],
-            'username': cobrador['username'],
-            'clientes_activos': clientes['total'] if clientes else 0,
-            'cobrado_hoy': float(cobrado_hoy['total']) if cobrado_hoy else 0.0,
-            'base_hoy': float(base_hoy['total']) if base_hoy else 0.0,
-            'gastos_hoy': float(gastos_hoy['total']) if gastos_hoy else 0.0
-        })
-    
-    return resumen
+        SELECT
+            (SELECT json_build_object(
+                        'cobradores', COUNT(*),
+                        'clientes_activos', COALESCE(SUM(clientes_activos), 0),
+                        'cobrado', COALESCE(SUM(cobrado), 0),
+                        'base', COALESCE(SUM(base), 0),
+                        'gastos', COALESCE(SUM(gastos), 0),
+                        'ganancia', COALESCE(SUM(ganancia), 0))
+             FROM resumen) AS totales,
+            (SELECT COALESCE(json_agg(pagina ORDER BY pagina.n), '[]'::json)
+             FROM (SELECT r.*, ROW_NUMBER() OVER (ORDER BY {order_by}) AS n
+                   FROM resumen r
+                   ORDER BY {order_by}
+                   LIMIT %s OFFSET %s) pagina) AS cobradores
+    ''', (desde, hasta, limit, offset))
+    
+    cobradores = [
+        {
+            'id': c['id'],
+            'nombre': c['nombre'],
+            'username': c['username'],
+            'clientes_activos': c['clientes_activos'],
+            'cobrado': float(c['cobrado']),
+            'base': float(c['base']),
+            'gastos': float(c['gastos']),
+            'ganancia': float(c['ganancia'])
+        }
+        for c in result['cobradores']
+    ]
+    totales = result['totales']
+    
+    return {
+        'fecha_inicio': desde.isoformat(),
+        'fecha_fin': hasta.isoformat(),
+        'totales': {
+            'cobradores': totales['cobradores'],
+            'clientes_activos': totales['clientes_activos'],
+            'cobrado': float(totales['cobrado']),
+            'base': float(totales['base']),
+            'gastos': float(totales['gastos']),
+            'ganancia': float(totales['ganancia'])
+        },
+        'cobradores': cobradores,
+        'limit': limit,
+        'offset': offset
+    }
@@ -10,19 +10,54 @@ Configura:
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
 from src.db.connection import Database
-from src.config import APP_NAME, APP_VERSION
+from src.db.async_connection import AsyncDatabase
+from src.db.idempotencia import IDEMPOTENCIA_TTL_HORAS, LIMPIAR_IDEMPOTENCIA_SQL
+from src.db.intentos_login import LIMPIAR_INTENTOS_LOGIN_SQL
+from src.db.cambios import CAMBIOS_RETENCION_DIAS, LIMPIAR_CAMBIOS_SQL
+from src.api import contrasenas
+from src.api.middleware.auth import estadisticas_tokens
+from src.config import APP_NAME, APP_VERSION, SecurityConfig
 
 logger = logging.getLogger(__name__)
 
 # Instancia global de base de datos
 db_instance = None
 
+# Segundos entre limpiezas de claves de idempotencia, intentos de login y cambios vencidos
+INTERVALO_LIMPIEZA = 3600
+
+
+async def limpiar_vencidos_periodicamente():
+    """
+    Borra cada hora las claves de idempotencia, los intentos de login y los
+    cambios de sincronización vencidos.
+    """
+    while True:
+        await asyncio.sleep(INTERVALO_LIMPIEZA)
+        try:
+            async with db_instance.transaction() as tx:
+                borradas = await tx.fetch_all(LIMPIAR_IDEMPOTENCIA_SQL, (IDEMPOTENCIA_TTL_HORAS,))
+                intentos = await tx.fetch_all(
+                    LIMPIAR_INTENTOS_LOGIN_SQL, (SecurityConfig.LOCKOUT_DURATION,)
+                )
+                cambios = await tx.fetch_all(LIMPIAR_CAMBIOS_SQL, (CAMBIOS_RETENCION_DIAS,))
+            if borradas:
+                logger.info(f"🧹 Claves de idempotencia vencidas borradas: {len(borradas)}")
+            if intentos:
+                logger.info(f"🧹 Intentos de login vencidos borrados: {len(intentos)}")
+            if cambios:
+                logger.info(f"🧹 Cambios de sincronización vencidos borrados: {len(cambios)}")
+        except Exception as e:
+            logger.warning(f"⚠️ Error en la limpieza periódica: {e}")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -32,20 +67,30 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info(f"🚀 Iniciando {APP_NAME} API v{APP_VERSION}")
     try:
-        db_instance = Database()
-        db_instance.create_tables()
-        db_instance.inicializar_admin()
+        # Esquema y admin inicial con la conexión síncrona (solo al arrancar)
+        schema_db = Database()
+        schema_db.create_tables()
+        schema_db.inicializar_admin()
+        schema_db.close_all_connections()
+        
+        # Las rutas usan el pool asíncrono para no bloquear el event loop
+        db_instance = AsyncDatabase()
+        await db_instance.open()
         logger.info("✅ Base de datos inicializada")
     except Exception as e:
         logger.error(f"❌ Error inicializando base de datos: {e}")
         raise
     
+    limpieza = asyncio.create_task(limpiar_vencidos_periodicamente())
+    
     yield
     
     # Shutdown
     logger.info("🛑 Cerrando aplicación...")
+    limpieza.cancel()
+    contrasenas.cerrar()
     if db_instance:
-        db_instance.close_all_connections()
+        await db_instance.close()
     logger.info("✅ Aplicación cerrada correctamente")
 
 
@@ -66,6 +111,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Comprimir respuestas grandes (listados) para clientes móviles
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 
 # Manejadores de errores globales
 @app.exception_handler(RequestValidationError)
@@ -113,22 +161,45 @@ async def health_check():
     return {
         "success": True,
         "status": "healthy",
-        "database": "connected" if db_instance else "disconnected"
+        "database": "connected" if db_instance else "disconnected",
+        "pool": db_instance.pool_stats() if db_instance else {},
+        "bcrypt": contrasenas.estadisticas(),
+        "tokens": estadisticas_tokens()
     }
 
 
-def get_db():
-    """Dependency para obtener instancia de base de datos."""
+async def get_db():
+    """
+    Dependency que abre una transacción por request.
+    
+    Todas las consultas de la ruta usan la misma conexión y se confirman
+    con un solo commit al terminar; si la ruta lanza una excepción
+    (incluida HTTPException) se hace rollback de todo.
+    """
+    async with db_instance.transaction() as tx:
+        yield tx
+
+
+async def get_db_sin_transaccion():
+    """
+    Dependency sin transacción de request: cada consulta toma una conexión
+    del pool y la devuelve (con commit) al terminar.
+    
+    Para rutas que esperan trabajo lento entre consultas (ej: bcrypt), que
+    con get_db retendrían una conexión del pool mientras tanto.
+    """
     return db_instance
 
 
 # Importar y registrar rutas
-from src.api.routes import auth, usuarios, clientes, pagos
+from src.api.routes import auth, usuarios, clientes, pagos, dashboard, sync
 
 app.include_router(auth.router, prefix="/api/auth", tags=["Autenticación"])
 app.include_router(usuarios.router, prefix="/api/usuarios", tags=["Usuarios"])
 app.include_router(clientes.router, prefix="/api/clientes", tags=["Clientes"])
 app.include_router(pagos.router, prefix="/api/pagos", tags=["Pagos"])
+app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
+app.include_router(sync.router, prefix="/api/sync", tags=["Sincronización"])
 
 
 if __name__ == "__main__":
@@ -116,11 +116,24 @@ class Cliente:
             int: ID del pago registrado
         """
         fecha = datetime.now().date()
+        
+        # Insertar el pago y acumularlo en el saldo y estado del cliente
         result = self.db.fetch_one('''
+            WITH cliente AS (
+                UPDATE clientes
+                SET total_pagado = total_pagado + %s::numeric,
+                    ultimo_pago_fecha = GREATEST(ultimo_pago_fecha, %s::date),
+                    estado = CASE
+                        WHEN total_pagado + %s::numeric >= monto_prestado + monto_prestado * tasa_interes
+                        THEN 'pagado' ELSE 'activo'
+                    END
+                WHERE id = %s
+                RETURNING id
+            )
             INSERT INTO pagos (cliente_id, fecha, monto, tipo_pago)
-            VALUES (%s, %s, %s, %s)
+            SELECT id, %s, %s, %s FROM cliente
             RETURNING id
-        ''', (cliente_id, fecha, monto, tipo_pago))
+        ''', (monto, fecha, monto, cliente_id, fecha, monto, tipo_pago))
         
         return result['id']
 
@@ -193,9 +206,9 @@ class Cliente:
         Returns:
             Dict con información del balance (monto_total, total_pagado, saldo_pendiente, etc.)
         """
-        # Obtener información del cliente
+        # Información del cliente con su total pagado (mantenido en cada pago)
         cliente = self.db.fetch_one('''
-            SELECT monto_prestado, tasa_interes, seguro
+            SELECT monto_prestado, tasa_interes, seguro, total_pagado
             FROM clientes
             WHERE id = %s
         ''', (cliente_id,))
@@ -206,19 +219,12 @@ class Cliente:
         monto_prestado = float(cliente['monto_prestado'])
         tasa_interes = float(cliente['tasa_interes'])
         seguro = float(cliente['seguro'])
+        total_pagado = float(cliente['total_pagado'])
 
         # Calcular monto total a pagar (monto + interés + seguro)
         interes = monto_prestado * tasa_interes
         monto_total = monto_prestado + interes + seguro
 
-        # Obtener total pagado
-        pagado_result = self.db.fetch_one('''
-            SELECT COALESCE(SUM(monto), 0) as total
-            FROM pagos
-            WHERE cliente_id = %s
-        ''', (cliente_id,))
-        total_pagado = float(pagado_result['total']) if pagado_result else 0.0
-
         saldo_pendiente = monto_total - total_pagado
 
         return {
@@ -260,13 +266,14 @@ class Cliente:
         Returns:
             bool: True si el cliente fue eliminado, False si no se puede eliminar
         """
-        # Verificar si el cliente ha pagado completamente
-        balance = self.calcular_balance(cliente_id)
-        if balance.get('saldo_pendiente', 0) > 0:
-            return False
-            
-        # Marcar el cliente como inactivo
-        return self.actualizar_estado_cliente(cliente_id, 'inactivo')
+        with self.db.transaction():
+            # Verificar si el cliente ha pagado completamente
+            balance = self.calcular_balance(cliente_id)
+            if balance.get('saldo_pendiente', 0) > 0:
+                return False
+                
+            # Marcar el cliente como inactivo
+            return self.actualizar_estado_cliente(cliente_id, 'inactivo')
 
     def buscar_clientes(self, usuario_id: int, termino: str) -> List[Dict]:
         """
@@ -301,24 +308,17 @@ class Cliente:
         Returns:
             Dict con estadísticas (total_clientes, monto_prestado_total, monto_cobrado, etc.)
         """
-        # Clientes activos
-        clientes_result = self.db.fetch_one('''
-            SELECT COUNT(*) as total,
-                   COALESCE(SUM(monto_prestado), 0) as monto_total
+        # Clientes activos y total cobrado (todos los tiempos) desde los saldos guardados
+        result = self.db.fetch_one('''
+            SELECT COUNT(*) FILTER (WHERE estado = 'activo') as total,
+                   COALESCE(SUM(monto_prestado) FILTER (WHERE estado = 'activo'), 0) as monto_total,
+                   COALESCE(SUM(total_pagado), 0) as cobrado
             FROM clientes
-            WHERE usuario_id = %s AND estado = 'activo'
-        ''', (usuario_id,))
-        
-        # Total cobrado (todos los tiempos)
-        cobrado_result = self.db.fetch_one('''
-            SELECT COALESCE(SUM(p.monto), 0) as total
-            FROM pagos p
-            JOIN clientes c ON p.cliente_id = c.id
-            WHERE c.usuario_id = %s
+            WHERE usuario_id = %s
         ''', (usuario_id,))
         
         return {
-            'total_clientes_activos': clientes_result['total'] if clientes_result else 0,
-            'monto_prestado_total': float(clientes_result['monto_total']) if clientes_result else 0.0,
-            'total_cobrado': float(cobrado_result['total']) if cobrado_result else 0.0
+            'total_clientes_activos': result['total'] if result else 0,
+            'monto_prestado_total': float(result['monto_total']) if result else 0.0,
+            'total_cobrado': float(result['cobrado']) if result else 0.0
         }
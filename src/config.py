@@ -74,8 +74,13 @@ class SecurityConfig:
     # Sesiones
     SESSION_TIMEOUT = 3600  # 1 hora en segundos
     
-    # Intentos de login
+    # Costo de bcrypt (cada +1 duplica el tiempo de cada hash); al cambiarlo,
+    # cada contraseña se actualiza sola en el siguiente login
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+    
+    # Intentos de login (fallos permitidos en la ventana de LOCKOUT_DURATION)
     MAX_LOGIN_ATTEMPTS = 5
+    MAX_LOGIN_ATTEMPTS_IP = 20  # Por IP: varios cobradores pueden compartirla
     LOCKOUT_DURATION = 300  # 5 minutos en segundos
 
 # Configuración de logging
@@ -2,16 +2,18 @@
 Módulo de base de datos PostgreSQL para Gestor de Préstamos.
 
 Este módulo proporciona:
-- Conexión a PostgreSQL
+- Conexión a PostgreSQL (síncrona y asíncrona)
 - Modelos de datos
 - Operaciones CRUD
 """
 
 from .connection import Database
+from .async_connection import AsyncDatabase
 from .models import Usuario, Cliente, Pago, BaseSemanales, GastoSemanales
 
 __all__ = [
     'Database',
+    'AsyncDatabase',
     'Usuario',
     'Cliente',
     'Pago',
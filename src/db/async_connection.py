@@ -0,0 +1,208 @@
+"""
+Conexión asíncrona a PostgreSQL para la API.
+
+Proporciona una clase AsyncDatabase con la misma interfaz que Database
+(fetch_one, fetch_all, execute) pero con métodos awaitables, respaldada
+por psycopg 3 y un pool de conexiones asíncrono. Así las rutas de FastAPI
+no bloquean el event loop de uvicorn mientras esperan a PostgreSQL.
+
+También ofrece transacciones explícitas (transaction()) para agrupar
+varias consultas en una sola conexión y un solo commit.
+"""
+
+import os
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional, List, Tuple, Dict
+
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTransaction:
+    """
+    Transacción asíncrona sobre una única conexión del pool.
+
+    Expone la misma interfaz que AsyncDatabase, de modo que las rutas
+    pueden recibir cualquiera de las dos sin cambiar su código.
+    """
+
+    def __init__(self, conn):
+        """
+        Args:
+            conn: Conexión psycopg asíncrona con la transacción abierta
+        """
+        self.conn = conn
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Transacción anidada (SAVEPOINT) dentro de la actual."""
+        async with self.conn.transaction():
+            yield self
+
+    async def execute(self, query: str, params: Tuple = None) -> None:
+        """Ejecuta una query sin resultados dentro de la transacción."""
+        await self.conn.execute(query, params)
+
+    async def fetch_one(self, query: str, params: Tuple = None) -> Optional[dict]:
+        """Ejecuta una query y retorna un solo resultado."""
+        cur = await self.conn.execute(query, params)
+        return await cur.fetchone()
+
+    async def fetch_all(self, query: str, params: Tuple = None) -> List[dict]:
+        """Ejecuta una query y retorna todos los resultados."""
+        cur = await self.conn.execute(query, params)
+        return await cur.fetchall()
+
+
+class AsyncDatabase:
+    """
+    Clase para manejar la conexión asíncrona con PostgreSQL.
+
+    Las consultas usan los mismos placeholders (%s) que la versión
+    síncrona, por lo que el SQL de las rutas no cambia.
+    """
+
+    def __init__(self,
+                 host: str = None,
+                 port: int = None,
+                 database: str = None,
+                 user: str = None,
+                 password: str = None,
+                 min_size: int = None,
+                 max_size: int = None,
+                 timeout: float = None):
+        """
+        Configura el pool asíncrono (se abre con open()).
+
+        Args:
+            host: Host del servidor PostgreSQL (default: localhost)
+            port: Puerto del servidor (default: 5432)
+            database: Nombre de la base de datos (default: gestor_prestamos)
+            user: Usuario de PostgreSQL (default: postgres)
+            password: Contraseña del usuario
+            min_size: Conexiones mínimas abiertas en el pool (default: DB_POOL_MIN)
+            max_size: Conexiones máximas del pool (default: DB_POOL_MAX)
+            timeout: Segundos de espera por una conexión libre (default: DB_POOL_TIMEOUT)
+        """
+        self.host = host or os.getenv('DB_HOST', 'localhost')
+        self.port = port or int(os.getenv('DB_PORT', '5432'))
+        self.database = database or os.getenv('DB_NAME', 'gestor_prestamos')
+        self.user = user or os.getenv('DB_USER', 'postgres')
+        self.password = password or os.getenv('DB_PASSWORD', 'postgres')
+
+        self._pool = AsyncConnectionPool(
+            conninfo=(
+                f"host={self.host} port={self.port} dbname={self.database} "
+                f"user={self.user} password={self.password}"
+            ),
+            min_size=min_size or int(os.getenv('DB_POOL_MIN', '1')),
+            max_size=max_size or int(os.getenv('DB_POOL_MAX', '10')),
+            timeout=timeout or float(os.getenv('DB_POOL_TIMEOUT', '30')),
+            kwargs={'row_factory': dict_row},
+            open=False
+        )
+
+    async def open(self):
+        """Abre el pool de conexiones y espera a que esté listo."""
+        await self._pool.open(wait=True)
+        logger.info(f"✅ Pool asíncrono creado: {self.database}@{self.host}:{self.port}")
+
+    async def close(self):
+        """Cierra todas las conexiones del pool."""
+        await self._pool.close()
+        logger.info("✅ Pool asíncrono cerrado")
+
+    def pool_stats(self) -> Dict:
+        """
+        Retorna las métricas del pool asíncrono.
+
+        Returns:
+            Dict con tamaño, conexiones libres, solicitudes en espera y tiempos
+        """
+        stats = self._pool.get_stats()
+        return {
+            'min': self._pool.min_size,
+            'max': self._pool.max_size,
+            'size': stats.get('pool_size', 0),
+            'idle': stats.get('pool_available', 0),
+            'in_use': stats.get('pool_size', 0) - stats.get('pool_available', 0),
+            'waiters': stats.get('requests_waiting', 0),
+            'acquired': stats.get('requests_num', 0),
+            'acquire_wait_ms': stats.get('requests_wait_ms', 0),
+            'timeouts': stats.get('requests_errors', 0)
+        }
+
+    @asynccontextmanager
+    async def get_connection(self):
+        """
+        Context manager asíncrono para obtener una conexión del pool.
+
+        Al salir hace commit, o rollback si hubo una excepción.
+
+        Usage:
+            async with db.get_connection() as conn:
+                await conn.execute("SELECT * FROM usuarios")
+        """
+        async with self._pool.connection() as conn:
+            yield conn
+
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Abre una transacción que usa una sola conexión hasta terminar.
+
+        Hace un único commit al salir, o rollback de todo si hubo
+        una excepción.
+
+        Usage:
+            async with db.transaction() as tx:
+                await tx.execute("INSERT INTO ...")
+                fila = await tx.fetch_one("SELECT ...")
+        """
+        async with self.get_connection() as conn:
+            async with conn.transaction():
+                yield AsyncTransaction(conn)
+
+    async def execute(self, query: str, params: Tuple = None) -> None:
+        """
+        Ejecuta una query que no retorna resultados (INSERT, UPDATE, DELETE).
+
+        Args:
+            query: Query SQL
+            params: Parámetros para la query
+        """
+        async with self.get_connection() as conn:
+            await conn.execute(query, params)
+
+    async def fetch_one(self, query: str, params: Tuple = None) -> Optional[dict]:
+        """
+        Ejecuta una query y retorna un solo resultado.
+
+        Args:
+            query: Query SQL
+            params: Parámetros para la query
+
+        Returns:
+            dict con los resultados o None
+        """
+        async with self.get_connection() as conn:
+            cur = await conn.execute(query, params)
+            return await cur.fetchone()
+
+    async def fetch_all(self, query: str, params: Tuple = None) -> List[dict]:
+        """
+        Ejecuta una query y retorna todos los resultados.
+
+        Args:
+            query: Query SQL
+            params: Parámetros para la query
+
+        Returns:
+            Lista de dicts con los resultados
+        """
+        async with self.get_connection() as conn:
+            cur = await conn.execute(query, params)
+            return await cur.fetchall()
@@ -0,0 +1,125 @@
+"""
+Registro de cambios para la sincronización de los dispositivos (tabla cambios).
+
+Los triggers de clientes, pagos, gastos_semanales y bases_semanales anotan
+en la misma transacción qué registro cambió, de qué cobrador y si quedó
+vigente ('U') o se eliminó ('D'). Cada fila guarda el id de la transacción
+(xid8) que la escribió: el cursor de /api/sync es el xmin del snapshot, de
+modo que toda transacción anterior al cursor ya terminó y ningún cambio
+confirmado tarde queda por detrás de un cursor ya entregado.
+
+La API borra cada hora los cambios de más de CAMBIOS_RETENCION_DIAS y anota
+en cambios_purga hasta qué transacción borró: un dispositivo con un cursor
+anterior recibe la copia completa en vez de perder cambios.
+"""
+
+import os
+
+# Días que se conservan los cambios (un dispositivo que no sincroniza en
+# más tiempo recibe la copia completa)
+CAMBIOS_RETENCION_DIAS = int(os.getenv('CAMBIOS_RETENCION_DIAS', '30'))
+
+# Tabla, función y triggers (idempotente para bases existentes)
+CAMBIOS_SQL = (
+    '''
+    CREATE TABLE IF NOT EXISTS cambios (
+        id BIGSERIAL PRIMARY KEY,
+        txid XID8 NOT NULL DEFAULT pg_current_xact_id(),
+        tabla TEXT NOT NULL,
+        registro_id INTEGER NOT NULL,
+        usuario_id INTEGER NOT NULL,
+        operacion CHAR(1) NOT NULL,
+        creado TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_cambios_txid ON cambios(txid)',
+    'CREATE INDEX IF NOT EXISTS idx_cambios_usuario_txid ON cambios(usuario_id, txid)',
+    # Una sola fila: la última transacción cuyos cambios se borraron
+    '''
+    CREATE TABLE IF NOT EXISTS cambios_purga (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        txid XID8 NOT NULL
+    )
+    ''',
+    # El cobrador de un pago es el dueño del cliente. Los pagos borrados en
+    # cascada con su cliente no se anotan: el dispositivo los descarta al
+    # recibir el borrado del cliente.
+    '''
+    CREATE OR REPLACE FUNCTION registrar_cambio() RETURNS trigger AS $$
+    DECLARE
+        v_anterior INTEGER;
+        v_nuevo INTEGER;
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            IF TG_TABLE_NAME = 'pagos' THEN
+                SELECT usuario_id INTO v_anterior FROM clientes WHERE id = OLD.cliente_id;
+            ELSE
+                v_anterior := OLD.usuario_id;
+            END IF;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            IF TG_TABLE_NAME = 'pagos' THEN
+                SELECT usuario_id INTO v_nuevo FROM clientes WHERE id = NEW.cliente_id;
+            ELSE
+                v_nuevo := NEW.usuario_id;
+            END IF;
+        END IF;
+
+        -- Borrado, o el registro pasó a otro cobrador
+        IF v_anterior IS NOT NULL AND v_anterior IS DISTINCT FROM v_nuevo THEN
+            INSERT INTO cambios (tabla, registro_id, usuario_id, operacion)
+            VALUES (TG_TABLE_NAME, OLD.id, v_anterior, 'D');
+        END IF;
+        IF v_nuevo IS NOT NULL THEN
+            INSERT INTO cambios (tabla, registro_id, usuario_id, operacion)
+            VALUES (TG_TABLE_NAME, NEW.id, v_nuevo, 'U');
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    ''',
+    'DROP TRIGGER IF EXISTS trg_cambios_clientes ON clientes',
+    '''CREATE TRIGGER trg_cambios_clientes
+       AFTER INSERT OR UPDATE OR DELETE ON clientes
+       FOR EACH ROW EXECUTE FUNCTION registrar_cambio()''',
+    'DROP TRIGGER IF EXISTS trg_cambios_pagos ON pagos',
+    '''CREATE TRIGGER trg_cambios_pagos
+       AFTER INSERT OR UPDATE OR DELETE ON pagos
+       FOR EACH ROW EXECUTE FUNCTION registrar_cambio()''',
+    'DROP TRIGGER IF EXISTS trg_cambios_gastos ON gastos_semanales',
+    '''CREATE TRIGGER trg_cambios_gastos
+       AFTER INSERT OR UPDATE OR DELETE ON gastos_semanales
+       FOR EACH ROW EXECUTE FUNCTION registrar_cambio()''',
+    'DROP TRIGGER IF EXISTS trg_cambios_bases ON bases_semanales',
+    '''CREATE TRIGGER trg_cambios_bases
+       AFTER INSERT OR UPDATE OR DELETE ON bases_semanales
+       FOR EACH ROW EXECUTE FUNCTION registrar_cambio()''',
+)
+
+# Cursor de sincronización: toda transacción con txid menor ya terminó
+CURSOR_SQL = 'SELECT pg_snapshot_xmin(pg_current_snapshot())::text AS cursor'
+
+# Parámetros: días de retención. Se borra por txid (no por fecha) hasta la
+# transacción más nueva entre los cambios vencidos, y se anota ese txid
+LIMPIAR_CAMBIOS_SQL = '''
+    WITH corte AS (
+        SELECT txid FROM cambios
+        WHERE creado < CURRENT_TIMESTAMP - make_interval(days => %s)
+        ORDER BY txid DESC
+        LIMIT 1
+    ), borrados AS (
+        DELETE FROM cambios c
+        USING corte
+        WHERE c.txid <= corte.txid
+        RETURNING c.id
+    ), marca AS (
+        INSERT INTO cambios_purga (id, txid)
+        SELECT 1, txid FROM corte
+        ON CONFLICT (id) DO UPDATE SET txid = GREATEST(cambios_purga.txid, EXCLUDED.txid)
+    )
+    SELECT id FROM borrados
+'''
+
+# Parámetros: cursor del dispositivo. Retorna una fila si se borraron
+# cambios desde ese cursor (hay que enviar la copia completa)
+CURSOR_VENCIDO_SQL = 'SELECT 1 FROM cambios_purga WHERE id = 1 AND txid >= %s::xid8'
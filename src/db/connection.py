@@ -3,18 +3,26 @@ Gestión de conexión a PostgreSQL.
 
 Proporciona una clase Database que maneja:
 - Pool de conexiones
-- Transacciones
+- Transacciones (una conexión y un commit por bloque)
 - Manejo de errores
 - Inicialización de tablas
 """
 
 import psycopg2
-from psycopg2 import pool, extras
+from psycopg2 import extras
 from contextlib import contextmanager
 import os
-from typing import Optional, List, Tuple, Any
+import threading
+from typing import Optional, List, Tuple, Any, Dict
 import logging
 
+from .pool import BoundedConnectionPool
+from .saldos import COLUMNAS_SALDO_SQL, RECALCULAR_SALDOS_SQL
+from .resumen_diario import RESUMEN_DIARIO_SQL, RECONSTRUIR_RESUMEN_SQL
+from .cambios import CAMBIOS_SQL
+from .idempotencia import IDEMPOTENCIA_SQL
+from .intentos_login import INTENTOS_LOGIN_SQL
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,7 +34,9 @@ class Database:
     de múltiples clientes concurrentes.
     """
     
-    _connection_pool: Optional[pool.SimpleConnectionPool] = None
+    _connection_pool: Optional[BoundedConnectionPool] = None
+    # Conexión ligada a la transacción abierta en cada hilo (ver transaction())
+    _local = threading.local()
     
     def __init__(self, 
                  host: str = None,
@@ -51,15 +61,21 @@ class Database:
         self.user = user or os.getenv('DB_USER', 'postgres')
         self.password = password or os.getenv('DB_PASSWORD', 'postgres')
         
+        # Dimensionamiento del pool
+        self.pool_min = int(os.getenv('DB_POOL_MIN', '1'))
+        self.pool_max = int(os.getenv('DB_POOL_MAX', '10'))
+        self.pool_timeout = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+        
         self._init_pool()
     
     def _init_pool(self):
         """Inicializa el pool de conexiones."""
         try:
             if Database._connection_pool is None:
-                Database._connection_pool = psycopg2.pool.SimpleConnectionPool(
-                    minconn=1,
-                    maxconn=10,
+                Database._connection_pool = BoundedConnectionPool(
+                    minconn=self.pool_min,
+                    maxconn=self.pool_max,
+                    timeout=self.pool_timeout,
                     host=self.host,
                     port=self.port,
                     database=self.database,
@@ -81,6 +97,12 @@ class Database:
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM usuarios")
         """
+        # Dentro de transaction() se reutiliza la conexión del hilo
+        bound = getattr(Database._local, 'conn', None)
+        if bound is not None:
+            yield bound
+            return
+        
         conn = None
         try:
             conn = Database._connection_pool.getconn()
@@ -95,6 +117,32 @@ class Database:
             if conn:
                 Database._connection_pool.putconn(conn)
     
+    @contextmanager
+    def transaction(self):
+        """
+        Context manager que agrupa varias operaciones en una transacción.
+        
+        Todas las llamadas a execute/fetch_one/fetch_all hechas desde el
+        mismo hilo dentro del bloque usan una sola conexión y se confirman
+        con un único commit al salir (rollback si hay una excepción).
+        Las transacciones anidadas se unen a la exterior.
+        
+        Usage:
+            with db.transaction():
+                db.execute("UPDATE ...")
+                db.fetch_one("SELECT ...")
+        """
+        if getattr(Database._local, 'conn', None) is not None:
+            yield self
+            return
+        
+        with self.get_connection() as conn:
+            Database._local.conn = conn
+            try:
+                yield self
+            finally:
+                Database._local.conn = None
+    
     @contextmanager
     def get_cursor(self, cursor_factory=None):
         """
@@ -205,6 +253,15 @@ class Database:
                 )
             ''')
             
+            # Saldos denormalizados de clientes (mantenidos por las rutas de pagos)
+            cur.execute('''
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'clientes' AND column_name = 'total_pagado'
+            ''')
+            saldos_nuevos = cur.fetchone() is None
+            for sql in COLUMNAS_SALDO_SQL:
+                cur.execute(sql)
+            
             # Tabla de pagos
             cur.execute('''
                 CREATE TABLE IF NOT EXISTS pagos (
@@ -235,12 +292,59 @@ class Database:
             cur.execute('CREATE INDEX IF NOT EXISTS idx_clientes_estado ON clientes(estado)')
             cur.execute('CREATE INDEX IF NOT EXISTS idx_pagos_cliente_id ON pagos(cliente_id)')
             cur.execute('CREATE INDEX IF NOT EXISTS idx_pagos_fecha ON pagos(fecha)')
+            # Paginación por cursor (fecha, id) de clientes y pagos
+            cur.execute('DROP INDEX IF EXISTS idx_clientes_usuario_fecha')
+            cur.execute(
+                'CREATE INDEX IF NOT EXISTS idx_clientes_usuario_fecha_id '
+                'ON clientes(usuario_id, fecha_prestamo DESC, id DESC)'
+            )
+            cur.execute(
+                'CREATE INDEX IF NOT EXISTS idx_clientes_fecha_id '
+                'ON clientes(fecha_prestamo DESC, id DESC)'
+            )
+            cur.execute('CREATE INDEX IF NOT EXISTS idx_pagos_fecha_id ON pagos(fecha DESC, id DESC)')
+            # Búsqueda de clientes: trigramas para ILIKE/similitud y cédula exacta
+            cur.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            cur.execute('CREATE INDEX IF NOT EXISTS idx_clientes_cedula ON clientes(cedula)')
+            for columna in ('nombre', 'cedula', 'telefono'):
+                cur.execute(
+                    f'CREATE INDEX IF NOT EXISTS idx_clientes_{columna}_trgm '
+                    f'ON clientes USING gin ({columna} gin_trgm_ops)'
+                )
+            
+            # Al agregar las columnas de saldo a una base existente, calcularlas
+            if saldos_nuevos:
+                cur.execute(RECALCULAR_SALDOS_SQL)
+                logger.info("✅ Saldos de clientes calculados desde el historial de pagos")
+            
+            # Resumen diario por cobrador (mantenido por triggers)
+            cur.execute("SELECT to_regclass('resumen_diario') IS NULL AS nuevo")
+            resumen_nuevo = cur.fetchone()['nuevo']
+            for sql in RESUMEN_DIARIO_SQL:
+                cur.execute(sql)
+            if resumen_nuevo:
+                for sql in RECONSTRUIR_RESUMEN_SQL:
+                    cur.execute(sql)
+                logger.info("✅ Resumen diario calculado desde el historial")
+            
+            # Registro de cambios para la sincronización de los dispositivos
+            for sql in CAMBIOS_SQL:
+                cur.execute(sql)
+            
+            # Claves de idempotencia de las rutas de escritura
+            for sql in IDEMPOTENCIA_SQL:
+                cur.execute(sql)
+            
+            # Intentos fallidos de login (bloqueo compartido entre workers)
+            for sql in INTENTOS_LOGIN_SQL:
+                cur.execute(sql)
             
             logger.info("✅ Tablas creadas exitosamente")
     
     def inicializar_admin(self):
         """Crea el usuario administrador por defecto si no existe."""
         import bcrypt
+        from src.config import SecurityConfig
         
         # Verificar si ya existe un administrador
         admin = self.fetch_one(
@@ -248,13 +352,24 @@ class Database:
         )
         
         if not admin:
-            password = bcrypt.hashpw('admin123'.encode('utf-8'), bcrypt.gensalt())
+            password = bcrypt.hashpw('admin123'.encode('utf-8'), bcrypt.gensalt(SecurityConfig.BCRYPT_ROUNDS))
             self.execute('''
                 INSERT INTO usuarios (username, password, nombre, es_admin)
                 VALUES (%s, %s, %s, %s)
             ''', ('admin', password.decode('utf-8'), 'Administrador', True))
             logger.info("✅ Usuario administrador creado")
     
+    def pool_stats(self) -> Dict:
+        """
+        Retorna las métricas del pool (en uso, libres, en espera, latencias).
+        
+        Returns:
+            Dict con las métricas o vacío si el pool no existe
+        """
+        if Database._connection_pool is None:
+            return {}
+        return Database._connection_pool.stats()
+    
     def close_all_connections(self):
         """Cierra todas las conexiones del pool."""
         if Database._connection_pool:
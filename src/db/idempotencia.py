@@ -0,0 +1,54 @@
+"""
+Claves de idempotencia de las rutas de escritura (tabla idempotencia).
+
+Guarda por (usuario_id, clave) la respuesta de cada escritura hecha con el
+header Idempotency-Key, para que un reintento devuelva la misma respuesta
+sin volver a escribir. Las claves vencen a las IDEMPOTENCIA_TTL_HORAS; la
+API borra las vencidas periódicamente y este módulo permite hacerlo a mano.
+"""
+
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Horas que se conserva cada clave (los reintentos llegan en minutos)
+IDEMPOTENCIA_TTL_HORAS = int(os.getenv('IDEMPOTENCIA_TTL_HORAS', '24'))
+
+# Tabla e índice para la limpieza por antigüedad (idempotente para bases existentes)
+IDEMPOTENCIA_SQL = (
+    '''
+    CREATE TABLE IF NOT EXISTS idempotencia (
+        usuario_id INTEGER NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+        clave VARCHAR(100) NOT NULL,
+        ruta TEXT NOT NULL,
+        respuesta JSONB,
+        creado TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (usuario_id, clave)
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_idempotencia_creado ON idempotencia(creado)',
+)
+
+# Parámetros: horas de vigencia
+LIMPIAR_IDEMPOTENCIA_SQL = '''
+    DELETE FROM idempotencia
+    WHERE creado < CURRENT_TIMESTAMP - make_interval(hours => %s)
+    RETURNING clave
+'''
+
+
+def limpiar_idempotencia(db, horas: int = IDEMPOTENCIA_TTL_HORAS) -> int:
+    """
+    Borra las claves de idempotencia vencidas.
+
+    Args:
+        db: Instancia de Database (síncrona)
+        horas: Antigüedad a partir de la cual se borran
+
+    Returns:
+        int: Número de claves borradas
+    """
+    borradas = db.fetch_all(LIMPIAR_IDEMPOTENCIA_SQL, (horas,))
+    logger.info(f"✅ Claves de idempotencia vencidas borradas: {len(borradas)}")
+    return len(borradas)
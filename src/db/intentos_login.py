@@ -0,0 +1,28 @@
+"""
+Intentos fallidos de login compartidos entre workers (tabla login_intentos).
+
+Con varios workers de la API, el registro en memoria de cada proceso no ve
+los intentos hechos contra los demás. Con LOGIN_INTENTOS_BACKEND=postgres
+la API anota aquí cada intento fallido (por usuario y por IP) y cuenta los
+de la ventana de SecurityConfig.LOCKOUT_DURATION. La API borra cada hora
+los intentos fuera de la ventana.
+"""
+
+# Tabla e índice por clave y fecha (idempotente para bases existentes)
+INTENTOS_LOGIN_SQL = (
+    '''
+    CREATE TABLE IF NOT EXISTS login_intentos (
+        id BIGSERIAL PRIMARY KEY,
+        clave TEXT NOT NULL,
+        creado TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_login_intentos_clave ON login_intentos(clave, creado)',
+)
+
+# Parámetros: segundos de la ventana
+LIMPIAR_INTENTOS_LOGIN_SQL = '''
+    DELETE FROM login_intentos
+    WHERE creado < CURRENT_TIMESTAMP - make_interval(secs => %s)
+    RETURNING id
+'''
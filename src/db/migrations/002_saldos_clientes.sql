@@ -0,0 +1,32 @@
+-- Saldos denormalizados de clientes
+-- Gestor de Préstamos v2.0.0
+--
+-- Agrega total_pagado, ultimo_pago_fecha y saldo_pendiente (generada) a
+-- clientes para que los listados no sumen todo el historial de pagos.
+-- Las rutas de pagos mantienen estos valores al registrar y eliminar pagos.
+
+ALTER TABLE clientes ADD COLUMN IF NOT EXISTS total_pagado DECIMAL(12, 2) NOT NULL DEFAULT 0;
+ALTER TABLE clientes ADD COLUMN IF NOT EXISTS ultimo_pago_fecha DATE;
+ALTER TABLE clientes ADD COLUMN IF NOT EXISTS saldo_pendiente DECIMAL(14, 2)
+    GENERATED ALWAYS AS (monto_prestado + monto_prestado * tasa_interes - total_pagado) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_clientes_usuario_fecha ON clientes(usuario_id, fecha_prestamo DESC);
+
+-- Calcular los saldos a partir del historial existente
+UPDATE clientes c
+SET total_pagado = t.total_real,
+    ultimo_pago_fecha = t.ultima_real
+FROM (
+    SELECT c2.id,
+           COALESCE(SUM(p.monto), 0) AS total_real,
+           MAX(p.fecha) AS ultima_real
+    FROM clientes c2
+    LEFT JOIN pagos p ON p.cliente_id = c2.id
+    GROUP BY c2.id
+) t
+WHERE c.id = t.id;
+
+COMMENT ON COLUMN clientes.total_pagado IS 'Suma de pagos del cliente (mantenida en cada pago)';
+COMMENT ON COLUMN clientes.saldo_pendiente IS 'Monto + interés - total pagado';
+
+SELECT 'Saldos de clientes agregados correctamente' AS mensaje;
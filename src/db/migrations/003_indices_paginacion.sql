@@ -0,0 +1,13 @@
+-- Índices para paginación por cursor (keyset)
+-- Gestor de Préstamos v2.0.0
+--
+-- Los listados se ordenan por (fecha, id) descendente y la página
+-- siguiente se pide con WHERE (fecha, id) < (cursor), así que estos
+-- índices permiten leer solo las filas de cada página.
+
+DROP INDEX IF EXISTS idx_clientes_usuario_fecha;
+CREATE INDEX IF NOT EXISTS idx_clientes_usuario_fecha_id ON clientes(usuario_id, fecha_prestamo DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_clientes_fecha_id ON clientes(fecha_prestamo DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_pagos_fecha_id ON pagos(fecha DESC, id DESC);
+
+SELECT 'Índices de paginación creados correctamente' AS mensaje;
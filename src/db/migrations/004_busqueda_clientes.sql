@@ -0,0 +1,15 @@
+-- Búsqueda de clientes por trigramas
+-- Gestor de Préstamos v2.0.0
+--
+-- Índices GIN con pg_trgm para que la búsqueda por nombre, cédula o
+-- teléfono (ILIKE '%texto%' y similitud) no recorra toda la tabla, y un
+-- índice normal para la búsqueda exacta por cédula.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_clientes_cedula ON clientes(cedula);
+CREATE INDEX IF NOT EXISTS idx_clientes_nombre_trgm ON clientes USING gin (nombre gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_clientes_cedula_trgm ON clientes USING gin (cedula gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_clientes_telefono_trgm ON clientes USING gin (telefono gin_trgm_ops);
+
+SELECT 'Índices de búsqueda creados correctamente' AS mensaje;
@@ -0,0 +1,194 @@
+-- Resumen diario por cobrador
+-- Gestor de Préstamos v2.0.0
+--
+-- Tabla resumen_diario (usuario_id, fecha) con lo cobrado, prestado,
+-- gastos y base de cada día, mantenida por triggers en la misma
+-- transacción que cada escritura. Mismo esquema que crea la aplicación
+-- (src/db/resumen_diario.py). Verificar con:
+--
+--     python mantenimiento_db.py verificar-resumen
+
+CREATE TABLE IF NOT EXISTS resumen_diario (
+    usuario_id INTEGER NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+    fecha DATE NOT NULL,
+    efectivo DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    digital DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    num_pagos INTEGER NOT NULL DEFAULT 0,
+    prestado DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    seguros DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    gastos DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    base DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (usuario_id, fecha)
+);
+
+CREATE INDEX IF NOT EXISTS idx_resumen_diario_fecha ON resumen_diario(fecha);
+
+CREATE OR REPLACE FUNCTION resumen_diario_sumar(
+    p_usuario_id INTEGER, p_fecha DATE,
+    p_efectivo NUMERIC, p_digital NUMERIC, p_num_pagos INTEGER,
+    p_prestado NUMERIC, p_seguros NUMERIC, p_gastos NUMERIC, p_base NUMERIC
+) RETURNS void AS $$
+BEGIN
+    IF p_usuario_id IS NULL OR p_fecha IS NULL THEN
+        RETURN;
+    END IF;
+    INSERT INTO resumen_diario AS r
+        (usuario_id, fecha, efectivo, digital, num_pagos, prestado, seguros, gastos, base)
+    SELECT p_usuario_id, p_fecha, p_efectivo, p_digital, p_num_pagos,
+           p_prestado, p_seguros, p_gastos, p_base
+    WHERE EXISTS (SELECT 1 FROM usuarios WHERE id = p_usuario_id)
+    ON CONFLICT (usuario_id, fecha) DO UPDATE SET
+        efectivo = r.efectivo + EXCLUDED.efectivo,
+        digital = r.digital + EXCLUDED.digital,
+        num_pagos = r.num_pagos + EXCLUDED.num_pagos,
+        prestado = r.prestado + EXCLUDED.prestado,
+        seguros = r.seguros + EXCLUDED.seguros,
+        gastos = r.gastos + EXCLUDED.gastos,
+        base = r.base + EXCLUDED.base;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION resumen_diario_pagos() RETURNS trigger AS $$
+DECLARE
+    v_usuario_id INTEGER;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        -- Si el cliente se está borrando, su trigger ya descontó los pagos
+        SELECT usuario_id INTO v_usuario_id FROM clientes WHERE id = OLD.cliente_id;
+        PERFORM resumen_diario_sumar(
+            v_usuario_id, OLD.fecha,
+            -CASE WHEN OLD.tipo_pago = 'efectivo' THEN OLD.monto ELSE 0 END,
+            -CASE WHEN OLD.tipo_pago = 'digital' THEN OLD.monto ELSE 0 END,
+            -1, 0, 0, 0, 0);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT usuario_id INTO v_usuario_id FROM clientes WHERE id = NEW.cliente_id;
+        PERFORM resumen_diario_sumar(
+            v_usuario_id, NEW.fecha,
+            CASE WHEN NEW.tipo_pago = 'efectivo' THEN NEW.monto ELSE 0 END,
+            CASE WHEN NEW.tipo_pago = 'digital' THEN NEW.monto ELSE 0 END,
+            1, 0, 0, 0, 0);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION resumen_diario_clientes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM resumen_diario_sumar(
+            OLD.usuario_id, OLD.fecha_prestamo,
+            0, 0, 0, -OLD.monto_prestado, -OLD.seguro, 0, 0);
+    END IF;
+    IF TG_OP = 'DELETE'
+       OR (TG_OP = 'UPDATE' AND NEW.usuario_id IS DISTINCT FROM OLD.usuario_id) THEN
+        PERFORM resumen_diario_sumar(
+            OLD.usuario_id, t.fecha, -t.efectivo, -t.digital, -t.num_pagos, 0, 0, 0, 0)
+        FROM (SELECT fecha,
+                     SUM(CASE WHEN tipo_pago = 'efectivo' THEN monto ELSE 0 END) AS efectivo,
+                     SUM(CASE WHEN tipo_pago = 'digital' THEN monto ELSE 0 END) AS digital,
+                     COUNT(*)::integer AS num_pagos
+              FROM pagos WHERE cliente_id = OLD.id GROUP BY fecha) t;
+    END IF;
+    IF TG_OP = 'UPDATE' AND NEW.usuario_id IS DISTINCT FROM OLD.usuario_id THEN
+        PERFORM resumen_diario_sumar(
+            NEW.usuario_id, t.fecha, t.efectivo, t.digital, t.num_pagos, 0, 0, 0, 0)
+        FROM (SELECT fecha,
+                     SUM(CASE WHEN tipo_pago = 'efectivo' THEN monto ELSE 0 END) AS efectivo,
+                     SUM(CASE WHEN tipo_pago = 'digital' THEN monto ELSE 0 END) AS digital,
+                     COUNT(*)::integer AS num_pagos
+              FROM pagos WHERE cliente_id = NEW.id GROUP BY fecha) t;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM resumen_diario_sumar(
+            NEW.usuario_id, NEW.fecha_prestamo,
+            0, 0, 0, NEW.monto_prestado, NEW.seguro, 0, 0);
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        RETURN OLD;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION resumen_diario_movimientos() RETURNS trigger AS $$
+DECLARE
+    es_gasto BOOLEAN := TG_TABLE_NAME = 'gastos_semanales';
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM resumen_diario_sumar(
+            OLD.usuario_id, OLD.fecha, 0, 0, 0, 0, 0,
+            CASE WHEN es_gasto THEN -OLD.monto ELSE 0 END,
+            CASE WHEN es_gasto THEN 0 ELSE -OLD.monto END);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM resumen_diario_sumar(
+            NEW.usuario_id, NEW.fecha, 0, 0, 0, 0, 0,
+            CASE WHEN es_gasto THEN NEW.monto ELSE 0 END,
+            CASE WHEN es_gasto THEN 0 ELSE NEW.monto END);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_resumen_pagos ON pagos;
+
+CREATE TRIGGER trg_resumen_pagos
+    AFTER INSERT OR UPDATE OR DELETE ON pagos
+    FOR EACH ROW EXECUTE FUNCTION resumen_diario_pagos();
+
+DROP TRIGGER IF EXISTS trg_resumen_clientes ON clientes;
+
+CREATE TRIGGER trg_resumen_clientes
+    AFTER INSERT OR UPDATE OF usuario_id, fecha_prestamo, monto_prestado, seguro ON clientes
+    FOR EACH ROW EXECUTE FUNCTION resumen_diario_clientes();
+
+DROP TRIGGER IF EXISTS trg_resumen_clientes_borrado ON clientes;
+
+CREATE TRIGGER trg_resumen_clientes_borrado
+    BEFORE DELETE ON clientes
+    FOR EACH ROW EXECUTE FUNCTION resumen_diario_clientes();
+
+DROP TRIGGER IF EXISTS trg_resumen_gastos ON gastos_semanales;
+
+CREATE TRIGGER trg_resumen_gastos
+    AFTER INSERT OR UPDATE OR DELETE ON gastos_semanales
+    FOR EACH ROW EXECUTE FUNCTION resumen_diario_movimientos();
+
+DROP TRIGGER IF EXISTS trg_resumen_bases ON bases_semanales;
+
+CREATE TRIGGER trg_resumen_bases
+    AFTER INSERT OR UPDATE OR DELETE ON bases_semanales
+    FOR EACH ROW EXECUTE FUNCTION resumen_diario_movimientos();
+
+-- Calcular el resumen a partir del historial existente
+BEGIN;
+LOCK TABLE resumen_diario IN EXCLUSIVE MODE;
+DELETE FROM resumen_diario;
+INSERT INTO resumen_diario
+    (usuario_id, fecha, efectivo, digital, num_pagos, prestado, seguros, gastos, base)
+SELECT usuario_id, fecha,
+       SUM(efectivo), SUM(digital), SUM(num_pagos)::integer,
+       SUM(prestado), SUM(seguros), SUM(gastos), SUM(base)
+FROM (
+    SELECT c.usuario_id, p.fecha,
+           CASE WHEN p.tipo_pago = 'efectivo' THEN p.monto ELSE 0 END AS efectivo,
+           CASE WHEN p.tipo_pago = 'digital' THEN p.monto ELSE 0 END AS digital,
+           1 AS num_pagos, 0 AS prestado, 0 AS seguros, 0 AS gastos, 0 AS base
+    FROM pagos p
+    JOIN clientes c ON p.cliente_id = c.id
+    UNION ALL
+    SELECT usuario_id, fecha_prestamo, 0, 0, 0, monto_prestado, seguro, 0, 0
+    FROM clientes
+    UNION ALL
+    SELECT usuario_id, fecha, 0, 0, 0, 0, 0, monto, 0
+    FROM gastos_semanales
+    UNION ALL
+    SELECT usuario_id, fecha, 0, 0, 0, 0, 0, 0, monto
+    FROM bases_semanales
+) movimientos
+WHERE usuario_id IS NOT NULL
+GROUP BY usuario_id, fecha;
+COMMIT;
+
+SELECT 'Resumen diario creado correctamente' AS mensaje;
@@ -0,0 +1,79 @@
+-- Registro de cambios para la sincronización
+-- Gestor de Préstamos v2.0.0
+--
+-- Tabla cambios con el registro, cobrador y transacción (xid8) de cada
+-- escritura en clientes, pagos, gastos_semanales y bases_semanales, para
+-- que GET /api/sync entregue solo lo que cambió desde el cursor del
+-- dispositivo. Mismo esquema que crea la aplicación (src/db/cambios.py).
+-- Requiere PostgreSQL 13 o superior (pg_current_xact_id).
+
+CREATE TABLE IF NOT EXISTS cambios (
+    id BIGSERIAL PRIMARY KEY,
+    txid XID8 NOT NULL DEFAULT pg_current_xact_id(),
+    tabla TEXT NOT NULL,
+    registro_id INTEGER NOT NULL,
+    usuario_id INTEGER NOT NULL,
+    operacion CHAR(1) NOT NULL,
+    creado TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_cambios_txid ON cambios(txid);
+CREATE INDEX IF NOT EXISTS idx_cambios_usuario_txid ON cambios(usuario_id, txid);
+
+-- 'U': el registro está vigente para el cobrador; 'D': se eliminó o pasó
+-- a otro cobrador. Los pagos borrados en cascada con su cliente no se
+-- anotan: el dispositivo los descarta al recibir el borrado del cliente.
+CREATE OR REPLACE FUNCTION registrar_cambio() RETURNS trigger AS $$
+DECLARE
+    v_anterior INTEGER;
+    v_nuevo INTEGER;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        IF TG_TABLE_NAME = 'pagos' THEN
+            SELECT usuario_id INTO v_anterior FROM clientes WHERE id = OLD.cliente_id;
+        ELSE
+            v_anterior := OLD.usuario_id;
+        END IF;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        IF TG_TABLE_NAME = 'pagos' THEN
+            SELECT usuario_id INTO v_nuevo FROM clientes WHERE id = NEW.cliente_id;
+        ELSE
+            v_nuevo := NEW.usuario_id;
+        END IF;
+    END IF;
+
+    -- Borrado, o el registro pasó a otro cobrador
+    IF v_anterior IS NOT NULL AND v_anterior IS DISTINCT FROM v_nuevo THEN
+        INSERT INTO cambios (tabla, registro_id, usuario_id, operacion)
+        VALUES (TG_TABLE_NAME, OLD.id, v_anterior, 'D');
+    END IF;
+    IF v_nuevo IS NOT NULL THEN
+        INSERT INTO cambios (tabla, registro_id, usuario_id, operacion)
+        VALUES (TG_TABLE_NAME, NEW.id, v_nuevo, 'U');
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_cambios_clientes ON clientes;
+CREATE TRIGGER trg_cambios_clientes
+    AFTER INSERT OR UPDATE OR DELETE ON clientes
+    FOR EACH ROW EXECUTE FUNCTION registrar_cambio();
+
+DROP TRIGGER IF EXISTS trg_cambios_pagos ON pagos;
+CREATE TRIGGER trg_cambios_pagos
+    AFTER INSERT OR UPDATE OR DELETE ON pagos
+    FOR EACH ROW EXECUTE FUNCTION registrar_cambio();
+
+DROP TRIGGER IF EXISTS trg_cambios_gastos ON gastos_semanales;
+CREATE TRIGGER trg_cambios_gastos
+    AFTER INSERT OR UPDATE OR DELETE ON gastos_semanales
+    FOR EACH ROW EXECUTE FUNCTION registrar_cambio();
+
+DROP TRIGGER IF EXISTS trg_cambios_bases ON bases_semanales;
+CREATE TRIGGER trg_cambios_bases
+    AFTER INSERT OR UPDATE OR DELETE ON bases_semanales
+    FOR EACH ROW EXECUTE FUNCTION registrar_cambio();
+
+SELECT 'Registro de cambios creado correctamente' AS mensaje;
@@ -0,0 +1,22 @@
+-- Claves de idempotencia
+-- Gestor de Préstamos v2.0.0
+--
+-- Tabla idempotencia con la respuesta de cada escritura hecha con el
+-- header Idempotency-Key (pagos, clientes, gastos y bases), para que un
+-- reintento retorne la respuesta original sin volver a escribir. La API
+-- borra cada hora las claves vencidas; a mano:
+--
+--     python mantenimiento_db.py limpiar-idempotencia
+
+CREATE TABLE IF NOT EXISTS idempotencia (
+    usuario_id INTEGER NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+    clave VARCHAR(100) NOT NULL,
+    ruta TEXT NOT NULL,
+    respuesta JSONB,
+    creado TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (usuario_id, clave)
+);
+
+CREATE INDEX IF NOT EXISTS idx_idempotencia_creado ON idempotencia(creado);
+
+SELECT 'Tabla de idempotencia creada correctamente' AS mensaje;
@@ -0,0 +1,17 @@
+-- Intentos fallidos de login
+-- Gestor de Préstamos v2.0.0
+--
+-- Tabla login_intentos con cada intento fallido de login por usuario y por
+-- IP. La usa la API con LOGIN_INTENTOS_BACKEND=postgres para bloquear los
+-- intentos repetidos aunque corran varios workers; borra cada hora los
+-- intentos fuera de la ventana de bloqueo.
+
+CREATE TABLE IF NOT EXISTS login_intentos (
+    id BIGSERIAL PRIMARY KEY,
+    clave TEXT NOT NULL,
+    creado TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_login_intentos_clave ON login_intentos(clave, creado);
+
+SELECT 'Tabla de intentos de login creada correctamente' AS mensaje;
@@ -0,0 +1,16 @@
+-- Retención del registro de cambios
+-- Gestor de Préstamos v2.0.0
+--
+-- La API borra cada hora los cambios de más de CAMBIOS_RETENCION_DIAS y
+-- anota en cambios_purga la última transacción borrada; GET /api/sync
+-- envía la copia completa a los dispositivos con un cursor anterior.
+-- Mismo esquema que crea la aplicación (src/db/cambios.py).
+
+CREATE TABLE IF NOT EXISTS cambios_purga (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    txid XID8 NOT NULL
+);
+
+COMMENT ON TABLE cambios_purga IS 'Último txid borrado del registro de cambios';
+
+SELECT 'Retención del registro de cambios configurada correctamente' AS mensaje;
@@ -54,6 +54,9 @@ class Cliente:
     cuota_minima: Decimal = Decimal('0.00')
     dias_plazo: int = 0
     estado: str = 'activo'
+    total_pagado: Decimal = Decimal('0.00')
+    saldo_pendiente: Decimal = Decimal('0.00')
+    ultimo_pago_fecha: Optional[date] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     
@@ -73,6 +76,9 @@ class Cliente:
             'cuota_minima': float(self.cuota_minima),
             'dias_plazo': self.dias_plazo,
             'estado': self.estado,
+            'total_pagado': float(self.total_pagado),
+            'saldo_pendiente': float(self.saldo_pendiente),
+            'ultimo_pago_fecha': self.ultimo_pago_fecha.isoformat() if self.ultimo_pago_fecha else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
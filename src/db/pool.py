@@ -0,0 +1,244 @@
+"""
+Pool de conexiones thread-safe para psycopg2.
+
+A diferencia de psycopg2.pool.SimpleConnectionPool, este pool:
+- Es seguro para acceso desde varios hilos
+- Espera (con timeout configurable) cuando está agotado en vez de fallar
+- Valida las conexiones al entregarlas y descarta las muertas
+  (por ejemplo después de reiniciar PostgreSQL)
+- Expone métricas de uso para poder dimensionarlo
+"""
+
+import threading
+import time
+import logging
+from bisect import bisect_left
+from typing import Dict, List
+
+import psycopg2
+from psycopg2 import extensions, pool
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores (en ms) de los buckets del histograma de espera
+ACQUIRE_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class PoolTimeoutError(pool.PoolError):
+    """No se obtuvo una conexión del pool dentro del tiempo de espera."""
+
+
+class BoundedConnectionPool:
+    """
+    Pool de conexiones con límite, cola de espera y métricas.
+
+    Usage:
+        conn_pool = BoundedConnectionPool(1, 10, timeout=30, host='localhost', ...)
+        conn = conn_pool.getconn()
+        try:
+            ...
+        finally:
+            conn_pool.putconn(conn)
+    """
+
+    def __init__(self, minconn: int, maxconn: int, timeout: float = 30.0, **connect_kwargs):
+        """
+        Crea el pool y abre las conexiones mínimas.
+
+        Args:
+            minconn: Conexiones que se abren al crear el pool
+            maxconn: Máximo de conexiones simultáneas
+            timeout: Segundos máximos de espera por una conexión libre
+            **connect_kwargs: Parámetros para psycopg2.connect
+        """
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("Se requiere 0 <= minconn <= maxconn y maxconn >= 1")
+
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self._connect_kwargs = connect_kwargs
+
+        self._cond = threading.Condition()
+        self._idle: List = []
+        self._in_use = set()
+        self._opening = 0
+        self._waiters = 0
+        self._closed = False
+
+        # Métricas
+        self._acquire_buckets = [0] * (len(ACQUIRE_BUCKETS_MS) + 1)
+        self._acquire_count = 0
+        self._acquire_total_ms = 0.0
+        self._timeouts = 0
+        self._discarded = 0
+
+        for _ in range(minconn):
+            self._idle.append(self._connect())
+
+    def _connect(self):
+        """Abre una nueva conexión física."""
+        return psycopg2.connect(**self._connect_kwargs)
+
+    def _total(self) -> int:
+        """Conexiones abiertas o en proceso de apertura (requiere el lock)."""
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    @staticmethod
+    def _is_alive(conn) -> bool:
+        """Verifica que la conexión siga respondiendo."""
+        if conn.closed:
+            return False
+        try:
+            with conn.cursor() as cur:
+                cur.execute('SELECT 1')
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        """Cierra una conexión sin devolverla al pool."""
+        self._discarded += 1
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def _record_acquire(self, elapsed_ms: float):
+        """Registra la latencia de obtención (requiere el lock)."""
+        self._acquire_count += 1
+        self._acquire_total_ms += elapsed_ms
+        self._acquire_buckets[bisect_left(ACQUIRE_BUCKETS_MS, elapsed_ms)] += 1
+
+    def getconn(self, timeout: float = None):
+        """
+        Obtiene una conexión validada, esperando si el pool está lleno.
+
+        Args:
+            timeout: Segundos de espera (default: el del pool)
+
+        Returns:
+            Conexión psycopg2 lista para usar
+
+        Raises:
+            PoolTimeoutError: Si no hay conexión disponible a tiempo
+            pool.PoolError: Si el pool está cerrado
+        """
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise pool.PoolError("El pool de conexiones está cerrado")
+                    if self._idle:
+                        conn = self._idle.pop()
+                        self._opening += 1
+                        is_new = False
+                        break
+                    if self._total() < self.maxconn:
+                        conn = None
+                        self._opening += 1
+                        is_new = True
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"Sin conexiones libres tras {timeout:.1f}s "
+                            f"({self.maxconn} en uso)"
+                        )
+                    self._waiters += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiters -= 1
+
+            # Abrir o validar fuera del lock para no bloquear a otros hilos
+            try:
+                if is_new:
+                    conn = self._connect()
+                elif not self._is_alive(conn):
+                    logger.warning("⚠️ Conexión muerta descartada del pool")
+                    with self._cond:
+                        self._discard(conn)
+                    conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._opening -= 1
+                    self._cond.notify()
+                raise
+
+            with self._cond:
+                self._opening -= 1
+                self._in_use.add(conn)
+                self._record_acquire((time.monotonic() - start) * 1000)
+            return conn
+
+    def putconn(self, conn, close: bool = False):
+        """
+        Devuelve una conexión al pool.
+
+        Args:
+            conn: Conexión obtenida con getconn()
+            close: True para cerrarla en vez de reutilizarla
+        """
+        with self._cond:
+            if conn not in self._in_use:
+                raise pool.PoolError("La conexión no pertenece a este pool")
+            self._in_use.discard(conn)
+
+            if close or self._closed or conn.closed:
+                self._discard(conn)
+            else:
+                try:
+                    status = conn.info.transaction_status
+                    if status != extensions.TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+                    self._idle.append(conn)
+                except psycopg2.Error:
+                    self._discard(conn)
+
+            self._cond.notify()
+
+    def closeall(self):
+        """Cierra todas las conexiones y marca el pool como cerrado."""
+        with self._cond:
+            self._closed = True
+            for conn in self._idle + list(self._in_use):
+                try:
+                    conn.close()
+                except psycopg2.Error:
+                    pass
+            self._idle.clear()
+            self._in_use.clear()
+            self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        """
+        Retorna las métricas actuales del pool.
+
+        Returns:
+            Dict con conexiones en uso, libres, hilos esperando y el
+            histograma de latencia de obtención (ms)
+        """
+        with self._cond:
+            labels = [f"<={b}ms" for b in ACQUIRE_BUCKETS_MS] + [f">{ACQUIRE_BUCKETS_MS[-1]}ms"]
+            return {
+                'min': self.minconn,
+                'max': self.maxconn,
+                'in_use': len(self._in_use),
+                'idle': len(self._idle),
+                'waiters': self._waiters,
+                'acquired': self._acquire_count,
+                'acquire_avg_ms': (
+                    self._acquire_total_ms / self._acquire_count if self._acquire_count else 0.0
+                ),
+                'acquire_histogram': dict(zip(labels, self._acquire_buckets)),
+                'timeouts': self._timeouts,
+                'discarded': self._discarded
+            }
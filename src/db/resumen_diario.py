@@ -0,0 +1,299 @@
+"""
+Resumen diario por cobrador (tabla resumen_diario).
+
+Guarda por (usuario_id, fecha) lo cobrado en efectivo y digital, el número
+de pagos, lo prestado, los seguros, los gastos y la base. Los triggers de
+pagos, clientes, gastos_semanales y bases_semanales lo actualizan en la
+misma transacción que cada escritura (incluidos los borrados en cascada),
+así que cualquier resumen por rango de fechas suma unas pocas filas en vez
+de recorrer pagos. Este módulo permite reconstruirlo desde cero y verificar
+que coincida con las tablas de origen.
+"""
+
+import logging
+from typing import List, Dict
+
+logger = logging.getLogger(__name__)
+
+# Tabla, función de acumulación y triggers (idempotente para bases existentes)
+RESUMEN_DIARIO_SQL = (
+    '''
+    CREATE TABLE IF NOT EXISTS resumen_diario (
+        usuario_id INTEGER NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+        fecha DATE NOT NULL,
+        efectivo DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        digital DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        num_pagos INTEGER NOT NULL DEFAULT 0,
+        prestado DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        seguros DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        gastos DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        base DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        PRIMARY KEY (usuario_id, fecha)
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_resumen_diario_fecha ON resumen_diario(fecha)',
+    # Suma (o resta, con valores negativos) en la fila del día. Ignora
+    # usuarios inexistentes: al borrar un usuario en cascada su resumen
+    # ya se eliminó junto con él.
+    '''
+    CREATE OR REPLACE FUNCTION resumen_diario_sumar(
+        p_usuario_id INTEGER, p_fecha DATE,
+        p_efectivo NUMERIC, p_digital NUMERIC, p_num_pagos INTEGER,
+        p_prestado NUMERIC, p_seguros NUMERIC, p_gastos NUMERIC, p_base NUMERIC
+    ) RETURNS void AS $$
+    BEGIN
+        IF p_usuario_id IS NULL OR p_fecha IS NULL THEN
+            RETURN;
+        END IF;
+        INSERT INTO resumen_diario AS r
+            (usuario_id, fecha, efectivo, digital, num_pagos, prestado, seguros, gastos, base)
+        SELECT p_usuario_id, p_fecha, p_efectivo, p_digital, p_num_pagos,
+               p_prestado, p_seguros, p_gastos, p_base
+        WHERE EXISTS (SELECT 1 FROM usuarios WHERE id = p_usuario_id)
+        ON CONFLICT (usuario_id, fecha) DO UPDATE SET
+            efectivo = r.efectivo + EXCLUDED.efectivo,
+            digital = r.digital + EXCLUDED.digital,
+            num_pagos = r.num_pagos + EXCLUDED.num_pagos,
+            prestado = r.prestado + EXCLUDED.prestado,
+            seguros = r.seguros + EXCLUDED.seguros,
+            gastos = r.gastos + EXCLUDED.gastos,
+            base = r.base + EXCLUDED.base;
+    END;
+    $$ LANGUAGE plpgsql
+    ''',
+    # Pagos: el cobrador es el dueño del cliente
+    '''
+    CREATE OR REPLACE FUNCTION resumen_diario_pagos() RETURNS trigger AS $$
+    DECLARE
+        v_usuario_id INTEGER;
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            -- Si el cliente se está borrando, su trigger ya descontó los pagos
+            SELECT usuario_id INTO v_usuario_id FROM clientes WHERE id = OLD.cliente_id;
+            PERFORM resumen_diario_sumar(
+                v_usuario_id, OLD.fecha,
+                -CASE WHEN OLD.tipo_pago = 'efectivo' THEN OLD.monto ELSE 0 END,
+                -CASE WHEN OLD.tipo_pago = 'digital' THEN OLD.monto ELSE 0 END,
+                -1, 0, 0, 0, 0);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            SELECT usuario_id INTO v_usuario_id FROM clientes WHERE id = NEW.cliente_id;
+            PERFORM resumen_diario_sumar(
+                v_usuario_id, NEW.fecha,
+                CASE WHEN NEW.tipo_pago = 'efectivo' THEN NEW.monto ELSE 0 END,
+                CASE WHEN NEW.tipo_pago = 'digital' THEN NEW.monto ELSE 0 END,
+                1, 0, 0, 0, 0);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    ''',
+    # Clientes: lo prestado y, al borrar o cambiar de cobrador, sus pagos
+    '''
+    CREATE OR REPLACE FUNCTION resumen_diario_clientes() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM resumen_diario_sumar(
+                OLD.usuario_id, OLD.fecha_prestamo,
+                0, 0, 0, -OLD.monto_prestado, -OLD.seguro, 0, 0);
+        END IF;
+        IF TG_OP = 'DELETE'
+           OR (TG_OP = 'UPDATE' AND NEW.usuario_id IS DISTINCT FROM OLD.usuario_id) THEN
+            PERFORM resumen_diario_sumar(
+                OLD.usuario_id, t.fecha, -t.efectivo, -t.digital, -t.num_pagos, 0, 0, 0, 0)
+            FROM (SELECT fecha,
+                         SUM(CASE WHEN tipo_pago = 'efectivo' THEN monto ELSE 0 END) AS efectivo,
+                         SUM(CASE WHEN tipo_pago = 'digital' THEN monto ELSE 0 END) AS digital,
+                         COUNT(*)::integer AS num_pagos
+                  FROM pagos WHERE cliente_id = OLD.id GROUP BY fecha) t;
+        END IF;
+        IF TG_OP = 'UPDATE' AND NEW.usuario_id IS DISTINCT FROM OLD.usuario_id THEN
+            PERFORM resumen_diario_sumar(
+                NEW.usuario_id, t.fecha, t.efectivo, t.digital, t.num_pagos, 0, 0, 0, 0)
+            FROM (SELECT fecha,
+                         SUM(CASE WHEN tipo_pago = 'efectivo' THEN monto ELSE 0 END) AS efectivo,
+                         SUM(CASE WHEN tipo_pago = 'digital' THEN monto ELSE 0 END) AS digital,
+                         COUNT(*)::integer AS num_pagos
+                  FROM pagos WHERE cliente_id = NEW.id GROUP BY fecha) t;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM resumen_diario_sumar(
+                NEW.usuario_id, NEW.fecha_prestamo,
+                0, 0, 0, NEW.monto_prestado, NEW.seguro, 0, 0);
+        END IF;
+        IF TG_OP = 'DELETE' THEN
+            RETURN OLD;
+        END IF;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    ''',
+    # Gastos y bases semanales
+    '''
+    CREATE OR REPLACE FUNCTION resumen_diario_movimientos() RETURNS trigger AS $$
+    DECLARE
+        es_gasto BOOLEAN := TG_TABLE_NAME = 'gastos_semanales';
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM resumen_diario_sumar(
+                OLD.usuario_id, OLD.fecha, 0, 0, 0, 0, 0,
+                CASE WHEN es_gasto THEN -OLD.monto ELSE 0 END,
+                CASE WHEN es_gasto THEN 0 ELSE -OLD.monto END);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM resumen_diario_sumar(
+                NEW.usuario_id, NEW.fecha, 0, 0, 0, 0, 0,
+                CASE WHEN es_gasto THEN NEW.monto ELSE 0 END,
+                CASE WHEN es_gasto THEN 0 ELSE NEW.monto END);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    ''',
+    'DROP TRIGGER IF EXISTS trg_resumen_pagos ON pagos',
+    '''CREATE TRIGGER trg_resumen_pagos
+       AFTER INSERT OR UPDATE OR DELETE ON pagos
+       FOR EACH ROW EXECUTE FUNCTION resumen_diario_pagos()''',
+    # Solo las columnas que afectan el resumen (registrar un pago también
+    # actualiza clientes, pero no estas columnas)
+    'DROP TRIGGER IF EXISTS trg_resumen_clientes ON clientes',
+    '''CREATE TRIGGER trg_resumen_clientes
+       AFTER INSERT OR UPDATE OF usuario_id, fecha_prestamo, monto_prestado, seguro ON clientes
+       FOR EACH ROW EXECUTE FUNCTION resumen_diario_clientes()''',
+    # BEFORE para descontar los pagos antes de que se borren en cascada
+    'DROP TRIGGER IF EXISTS trg_resumen_clientes_borrado ON clientes',
+    '''CREATE TRIGGER trg_resumen_clientes_borrado
+       BEFORE DELETE ON clientes
+       FOR EACH ROW EXECUTE FUNCTION resumen_diario_clientes()''',
+    'DROP TRIGGER IF EXISTS trg_resumen_gastos ON gastos_semanales',
+    '''CREATE TRIGGER trg_resumen_gastos
+       AFTER INSERT OR UPDATE OR DELETE ON gastos_semanales
+       FOR EACH ROW EXECUTE FUNCTION resumen_diario_movimientos()''',
+    'DROP TRIGGER IF EXISTS trg_resumen_bases ON bases_semanales',
+    '''CREATE TRIGGER trg_resumen_bases
+       AFTER INSERT OR UPDATE OR DELETE ON bases_semanales
+       FOR EACH ROW EXECUTE FUNCTION resumen_diario_movimientos()''',
+)
+
+# Serie diaria de un cobrador entre dos fechas (días sin movimiento en cero).
+# Parámetros: usuario_id, desde, hasta, usuario_id
+HISTORIAL_SQL = '''
+    WITH activos AS (
+        SELECT COUNT(*) AS total
+        FROM clientes
+        WHERE usuario_id = %s AND estado = 'activo'
+    )
+    SELECT d.fecha::date AS fecha,
+           u.nombre, u.username, u.es_admin,
+           a.total AS clientes_activos,
+           COALESCE(r.efectivo, 0) AS efectivo,
+           COALESCE(r.digital, 0) AS digital,
+           COALESCE(r.efectivo + r.digital, 0) AS cobrado,
+           COALESCE(r.num_pagos, 0) AS num_pagos,
+           COALESCE(r.prestado, 0) AS prestado,
+           COALESCE(r.seguros, 0) AS seguros,
+           COALESCE(r.gastos, 0) AS gastos,
+           COALESCE(r.base, 0) AS base
+    FROM usuarios u
+    CROSS JOIN activos a
+    CROSS JOIN generate_series(%s::date, %s::date, interval '1 day') AS d(fecha)
+    LEFT JOIN resumen_diario r
+      ON r.usuario_id = u.id AND r.fecha = d.fecha::date
+    WHERE u.id = %s
+    ORDER BY d.fecha DESC
+'''
+
+# Resumen calculado desde las tablas de origen
+_RESUMEN_REAL = '''
+    SELECT usuario_id, fecha,
+           SUM(efectivo) AS efectivo, SUM(digital) AS digital,
+           SUM(num_pagos)::integer AS num_pagos,
+           SUM(prestado) AS prestado, SUM(seguros) AS seguros,
+           SUM(gastos) AS gastos, SUM(base) AS base
+    FROM (
+        SELECT c.usuario_id, p.fecha,
+               CASE WHEN p.tipo_pago = 'efectivo' THEN p.monto ELSE 0 END AS efectivo,
+               CASE WHEN p.tipo_pago = 'digital' THEN p.monto ELSE 0 END AS digital,
+               1 AS num_pagos, 0 AS prestado, 0 AS seguros, 0 AS gastos, 0 AS base
+        FROM pagos p
+        JOIN clientes c ON p.cliente_id = c.id
+        UNION ALL
+        SELECT usuario_id, fecha_prestamo, 0, 0, 0, monto_prestado, seguro, 0, 0
+        FROM clientes
+        UNION ALL
+        SELECT usuario_id, fecha, 0, 0, 0, 0, 0, monto, 0
+        FROM gastos_semanales
+        UNION ALL
+        SELECT usuario_id, fecha, 0, 0, 0, 0, 0, 0, monto
+        FROM bases_semanales
+    ) movimientos
+    WHERE usuario_id IS NOT NULL
+    GROUP BY usuario_id, fecha
+'''
+
+# El bloqueo hace esperar a las escrituras concurrentes hasta terminar,
+# y sus triggers suman después sobre el resumen ya reconstruido
+RECONSTRUIR_RESUMEN_SQL = (
+    'LOCK TABLE resumen_diario IN EXCLUSIVE MODE',
+    'DELETE FROM resumen_diario',
+    f'''
+    INSERT INTO resumen_diario
+        (usuario_id, fecha, efectivo, digital, num_pagos, prestado, seguros, gastos, base)
+    SELECT usuario_id, fecha, efectivo, digital, num_pagos, prestado, seguros, gastos, base
+    FROM ({_RESUMEN_REAL}) r
+    ''',
+)
+
+VERIFICAR_RESUMEN_SQL = f'''
+    SELECT COALESCE(g.usuario_id, r.usuario_id) AS usuario_id,
+           COALESCE(g.fecha, r.fecha) AS fecha,
+           g.efectivo, r.efectivo AS efectivo_real,
+           g.digital, r.digital AS digital_real,
+           g.num_pagos, r.num_pagos AS num_pagos_real,
+           g.prestado, r.prestado AS prestado_real,
+           g.seguros, r.seguros AS seguros_real,
+           g.gastos, r.gastos AS gastos_real,
+           g.base, r.base AS base_real
+    FROM resumen_diario g
+    FULL JOIN ({_RESUMEN_REAL}) r
+      ON r.usuario_id = g.usuario_id AND r.fecha = g.fecha
+    WHERE (g.efectivo, g.digital, g.num_pagos, g.prestado, g.seguros, g.gastos, g.base)
+          IS DISTINCT FROM
+          (r.efectivo, r.digital, r.num_pagos, r.prestado, r.seguros, r.gastos, r.base)
+      -- Las filas en cero (todo borrado) equivalen a no tener fila
+      AND NOT (r.usuario_id IS NULL
+               AND g.efectivo = 0 AND g.digital = 0 AND g.num_pagos = 0
+               AND g.prestado = 0 AND g.seguros = 0 AND g.gastos = 0 AND g.base = 0)
+    ORDER BY 1, 2
+'''
+
+
+def reconstruir_resumen(db) -> int:
+    """
+    Reconstruye la tabla resumen_diario desde pagos, clientes, gastos y bases.
+
+    Args:
+        db: Instancia de Database (síncrona)
+
+    Returns:
+        int: Número de filas (cobrador, día) generadas
+    """
+    with db.transaction():
+        for sql in RECONSTRUIR_RESUMEN_SQL:
+            db.execute(sql)
+        filas = db.fetch_one('SELECT COUNT(*) AS total FROM resumen_diario')['total']
+    logger.info(f"✅ Resumen diario reconstruido: {filas} filas")
+    return filas
+
+
+def verificar_resumen(db) -> List[Dict]:
+    """
+    Compara resumen_diario con los totales calculados desde las tablas de origen.
+
+    Args:
+        db: Instancia de Database (síncrona)
+
+    Returns:
+        List[Dict]: Filas (cobrador, día) que no coinciden
+    """
+    return [dict(fila) for fila in db.fetch_all(VERIFICAR_RESUMEN_SQL)]
@@ -0,0 +1,91 @@
+"""
+Saldos denormalizados de clientes.
+
+La tabla clientes guarda total_pagado, ultimo_pago_fecha y saldo_pendiente
+(columna generada) para que los listados no tengan que sumar todo el
+historial de pagos. Las rutas de pagos los mantienen al insertar y borrar,
+junto con el estado ('pagado' si lo pagado cubre monto + interés); este
+módulo permite recalcularlos desde cero y verificar que coincidan.
+"""
+
+import logging
+from typing import List, Dict
+
+logger = logging.getLogger(__name__)
+
+# Columnas nuevas de clientes (idempotente para bases existentes)
+COLUMNAS_SALDO_SQL = (
+    'ALTER TABLE clientes ADD COLUMN IF NOT EXISTS total_pagado DECIMAL(12, 2) NOT NULL DEFAULT 0',
+    'ALTER TABLE clientes ADD COLUMN IF NOT EXISTS ultimo_pago_fecha DATE',
+    '''ALTER TABLE clientes ADD COLUMN IF NOT EXISTS saldo_pendiente DECIMAL(14, 2)
+       GENERATED ALWAYS AS (monto_prestado + monto_prestado * tasa_interes - total_pagado) STORED''',
+)
+
+# Totales reales calculados desde la tabla pagos
+_TOTALES_REALES = '''
+    SELECT c.id,
+           COALESCE(SUM(p.monto), 0) AS total_real,
+           MAX(p.fecha) AS ultima_real
+    FROM clientes c
+    LEFT JOIN pagos p ON p.cliente_id = c.id
+    GROUP BY c.id
+'''
+
+# Estado que corresponde al total real (la misma regla que create_pago/delete_pago)
+_ESTADO_REAL = '''CASE
+        WHEN t.total_real >= c.monto_prestado + c.monto_prestado * c.tasa_interes
+        THEN 'pagado' ELSE 'activo'
+    END'''
+
+RECALCULAR_SALDOS_SQL = f'''
+    UPDATE clientes c
+    SET total_pagado = t.total_real,
+        ultimo_pago_fecha = t.ultima_real,
+        estado = {_ESTADO_REAL}
+    FROM ({_TOTALES_REALES}) t
+    WHERE c.id = t.id
+      AND (c.total_pagado IS DISTINCT FROM t.total_real
+           OR c.ultimo_pago_fecha IS DISTINCT FROM t.ultima_real
+           OR c.estado IS DISTINCT FROM {_ESTADO_REAL})
+    RETURNING c.id
+'''
+
+VERIFICAR_SALDOS_SQL = f'''
+    SELECT c.id, c.nombre, c.total_pagado, t.total_real,
+           c.ultimo_pago_fecha, t.ultima_real,
+           c.estado, {_ESTADO_REAL} AS estado_real
+    FROM clientes c
+    JOIN ({_TOTALES_REALES}) t ON t.id = c.id
+    WHERE c.total_pagado IS DISTINCT FROM t.total_real
+       OR c.ultimo_pago_fecha IS DISTINCT FROM t.ultima_real
+       OR c.estado IS DISTINCT FROM {_ESTADO_REAL}
+    ORDER BY c.id
+'''
+
+
+def recalcular_saldos(db) -> int:
+    """
+    Recalcula total_pagado, ultimo_pago_fecha y estado de todos los clientes.
+
+    Args:
+        db: Instancia de Database (síncrona)
+
+    Returns:
+        int: Número de clientes corregidos
+    """
+    corregidos = db.fetch_all(RECALCULAR_SALDOS_SQL)
+    logger.info(f"✅ Saldos recalculados: {len(corregidos)} clientes corregidos")
+    return len(corregidos)
+
+
+def verificar_saldos(db) -> List[Dict]:
+    """
+    Compara los saldos guardados con los calculados desde pagos.
+
+    Args:
+        db: Instancia de Database (síncrona)
+
+    Returns:
+        List[Dict]: Clientes cuyo saldo guardado no coincide
+    """
+    return [dict(fila) for fila in db.fetch_all(VERIFICAR_SALDOS_SQL)]
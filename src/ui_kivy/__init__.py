@@ -1,11 +1,9 @@
 """
 Módulo de pantallas UI con Kivy/KivyMD.
-"""
 
-from .screens.login_screen import LoginScreen
-from .screens.home_screen import HomeScreen
-from .screens.clientes_screen import ClientesScreen
-from .screens.pagos_screen import PagosScreen
+Las pantallas se importan al pedirlas (ver screens/__init__.py), así que
+importar submódulos como src.ui_kivy.api_client no carga KivyMD.
+"""
 
 __all__ = [
     'LoginScreen',
@@ -13,3 +11,11 @@ __all__ = [
     'ClientesScreen',
     'PagosScreen'
 ]
+
+
+def __getattr__(nombre):
+    """Delega en src.ui_kivy.screens, que importa la pantalla al pedirla."""
+    if nombre in __all__:
+        from . import screens
+        return getattr(screens, nombre)
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
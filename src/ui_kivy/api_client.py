@@ -0,0 +1,97 @@
+"""
+Cliente HTTP de la aplicación para hablar con la API.
+
+Usa una única requests.Session para toda la app, de modo que las
+conexiones TCP/TLS se reutilizan (keep-alive) en vez de abrirse en cada
+petición, algo que en redes móviles lentas domina la latencia. Además:
+- Reintenta con espera exponencial los errores de conexión y las
+  respuestas 502/503/504 (estas solo en métodos idempotentes)
+- Usa timeouts de conexión y de lectura configurables
+- Acepta respuestas comprimidas con gzip
+"""
+
+import os
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Métodos que se pueden repetir sin efectos duplicados
+METODOS_IDEMPOTENTES = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+
+class ApiClient:
+    """
+    Sesión HTTP persistente contra la API.
+
+    Usage:
+        http = ApiClient('http://localhost:8000')
+        response = http.request('GET', '/api/clientes', headers=headers)
+    """
+
+    def __init__(self,
+                 base_url: str,
+                 connect_timeout: float = None,
+                 read_timeout: float = None,
+                 retries: int = None):
+        """
+        Crea la sesión y su pool de conexiones.
+
+        Args:
+            base_url: URL base de la API (ej: http://localhost:8000)
+            connect_timeout: Segundos para establecer la conexión (default: API_CONNECT_TIMEOUT)
+            read_timeout: Segundos de espera de la respuesta (default: API_READ_TIMEOUT)
+            retries: Reintentos ante fallos transitorios (default: API_RETRIES)
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (
+            connect_timeout or float(os.getenv('API_CONNECT_TIMEOUT', '5')),
+            read_timeout or float(os.getenv('API_READ_TIMEOUT', '15'))
+        )
+        retries = retries if retries is not None else int(os.getenv('API_RETRIES', '3'))
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=0.5,  # 0.5s, 1s, 2s...
+            status_forcelist=(502, 503, 504),
+            allowed_methods=METODOS_IDEMPOTENTES,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate'
+        })
+
+    def request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        """
+        Realiza una petición reutilizando la conexión abierta.
+
+        Args:
+            method: Método HTTP ('GET', 'POST', 'PUT', 'DELETE')
+            endpoint: Endpoint de la API (ej: '/api/clientes')
+            **kwargs: Argumentos de requests (headers, params, json...)
+
+        Returns:
+            requests.Response
+
+        Raises:
+            requests.exceptions.RequestException: Si falla tras los reintentos
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, f'{self.base_url}{endpoint}', **kwargs)
+
+    def close(self):
+        """Cierra las conexiones abiertas de la sesión."""
+        self.session.close()
+        logger.info("Sesión HTTP cerrada")
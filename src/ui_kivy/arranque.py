@@ -0,0 +1,50 @@
+"""
+Medición del arranque en frío de la app.
+
+Registra cuánto tarda cada etapa del arranque (importaciones, creación
+de la interfaz, primer frame dibujado) y lo escribe en el log en un solo
+reporte, para seguir el tiempo de arranque en Android (adb logcat).
+
+Usage:
+    with medir('import kivymd'):
+        from kivymd.app import MDApp
+    ...
+    reporte_arranque()   # al dibujarse el primer frame
+"""
+
+import time
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Momento en que empezó el arranque (la primera importación de este módulo)
+INICIO = time.perf_counter()
+
+# (etapa, segundos) en el orden en que se midieron
+_etapas = []
+
+
+@contextmanager
+def medir(etapa: str):
+    """Mide la duración del bloque y la agrega al reporte de arranque."""
+    desde = time.perf_counter()
+    try:
+        yield
+    finally:
+        _etapas.append((etapa, time.perf_counter() - desde))
+
+
+def reporte_arranque(etapa_final: str = 'primer frame'):
+    """
+    Escribe en el log las etapas medidas y el tiempo total desde INICIO.
+
+    Args:
+        etapa_final: Nombre del momento en que se cierra el reporte
+    """
+    total = time.perf_counter() - INICIO
+    lineas = [f"   {etapa:<30} {segundos * 1000:8.1f} ms" for etapa, segundos in _etapas]
+    logger.info(
+        "⏱️ Arranque de la app:\n" + "\n".join(lineas) +
+        f"\n   {'hasta ' + etapa_final:<30} {total * 1000:8.1f} ms"
+    )
@@ -0,0 +1,179 @@
+"""
+Búsqueda de clientes en la app: primero en el dispositivo, después en el servidor.
+
+Consultar la API en cada tecla gasta datos y hace parpadear la lista con
+respuestas que llegan tarde. El flujo es:
+1. IndiceClientes filtra al instante los clientes guardados en el
+   dispositivo (sin tildes ni mayúsculas, por prefijo de cada palabra del
+   nombre, de la cédula o del teléfono)
+2. Solo si la copia local no alcanza se consulta GET /api/clientes/buscar,
+   cuando el usuario deja de escribir por BUSQUEDA_ESPERA segundos
+3. Las respuestas de un término que ya no es el escrito se descartan
+"""
+
+import bisect
+import unicodedata
+from typing import Callable, Dict, List
+
+from kivy.app import App
+from kivy.clock import Clock
+
+# Segundos sin escribir antes de consultar el servidor
+BUSQUEDA_ESPERA = 0.3
+
+# Largo mínimo del término en GET /api/clientes/buscar
+MIN_CARACTERES_SERVIDOR = 3
+
+
+def normalizar(texto) -> str:
+    """Quita tildes y mayúsculas ('Peña Álvarez' -> 'pena alvarez')."""
+    descompuesto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c)).casefold().strip()
+
+
+class IndiceClientes:
+    """
+    Índice en memoria para buscar clientes por prefijo.
+
+    Guarda ordenadas las palabras del nombre, la cédula y el teléfono de
+    cada cliente; cada búsqueda es una búsqueda binaria por palabra.
+
+    Usage:
+        indice = IndiceClientes(store.clientes(usuario_id))
+        indice.buscar('jose pe')   # José Pérez, Josefina Peña...
+    """
+
+    def __init__(self, clientes: List[Dict]):
+        self._clientes = sorted(clientes, key=lambda c: normalizar(c['nombre']))
+
+        claves = []
+        for i, cliente in enumerate(self._clientes):
+            for palabra in normalizar(cliente['nombre']).split():
+                claves.append((palabra, i))
+            for campo in ('cedula', 'telefono'):
+                valor = ''.join(c for c in normalizar(cliente.get(campo)) if c.isalnum())
+                if valor:
+                    claves.append((valor, i))
+        claves.sort()
+
+        self._claves = [clave for clave, i in claves]
+        self._posiciones = [i for clave, i in claves]
+
+    def __len__(self):
+        return len(self._clientes)
+
+    def _con_prefijo(self, prefijo: str) -> set:
+        """Posiciones de los clientes con alguna palabra que empieza por prefijo."""
+        inicio = bisect.bisect_left(self._claves, prefijo)
+        fin = bisect.bisect_left(self._claves, prefijo + '\uffff')
+        return set(self._posiciones[inicio:fin])
+
+    def buscar(self, termino: str, limit: int = 20) -> List[Dict]:
+        """
+        Busca clientes cuyas palabras empiezan por las del término.
+
+        Args:
+            termino: Texto escrito (ej: 'jose pe', '3001')
+            limit: Máximo de resultados
+
+        Returns:
+            List[Dict]: Clientes encontrados, ordenados por nombre
+        """
+        encontrados = None
+        for palabra in normalizar(termino).split():
+            # Cédula y teléfono se indexan sin separadores ('1.234.567' -> '1234567')
+            if any(c.isdigit() for c in palabra):
+                palabra = ''.join(c for c in palabra if c.isalnum())
+            # Un separador suelto ('-') no filtra nada
+            if not any(c.isalnum() for c in palabra):
+                continue
+            posiciones = self._con_prefijo(palabra)
+            encontrados = posiciones if encontrados is None else encontrados & posiciones
+            if not encontrados:
+                return []
+
+        if encontrados is None:
+            return []
+        return [self._clientes[i] for i in sorted(encontrados)[:limit]]
+
+
+class BuscadorClientes:
+    """
+    Búsqueda de clientes mientras se escribe (local al instante, servidor diferido).
+
+    Usage:
+        buscador = BuscadorClientes(mostrar, limit=20, clave='clientes')
+        campo.bind(text=lambda instance, value: buscador.buscar(value))
+    """
+
+    def __init__(self, mostrar: Callable[[List[Dict]], None], limit: int = 20,
+                 clave: str = 'buscar_clientes'):
+        """
+        Args:
+            mostrar: Función que recibe los clientes a mostrar (hilo de la UI);
+                puede llamarse dos veces por término: locales y completos
+            limit: Máximo de resultados
+            clave: Clave de la petición al servidor (cancela la anterior)
+        """
+        self.mostrar = mostrar
+        self.limit = limit
+        self.clave = clave
+        self.termino = ''
+        self.locales = []
+        self._peticion = None
+        self._consultar = Clock.create_trigger(self._consultar_servidor, BUSQUEDA_ESPERA)
+
+    def cancelar(self):
+        """Descarta la consulta al servidor programada o en curso."""
+        self._consultar.cancel()
+        if self._peticion is not None:
+            self._peticion.cancel()
+            self._peticion = None
+
+    def buscar(self, termino: str):
+        """
+        Muestra los resultados locales y, si hace falta, programa la consulta al servidor.
+
+        Args:
+            termino: Texto escrito
+        """
+        self.cancelar()
+        self.termino = termino.strip()
+        if not self.termino:
+            self.locales = []
+            self.mostrar([])
+            return
+
+        app = App.get_running_app()
+        self.locales = app.indice_clientes().buscar(self.termino, self.limit)
+        self.mostrar(self.locales)
+
+        # Con la copia local completa (ya sincronizada) solo se pregunta al
+        # servidor si no hubo resultados (ej: cliente creado en otro equipo)
+        copia_completa = app.store.obtener_cursor(app.usuario_id) is not None
+        faltan = not self.locales or (len(self.locales) < self.limit and not copia_completa)
+        if faltan and len(self.termino) >= MIN_CARACTERES_SERVIDOR:
+            # Cada tecla reinicia la espera: se consulta al dejar de escribir
+            self._consultar()
+
+    def _consultar_servidor(self, *args):
+        """Consulta GET /api/clientes/buscar con el término actual."""
+        termino = self.termino
+        app = App.get_running_app()
+
+        def recibir(success, data):
+            self._peticion = None
+            # Sin conexión se quedan los resultados locales
+            if termino != self.termino or not success or not isinstance(data, list):
+                return
+
+            app.store.guardar_clientes(data)
+            ids = {cliente['id'] for cliente in self.locales}
+            self.mostrar((self.locales + [c for c in data if c['id'] not in ids])[:self.limit])
+
+        # requests codifica el término en la query string (params)
+        self._peticion = app.api_request_async(
+            'GET', '/api/clientes/buscar', recibir,
+            params={'q': termino, 'limit': self.limit},
+            clave=self.clave
+        )
@@ -0,0 +1,139 @@
+"""
+Caché de respuestas GET de la API en la app.
+
+Las pantallas piden una y otra vez los mismos datos (lista de usuarios,
+clientes del cobrador, resúmenes) al navegar entre ellas. Esta caché
+guarda cada respuesta por endpoint + parámetros:
+- Mientras está vigente (CACHE_TTL del endpoint) se usa sin ir al servidor
+- Vencida, se puede mostrar al instante mientras se pide la versión nueva
+  en segundo plano (stale-while-revalidate)
+- Cada escritura exitosa borra las respuestas que pudo haber cambiado
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+
+# Segundos de vigencia por endpoint (gana el prefijo más largo).
+# Los endpoints sin entrada no se guardan (ej: /api/sync tiene su propio cursor)
+CACHE_TTL = {
+    '/api/usuarios': 300,
+    '/api/usuarios/cobradores/resumen': 30,
+    '/api/clientes': 120,
+    '/api/pagos': 60,
+    '/api/pagos/resumen': 30,
+    '/api/dashboard': 30,
+}
+
+# Lecturas que cambian al escribir en cada recurso (/api/<recurso>/...), por
+# prefijo; '*' reemplaza un tramo de la ruta (ej: el id del usuario)
+INVALIDACIONES = {
+    'pagos': (
+        '/api/pagos', '/api/clientes', '/api/dashboard',
+        '/api/usuarios/cobradores', '/api/usuarios/*/historial',
+    ),
+    'clientes': (
+        '/api/clientes', '/api/pagos', '/api/dashboard',
+        '/api/usuarios/cobradores', '/api/usuarios/*/historial',
+    ),
+    # Bases y gastos entran en el resumen diario que muestra /api/pagos/resumen
+    'usuarios': ('/api/usuarios', '/api/dashboard', '/api/pagos/resumen'),
+}
+
+# Respuestas guardadas como máximo (se descartan las menos usadas)
+CACHE_MAX_ENTRADAS = 200
+
+
+def ttl_endpoint(endpoint: str) -> float:
+    """
+    Vigencia en segundos de las respuestas de un endpoint.
+
+    Returns:
+        float: 0 si el endpoint no se guarda en caché
+    """
+    prefijos = [p for p in CACHE_TTL if endpoint == p or endpoint.startswith(p + '/')]
+    if not prefijos:
+        return 0
+    return CACHE_TTL[max(prefijos, key=len)]
+
+
+class RespuestaCache:
+    """
+    Respuestas GET recientes, compartida por los hilos de la app.
+
+    Usage:
+        cache = RespuestaCache()
+        cache.guardar('/api/usuarios', None, data)
+        entrada = cache.obtener('/api/usuarios', None)   # (data, vigente) o None
+        cache.invalidar('/api/usuarios/5')                # tras un DELETE
+    """
+
+    def __init__(self, max_entradas: int = CACHE_MAX_ENTRADAS):
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _clave(endpoint, params):
+        """Clave de la respuesta: el mismo endpoint con otros parámetros es otra."""
+        return endpoint, tuple(sorted((k, str(v)) for k, v in (params or {}).items()))
+
+    def obtener(self, endpoint: str, params=None):
+        """
+        Busca la respuesta guardada de un GET.
+
+        Args:
+            endpoint: Endpoint de la API (ej: '/api/clientes')
+            params: Parámetros de query string
+
+        Returns:
+            tuple: (data, vigente) o None si no hay respuesta guardada
+        """
+        clave = self._clave(endpoint, params)
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            self._entradas.move_to_end(clave)
+            data, vence = entrada
+            return data, time.monotonic() < vence
+
+    def guardar(self, endpoint: str, params, data):
+        """Guarda la respuesta de un GET (si su endpoint usa caché)."""
+        ttl = ttl_endpoint(endpoint)
+        if not ttl:
+            return
+
+        clave = self._clave(endpoint, params)
+        with self._lock:
+            self._entradas[clave] = (data, time.monotonic() + ttl)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, endpoint: str):
+        """
+        Borra las respuestas que pudo cambiar una escritura en endpoint.
+
+        Args:
+            endpoint: Endpoint escrito (ej: '/api/pagos/15')
+        """
+        partes = endpoint.split('/')
+        recurso = partes[2] if len(partes) > 2 else ''
+        prefijos = INVALIDACIONES.get(recurso)
+        if prefijos is None:
+            # Recurso sin relaciones conocidas: no arriesgar datos viejos
+            self.limpiar()
+            return
+
+        patrones = [prefijo + '*' for prefijo in prefijos]
+        with self._lock:
+            for clave in list(self._entradas):
+                if any(fnmatchcase(clave[0], patron) for patron in patrones):
+                    del self._entradas[clave]
+
+    def limpiar(self):
+        """Borra todas las respuestas (ej: al cambiar de usuario)."""
+        with self._lock:
+            self._entradas.clear()
@@ -0,0 +1,99 @@
+"""
+Listas virtualizadas (RecycleView) para las pantallas.
+
+Con cientos de clientes por cobrador, crear un widget por fila tarda
+segundos en Android de gama baja. ListaVirtual solo crea los widgets de
+las filas visibles y los reutiliza al hacer scroll: para mostrar otros
+datos basta con asignar lista.data, sin crear ni destruir widgets.
+"""
+
+from kivy.metrics import dp
+from kivy.properties import StringProperty
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivymd.uix.card import MDCard
+from kivymd.uix.label import MDLabel
+
+
+def sin_accion():
+    """on_release de las filas que no hacen nada al tocarlas."""
+
+
+def fila(texto, accion=None, **kwargs):
+    """
+    Datos de una fila de ListaVirtual.
+
+    Las filas se reutilizan entre datos distintos, así que toda fila define
+    su on_release (aunque no haga nada) para no heredar el de otra.
+
+    Args:
+        texto: Texto principal de la fila
+        accion: Función sin argumentos a llamar al tocar la fila
+        **kwargs: Otras propiedades de la fila (ej: secondary_text)
+
+    Returns:
+        dict: Elemento para lista.data
+    """
+    return {'text': texto, 'on_release': accion or sin_accion, **kwargs}
+
+
+class ListaVirtual(RecycleView):
+    """
+    RecycleView vertical con filas de alto fijo.
+
+    Usage:
+        lista = ListaVirtual(OneLineListItem, alto_fila=dp(48))
+        lista.data = [fila('Cliente 1', lambda: abrir(1)), ...]
+    """
+
+    def __init__(self, viewclass, alto_fila=dp(48), espacio=0, **kwargs):
+        """
+        Args:
+            viewclass: Clase del widget de cada fila
+            alto_fila: Alto de todas las filas (evita medir cada una)
+            espacio: Separación entre filas
+        """
+        super().__init__(**kwargs)
+        self.viewclass = viewclass
+
+        contenedor = RecycleBoxLayout(
+            orientation='vertical',
+            default_size=(None, alto_fila),
+            default_size_hint=(1, None),
+            size_hint_y=None,
+            spacing=espacio
+        )
+        contenedor.bind(minimum_height=contenedor.setter('height'))
+        self.add_widget(contenedor)
+
+
+class FilaDosLineas(MDCard):
+    """Fila compacta tipo tarjeta: título arriba y detalle abajo (acepta markup)."""
+
+    text = StringProperty()
+    secondary_text = StringProperty()
+
+    def __init__(self, **kwargs):
+        super().__init__(
+            orientation='vertical',
+            padding=(dp(8), dp(5)),
+            md_bg_color=(0.95, 0.95, 0.95, 1),
+            **kwargs
+        )
+
+        lbl1 = MDLabel(
+            size_hint_y=None,
+            height=dp(18),
+            font_size='11sp',
+            markup=True
+        )
+        lbl2 = MDLabel(
+            size_hint_y=None,
+            height=dp(16),
+            font_size='10sp',
+            markup=True,
+            color=(0.3, 0.3, 0.3, 1)
+        )
+        self.bind(text=lbl1.setter('text'), secondary_text=lbl2.setter('text'))
+        self.add_widget(lbl1)
+        self.add_widget(lbl2)
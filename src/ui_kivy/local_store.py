@@ -0,0 +1,523 @@
+"""
+Almacenamiento local (SQLite) de la app para trabajar sin conexión.
+
+Guarda en el dispositivo una copia de los clientes, pagos y gastos del
+cobrador y una cola de operaciones pendientes de enviar a la API:
+- Las pantallas leen de aquí sin esperar a la red
+- Los pagos y gastos se escriben aquí primero y quedan en cola_sync
+- El motor de sincronización (sync.py) envía la cola cuando hay señal
+  y trae de GET /api/sync solo lo que cambió en el servidor
+
+SQLite viene con Python, así que no agrega dependencias a la app.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import uuid
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ESQUEMA_SQL = '''
+    CREATE TABLE IF NOT EXISTS clientes (
+        id INTEGER PRIMARY KEY,
+        usuario_id INTEGER NOT NULL,
+        nombre TEXT NOT NULL,
+        cedula TEXT,
+        telefono TEXT,
+        estado TEXT,
+        datos TEXT NOT NULL
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_clientes_usuario ON clientes(usuario_id, nombre);
+
+    CREATE TABLE IF NOT EXISTS pagos (
+        local_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        id INTEGER UNIQUE,
+        usuario_id INTEGER NOT NULL,
+        cliente_id INTEGER NOT NULL,
+        cliente_nombre TEXT,
+        fecha TEXT NOT NULL,
+        monto REAL NOT NULL,
+        tipo_pago TEXT NOT NULL,
+        pendiente INTEGER NOT NULL DEFAULT 0
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_pagos_usuario_fecha ON pagos(usuario_id, fecha);
+
+    CREATE TABLE IF NOT EXISTS gastos (
+        local_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        id INTEGER UNIQUE,
+        usuario_id INTEGER NOT NULL,
+        fecha TEXT NOT NULL,
+        monto REAL NOT NULL,
+        descripcion TEXT,
+        pendiente INTEGER NOT NULL DEFAULT 0
+    );
+
+    CREATE TABLE IF NOT EXISTS cola_sync (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        usuario_id INTEGER NOT NULL,
+        tipo TEXT NOT NULL,
+        local_id INTEGER NOT NULL,
+        clave TEXT,
+        metodo TEXT NOT NULL,
+        endpoint TEXT NOT NULL,
+        datos TEXT NOT NULL,
+        creado TEXT NOT NULL,
+        intentos INTEGER NOT NULL DEFAULT 0,
+        estado TEXT NOT NULL DEFAULT 'pendiente',
+        ultimo_error TEXT
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_cola_sync_usuario ON cola_sync(usuario_id, estado, id);
+
+    CREATE TABLE IF NOT EXISTS sync_estado (
+        usuario_id INTEGER PRIMARY KEY,
+        cursor TEXT NOT NULL
+    );
+'''
+
+
+# Tipos de pago que acepta la API (los mismos que valida POST /api/pagos)
+TIPOS_PAGO = ('efectivo', 'digital')
+
+
+class LocalStore:
+    """
+    Base de datos local del dispositivo.
+
+    La usan tanto el hilo de la UI como los hilos de sincronización,
+    por eso todas las operaciones pasan por un mismo lock.
+
+    Usage:
+        store = LocalStore('gestor_local.db')
+        store.registrar_pago(usuario_id, cliente, 20000, 'efectivo')
+    """
+
+    def __init__(self, path: str):
+        """
+        Abre (o crea) la base local.
+
+        Args:
+            path: Ruta del archivo SQLite
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # Aumenta con cada cambio en clientes (el índice de búsqueda se rehace)
+        self.version_clientes = 0
+
+        with self._lock, self._conn:
+            # WAL: las lecturas de la UI no esperan a las escrituras del sync
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(ESQUEMA_SQL)
+            self._migrar()
+
+        logger.info(f"✅ Base local abierta: {path}")
+
+    def _migrar(self):
+        """Actualiza bases locales creadas por versiones anteriores de la app."""
+        columnas = {fila['name'] for fila in self._conn.execute('PRAGMA table_info(cola_sync)')}
+        if 'clave' not in columnas:
+            self._conn.execute('ALTER TABLE cola_sync ADD COLUMN clave TEXT')
+            self._conn.execute(
+                'UPDATE cola_sync SET clave = lower(hex(randomblob(16))) WHERE clave IS NULL'
+            )
+
+    def close(self):
+        """Cierra la base local."""
+        with self._lock:
+            self._conn.close()
+
+    # ==================== CLIENTES ====================
+
+    def guardar_clientes(self, clientes: List[Dict]):
+        """
+        Guarda (o actualiza) clientes recibidos de la API.
+
+        Args:
+            clientes: Clientes tal como los retorna la API
+        """
+        if not clientes:
+            return
+
+        with self._lock, self._conn:
+            self._upsert_clientes(clientes)
+
+    def _upsert_clientes(self, clientes: List[Dict]):
+        """Inserta o actualiza clientes (dentro de la transacción del llamador)."""
+        if clientes:
+            self.version_clientes += 1
+        filas = [
+            (
+                c['id'], c['usuario_id'], c['nombre'], c.get('cedula'),
+                c.get('telefono'), c.get('estado'), json.dumps(c, default=str)
+            )
+            for c in clientes
+        ]
+        self._conn.executemany('''
+            INSERT INTO clientes (id, usuario_id, nombre, cedula, telefono, estado, datos)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                usuario_id = excluded.usuario_id,
+                nombre = excluded.nombre,
+                cedula = excluded.cedula,
+                telefono = excluded.telefono,
+                estado = excluded.estado,
+                datos = excluded.datos
+        ''', filas)
+
+    def clientes(self, usuario_id: Optional[int]) -> List[Dict]:
+        """
+        Clientes guardados de un cobrador (para el índice de búsqueda).
+
+        Args:
+            usuario_id: Cobrador dueño de los clientes (None: todos los guardados)
+
+        Returns:
+            List[Dict]: Clientes (mismo formato que la API)
+        """
+        with self._lock:
+            filas = self._conn.execute(
+                'SELECT datos FROM clientes WHERE ? IS NULL OR usuario_id = ?', (usuario_id, usuario_id)
+            ).fetchall()
+        return [json.loads(fila['datos']) for fila in filas]
+
+    # ==================== PAGOS Y GASTOS ====================
+
+    def guardar_pagos(self, usuario_id: int, pagos: List[Dict]):
+        """
+        Guarda pagos ya registrados en el servidor.
+
+        Args:
+            usuario_id: Cobrador dueño de los pagos
+            pagos: Pagos tal como los retorna la API
+        """
+        if not pagos:
+            return
+
+        with self._lock, self._conn:
+            self._upsert_pagos(usuario_id, pagos)
+
+    def _upsert_pagos(self, usuario_id: int, pagos: List[Dict]):
+        """Inserta o actualiza pagos del servidor (dentro de la transacción del llamador)."""
+        filas = [
+            (
+                p['id'], usuario_id, p['cliente_id'], p.get('cliente_nombre'),
+                str(p['fecha']), p['monto'], p['tipo_pago']
+            )
+            for p in pagos
+        ]
+        self._conn.executemany('''
+            INSERT INTO pagos (id, usuario_id, cliente_id, cliente_nombre, fecha, monto, tipo_pago)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                cliente_nombre = excluded.cliente_nombre,
+                fecha = excluded.fecha,
+                monto = excluded.monto,
+                tipo_pago = excluded.tipo_pago
+        ''', filas)
+
+    def registrar_pago(self, usuario_id: int, cliente: Dict, monto: float, tipo_pago: str) -> int:
+        """
+        Registra un pago en el dispositivo y lo deja en cola para la API.
+
+        Args:
+            usuario_id: Cobrador que registra el pago
+            cliente: Cliente ({'id', 'nombre'})
+            monto: Monto del pago
+            tipo_pago: 'efectivo' o 'digital'
+
+        Returns:
+            int: ID local del pago
+        """
+        # La fecha viaja con el pago: se respeta el día en que se cobró
+        fecha = date.today().isoformat()
+        with self._lock, self._conn:
+            cursor = self._conn.execute('''
+                INSERT INTO pagos (usuario_id, cliente_id, cliente_nombre, fecha, monto, tipo_pago, pendiente)
+                VALUES (?, ?, ?, ?, ?, ?, 1)
+            ''', (usuario_id, cliente['id'], cliente.get('nombre'), fecha, monto, tipo_pago))
+            local_id = cursor.lastrowid
+            self._encolar(usuario_id, 'pago', local_id, 'POST', '/api/pagos', {
+                'cliente_id': cliente['id'],
+                'monto': monto,
+                'tipo_pago': tipo_pago,
+                'fecha': fecha
+            })
+
+        logger.info(f"💾 Pago guardado localmente: ${monto:,.0f} ({cliente.get('nombre')})")
+        return local_id
+
+    def registrar_gasto(self, usuario_id: int, monto: float, descripcion: str) -> int:
+        """
+        Registra un gasto en el dispositivo y lo deja en cola para la API.
+
+        Args:
+            usuario_id: Cobrador que registra el gasto
+            monto: Monto del gasto
+            descripcion: Descripción del gasto
+
+        Returns:
+            int: ID local del gasto
+        """
+        fecha = date.today().isoformat()
+        with self._lock, self._conn:
+            cursor = self._conn.execute('''
+                INSERT INTO gastos (usuario_id, fecha, monto, descripcion, pendiente)
+                VALUES (?, ?, ?, ?, 1)
+            ''', (usuario_id, fecha, monto, descripcion))
+            local_id = cursor.lastrowid
+            self._encolar(usuario_id, 'gasto', local_id, 'POST', '/api/usuarios/gasto', {
+                'monto': monto,
+                'descripcion': descripcion,
+                'fecha': fecha
+            })
+
+        logger.info(f"💾 Gasto guardado localmente: ${monto:,.0f}")
+        return local_id
+
+    def resumen_pendiente(self, usuario_id: int) -> Dict:
+        """
+        Totales de lo registrado en el dispositivo que aún no llega al servidor.
+
+        Args:
+            usuario_id: Cobrador
+
+        Returns:
+            Dict: num_pagos, total_pagos, num_gastos y total_gastos pendientes
+        """
+        with self._lock:
+            fila = self._conn.execute('''
+                SELECT
+                    (SELECT COUNT(*) FROM pagos WHERE usuario_id = ? AND pendiente = 1) AS num_pagos,
+                    (SELECT COALESCE(SUM(monto), 0) FROM pagos WHERE usuario_id = ? AND pendiente = 1) AS total_pagos,
+                    (SELECT COUNT(*) FROM gastos WHERE usuario_id = ? AND pendiente = 1) AS num_gastos,
+                    (SELECT COALESCE(SUM(monto), 0) FROM gastos WHERE usuario_id = ? AND pendiente = 1) AS total_gastos
+            ''', (usuario_id,) * 4).fetchone()
+        return dict(fila)
+
+    # ==================== CAMBIOS DEL SERVIDOR ====================
+
+    def obtener_cursor(self, usuario_id: int) -> Optional[str]:
+        """Cursor de la última sincronización del usuario (None si nunca sincronizó)."""
+        with self._lock:
+            fila = self._conn.execute(
+                'SELECT cursor FROM sync_estado WHERE usuario_id = ?', (usuario_id,)
+            ).fetchone()
+        return fila['cursor'] if fila else None
+
+    def aplicar_cambios(self, usuario_id: int, cambios: Dict) -> int:
+        """
+        Aplica una respuesta de GET /api/sync y guarda su cursor.
+
+        Los pagos y gastos registrados en el dispositivo que aún no se
+        enviaron no se tocan.
+
+        Args:
+            usuario_id: Cobrador de la sesión
+            cambios: Respuesta de la API
+
+        Returns:
+            int: Registros actualizados o eliminados
+        """
+        clientes = cambios['clientes']
+        pagos = cambios['pagos']
+        gastos = cambios['gastos']
+
+        with self._lock, self._conn:
+            if cambios.get('completo'):
+                # Copia completa: reemplaza todo lo ya sincronizado
+                self._conn.execute('DELETE FROM clientes WHERE usuario_id = ?', (usuario_id,))
+                self._conn.execute('DELETE FROM pagos WHERE usuario_id = ? AND pendiente = 0', (usuario_id,))
+                self._conn.execute('DELETE FROM gastos WHERE usuario_id = ? AND pendiente = 0', (usuario_id,))
+
+            self._upsert_clientes(clientes['actualizados'])
+            self._upsert_pagos(usuario_id, pagos['actualizados'])
+            self._conn.executemany('''
+                INSERT INTO gastos (id, usuario_id, fecha, monto, descripcion)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    fecha = excluded.fecha,
+                    monto = excluded.monto,
+                    descripcion = excluded.descripcion
+            ''', [
+                (g['id'], usuario_id, str(g['fecha']), g['monto'], g.get('descripcion'))
+                for g in gastos['actualizados']
+            ])
+
+            if cambios.get('completo') or clientes['eliminados']:
+                self.version_clientes += 1
+
+            # Al eliminar un cliente se eliminan también sus pagos
+            for cliente_id in clientes['eliminados']:
+                self._conn.execute('DELETE FROM clientes WHERE id = ?', (cliente_id,))
+                self._conn.execute(
+                    'DELETE FROM pagos WHERE cliente_id = ? AND pendiente = 0', (cliente_id,)
+                )
+            self._conn.executemany(
+                'DELETE FROM pagos WHERE id = ?', [(i,) for i in pagos['eliminados']]
+            )
+            self._conn.executemany(
+                'DELETE FROM gastos WHERE id = ?', [(i,) for i in gastos['eliminados']]
+            )
+
+            self._conn.execute('''
+                INSERT INTO sync_estado (usuario_id, cursor) VALUES (?, ?)
+                ON CONFLICT (usuario_id) DO UPDATE SET cursor = excluded.cursor
+            ''', (usuario_id, cambios['cursor']))
+
+        return sum(
+            len(grupo['actualizados']) + len(grupo['eliminados'])
+            for grupo in (clientes, pagos, gastos)
+        )
+
+    # ==================== COLA DE SINCRONIZACIÓN ====================
+
+    def _encolar(self, usuario_id: int, tipo: str, local_id: int,
+                 metodo: str, endpoint: str, datos: Dict):
+        """
+        Agrega una operación a la cola (dentro de la transacción del llamador).
+
+        Cada operación lleva su Idempotency-Key: si el servidor la registró
+        pero la respuesta no llegó, el reintento no la duplica.
+        """
+        self._conn.execute('''
+            INSERT INTO cola_sync (usuario_id, tipo, local_id, clave, metodo, endpoint, datos, creado)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (usuario_id, tipo, local_id, uuid.uuid4().hex, metodo, endpoint, json.dumps(datos),
+              datetime.now().isoformat(timespec='seconds')))
+
+    def pendientes(self, usuario_id: int, limit: int = 20) -> List[Dict]:
+        """
+        Operaciones en cola del usuario, en el orden en que se registraron.
+
+        Args:
+            usuario_id: Solo se envían las operaciones de quien inició sesión
+            limit: Tamaño del lote
+
+        Returns:
+            List[Dict]: Operaciones con 'datos' ya decodificado
+        """
+        with self._lock:
+            filas = self._conn.execute('''
+                SELECT id, tipo, local_id, clave, metodo, endpoint, datos, intentos
+                FROM cola_sync
+                WHERE usuario_id = ? AND estado = 'pendiente'
+                ORDER BY id
+                LIMIT ?
+            ''', (usuario_id, limit)).fetchall()
+
+        operaciones = []
+        for fila in filas:
+            operacion = dict(fila)
+            operacion['datos'] = json.loads(operacion['datos'])
+            operaciones.append(operacion)
+        return operaciones
+
+    def num_pendientes(self, usuario_id: int) -> int:
+        """Cantidad de operaciones del usuario que esperan sincronización."""
+        with self._lock:
+            fila = self._conn.execute(
+                "SELECT COUNT(*) AS total FROM cola_sync WHERE usuario_id = ? AND estado = 'pendiente'",
+                (usuario_id,)
+            ).fetchone()
+        return fila['total']
+
+    def confirmar(self, operacion: Dict, respuesta: Optional[Dict]):
+        """
+        Marca una operación como aceptada por el servidor.
+
+        Args:
+            operacion: Operación de pendientes()
+            respuesta: Respuesta de la API (trae el id del servidor en pagos)
+        """
+        tabla = 'pagos' if operacion['tipo'] == 'pago' else 'gastos'
+        servidor_id = respuesta.get('id') if isinstance(respuesta, dict) else None
+        with self._lock, self._conn:
+            if servidor_id is not None:
+                # Si una descarga ya trajo la copia del servidor, queda una sola
+                # fila (la local); si no, el UPDATE violaría el UNIQUE de id
+                self._conn.execute(
+                    f'DELETE FROM {tabla} WHERE id = ? AND local_id <> ?',
+                    (servidor_id, operacion['local_id'])
+                )
+            self._conn.execute(
+                f'UPDATE {tabla} SET pendiente = 0, id = COALESCE(?, id) WHERE local_id = ?',
+                (servidor_id, operacion['local_id'])
+            )
+            self._conn.execute('DELETE FROM cola_sync WHERE id = ?', (operacion['id'],))
+
+    def rechazar(self, operacion: Dict, error: str):
+        """
+        Saca de la cola una operación que el servidor no aceptará nunca.
+
+        Queda con estado 'rechazada' hasta que se avisa al usuario (ver
+        rechazadas()), pero ya no bloquea el envío de las siguientes.
+
+        Args:
+            operacion: Operación de pendientes()
+            error: Motivo devuelto por la API
+        """
+        tabla = 'pagos' if operacion['tipo'] == 'pago' else 'gastos'
+        with self._lock, self._conn:
+            self._conn.execute('''
+                UPDATE cola_sync
+                SET estado = 'rechazada', intentos = intentos + 1, ultimo_error = ?
+                WHERE id = ?
+            ''', (error, operacion['id']))
+            self._conn.execute(f'DELETE FROM {tabla} WHERE local_id = ?', (operacion['local_id'],))
+
+        logger.warning(f"⚠️ Operación {operacion['tipo']} rechazada por el servidor: {error}")
+
+    def rechazadas(self, usuario_id: int) -> List[Dict]:
+        """
+        Operaciones rechazadas por el servidor que el usuario aún no vio.
+
+        Args:
+            usuario_id: Cobrador
+
+        Returns:
+            List[Dict]: Operaciones (tipo, datos, ultimo_error, creado)
+        """
+        with self._lock:
+            filas = self._conn.execute('''
+                SELECT id, tipo, datos, ultimo_error, creado
+                FROM cola_sync
+                WHERE usuario_id = ? AND estado = 'rechazada'
+                ORDER BY id
+            ''', (usuario_id,)).fetchall()
+
+        operaciones = []
+        for fila in filas:
+            operacion = dict(fila)
+            operacion['datos'] = json.loads(operacion['datos'])
+            operaciones.append(operacion)
+        return operaciones
+
+    def marcar_rechazadas_vistas(self, ids: List[int]):
+        """Marca como vistas las operaciones rechazadas (ya se avisó al usuario)."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE cola_sync SET estado = 'rechazada_vista' WHERE id = ?",
+                [(operacion_id,) for operacion_id in ids]
+            )
+
+    def reintentar_despues(self, operacion: Dict, error: str):
+        """
+        Registra un fallo transitorio; la operación sigue en cola.
+
+        Args:
+            operacion: Operación de pendientes()
+            error: Descripción del fallo
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                'UPDATE cola_sync SET intentos = intentos + 1, ultimo_error = ? WHERE id = ?',
+                (error, operacion['id'])
+            )
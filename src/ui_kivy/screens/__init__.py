@@ -1,12 +1,21 @@
 """
 Módulo de screens para la UI.
+
+Cada pantalla se importa al pedirla (from src.ui_kivy.screens import
+HomeScreen), no al importar el paquete: así el arranque de la app no carga
+los widgets de KivyMD de pantallas que todavía no se muestran.
 """
 
-from .login_screen import LoginScreen
-from .home_screen import HomeScreen
-from .clientes_screen import ClientesScreen
-from .pagos_screen import PagosScreen
-from .usuarios_screen import UsuariosScreen
+import importlib
+
+# Clase -> módulo que la define
+_MODULOS = {
+    'LoginScreen': 'login_screen',
+    'HomeScreen': 'home_screen',
+    'ClientesScreen': 'clientes_screen',
+    'PagosScreen': 'pagos_screen',
+    'UsuariosScreen': 'usuarios_screen',
+}
 
 __all__ = [
     'LoginScreen',
@@ -15,3 +24,11 @@ __all__ = [
     'PagosScreen',
     'UsuariosScreen'
 ]
+
+
+def __getattr__(nombre):
+    """Importa el módulo de la pantalla la primera vez que se pide."""
+    if nombre in _MODULOS:
+        modulo = importlib.import_module(f'.{_MODULOS[nombre]}', __name__)
+        return getattr(modulo, nombre)
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
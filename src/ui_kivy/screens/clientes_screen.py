@@ -5,13 +5,16 @@ Pantalla de clientes
 from kivymd.uix.screen import MDScreen
 from kivymd.uix.button import MDFlatButton, MDIconButton, MDRaisedButton
 from kivymd.uix.label import MDLabel
-from kivymd.uix.list import MDList, OneLineListItem
+from kivymd.uix.list import OneLineListItem
 from kivymd.uix.textfield import MDTextField
 from kivymd.uix.dialog import MDDialog
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.scrollview import ScrollView
 from kivy.metrics import dp
 from kivy.app import App
+import uuid
+
+from src.ui_kivy.busqueda import BuscadorClientes
+from src.ui_kivy.listas import ListaVirtual, fila
 
 
 class ClientesScreen(MDScreen):
@@ -19,15 +22,37 @@ class ClientesScreen(MDScreen):
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self.usuario_ui = None
+        self.marca_datos = None
     
     def on_enter(self):
-        """Se ejecuta al entrar a la pantalla."""
-        self.clear_widgets()
-        self.build_ui()
-        self.load_clientes()
+        """
+        Se ejecuta al entrar a la pantalla.
+        
+        La interfaz se construye una vez por sesión de usuario; al volver
+        solo se recarga la lista si los datos cambiaron o ya no están vigentes
+        (conservando la búsqueda y el filtro).
+        """
+        app = App.get_running_app()
+        if self.usuario_ui != app.usuario_id:
+            self.clear_widgets()
+            self.build_ui()
+            self.usuario_ui = app.usuario_id
+            self.marca_datos = None
+        
+        if not app.datos_vigentes(self.marca_datos):
+            self.recargar()
+    
+    def recargar(self):
+        """Recarga la lista respetando la búsqueda escrita."""
+        if self.search_field.text.strip():
+            self.on_search(self.search_field, self.search_field.text)
+        else:
+            self.load_clientes()
     
     def build_ui(self):
         """Construye la interfaz de usuario."""
+        app = App.get_running_app()
         layout = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
         
         # Header
@@ -49,6 +74,7 @@ class ClientesScreen(MDScreen):
             size_hint_x=0.5
         )
         self.search_field.bind(text=self.on_search)
+        self.buscador = BuscadorClientes(self.mostrar_busqueda, limit=20, clave='clientes')
         search_box.add_widget(self.search_field)
         
         filter_btn = MDIconButton(
@@ -70,47 +96,89 @@ class ClientesScreen(MDScreen):
         # Variable para filtros
         self.filtro_actual = {'estado': None}
         
-        # Lista de clientes
-        scroll = ScrollView()
-        self.clientes_list = MDList()
-        scroll.add_widget(self.clientes_list)
-        layout.add_widget(scroll)
+        # Lista de clientes (solo se crean las filas visibles)
+        self.clientes_list = ListaVirtual(OneLineListItem, alto_fila=dp(48))
+        self.filas_clientes = []
+        layout.add_widget(self.clientes_list)
         
         self.add_widget(layout)
     
-    def load_clientes(self):
-        """Carga la lista de clientes."""
+    def load_clientes(self, cursor=None):
+        """
+        Carga la lista de clientes por páginas.
+        
+        Args:
+            cursor: next_cursor de la página anterior (None para empezar)
+        """
         app = App.get_running_app()
         
-        # Construir URL con filtros
-        url = '/api/clientes'
-        params = []
+        # Construir parámetros con filtros
+        params = {}
         if hasattr(self, 'filtro_actual') and self.filtro_actual.get('estado'):
-            params.append(f"estado={self.filtro_actual['estado']}")
+            params['estado'] = self.filtro_actual['estado']
+        if cursor:
+            params['cursor'] = cursor
+            self.clientes_list.data = self.filas_clientes + [fila("Cargando...")]
+        else:
+            self.mostrar_cargando()
+        
+        def mostrar(success, data):
+            # La primera página puede llegar dos veces (caché y servidor): la
+            # segunda reemplaza a la primera en vez de sumarse
+            if not cursor:
+                self.filas_clientes = []
+            self.mostrar_pagina_clientes(success, data, self.load_clientes)
+        
+        # Reemplaza cualquier carga o búsqueda anterior todavía en curso
+        app.api_request_async(
+            'GET', '/api/clientes', mostrar,
+            params=params,
+            clave='clientes',
+            revalidar=not cursor
+        )
+    
+    def mostrar_cargando(self):
+        """Vacía la lista y muestra un indicador de carga."""
+        self.marca_datos = App.get_running_app().marca_datos()
+        self.filas_clientes = []
+        self.clientes_list.data = [fila("Cargando clientes...")]
+    
+    def fila_cliente(self, cliente):
+        """Datos de la fila de un cliente en la lista."""
+        return fila(
+            f"{cliente['nombre']} - ${cliente['monto_prestado']:,.0f}",
+            lambda c=cliente: self.show_cliente_detail(c)
+        )
+    
+    def mostrar_pagina_clientes(self, success, data, cargar_mas):
+        """
+        Agrega una página de clientes a la lista.
+        
+        Solo cambia los datos de la lista: los widgets de las filas visibles
+        se reutilizan.
+        
+        Args:
+            success: Si la petición fue exitosa
+            data: Respuesta paginada ({'items', 'next_cursor'})
+            cargar_mas: Función que recibe el cursor de la página siguiente
+        """
+        if not success or not isinstance(data, dict):
+            self.clientes_list.data = self.filas_clientes + [fila("Error cargando clientes")]
+            self.marca_datos = None
+            return
         
-        if params:
-            url += '?' + '&'.join(params)
+        # Copia local para búsquedas y registro de pagos sin conexión
+        App.get_running_app().store.guardar_clientes(data['items'])
         
-        success, data = app.api_request('GET', url)
+        self.filas_clientes.extend(self.fila_cliente(cliente) for cliente in data['items'])
         
-        self.clientes_list.clear_widgets()
+        filas = list(self.filas_clientes) or [fila("No hay clientes registrados")]
         
-        if success and isinstance(data, list):
-            for cliente in data:
-                item = OneLineListItem(
-                    text=f"{cliente['nombre']} - ${cliente['monto_prestado']:,.0f}",
-                    on_release=lambda x, c=cliente: self.show_cliente_detail(c)
-                )
-                self.clientes_list.add_widget(item)
-            
-            if not data:
-                self.clientes_list.add_widget(
-                    OneLineListItem(text="No hay clientes registrados")
-                )
-        else:
-            self.clientes_list.add_widget(
-                OneLineListItem(text="Error cargando clientes")
-            )
+        # "Ver más" al final para pedir la página siguiente
+        if data.get('next_cursor'):
+            filas.append(fila("Ver más...", lambda c=data['next_cursor']: cargar_mas(c)))
+        
+        self.clientes_list.data = filas
     
     def show_filters(self, *args):
         """Muestra diálogo de filtros."""
@@ -151,22 +219,19 @@ class ClientesScreen(MDScreen):
         self.load_clientes()
     
     def on_search(self, instance, value):
-        """Filtra clientes al escribir."""
-        if not value:
+        """Filtra clientes al escribir (primero en el dispositivo, luego en el servidor)."""
+        if not value.strip():
+            self.buscador.cancelar()
             self.load_clientes()
             return
         
-        app = App.get_running_app()
-        success, data = app.api_request('GET', f'/api/clientes?search={value}')
-        
-        self.clientes_list.clear_widgets()
-        if success and isinstance(data, list):
-            for cliente in data:
-                item = OneLineListItem(
-                    text=f"{cliente['nombre']} - ${cliente['monto_prestado']:,.0f}",
-                    on_release=lambda x, c=cliente: self.show_cliente_detail(c)
-                )
-                self.clientes_list.add_widget(item)
+        self.marca_datos = App.get_running_app().marca_datos()
+        self.buscador.buscar(value)
+    
+    def mostrar_busqueda(self, clientes):
+        """Muestra los resultados de la búsqueda (solo cambia los datos de la lista)."""
+        self.filas_clientes = [self.fila_cliente(cliente) for cliente in clientes]
+        self.clientes_list.data = list(self.filas_clientes) or [fila("Sin resultados")]
     
     def show_add_cliente(self, *args):
         """Muestra diálogo para agregar cliente."""
@@ -206,6 +271,10 @@ class ClientesScreen(MDScreen):
         
         content.add_widget(plazos_box)
         
+        # Una clave por diálogo: pulsar GUARDAR de nuevo tras un error de
+        # red no crea el cliente dos veces
+        idempotency_key = uuid.uuid4().hex
+        
         dialog = MDDialog(
             title="Nuevo Cliente",
             type="custom",
@@ -216,7 +285,8 @@ class ClientesScreen(MDScreen):
                     text="GUARDAR",
                     on_release=lambda x: self.do_add_cliente(
                         dialog, nombre_field.text, cedula_field.text,
-                        telefono_field.text, monto_field.text, plazo_seleccionado['tipo']
+                        telefono_field.text, monto_field.text, plazo_seleccionado['tipo'],
+                        idempotency_key
                     )
                 )
             ]
@@ -228,7 +298,7 @@ class ClientesScreen(MDScreen):
         plazo_dict['tipo'] = plazo
         label.text = f"Tipo de plazo: {plazo.capitalize()}"
     
-    def do_add_cliente(self, dialog, nombre, cedula, telefono, monto, tipo_plazo):
+    def do_add_cliente(self, dialog, nombre, cedula, telefono, monto, tipo_plazo, idempotency_key=None):
         """Guarda un nuevo cliente."""
         if not all([nombre, cedula, telefono, monto]):
             return
@@ -238,27 +308,35 @@ class ClientesScreen(MDScreen):
         except ValueError:
             return
         
+        def terminar(success, data):
+            if success:
+                dialog.dismiss()
+                self.load_clientes()
+        
         app = App.get_running_app()
-        success, data = app.api_request('POST', '/api/clientes', {
+        app.api_request_async('POST', '/api/clientes', terminar, {
             'nombre': nombre,
             'cedula': cedula,
             'telefono': telefono,
             'monto': monto,
             'tipo_plazo': tipo_plazo
-        })
-        
-        if success:
-            dialog.dismiss()
-            self.load_clientes()
+        }, idempotency_key=idempotency_key)
     
     def show_cliente_detail(self, cliente):
         """Muestra los detalles de un cliente."""
+        # Obtener detalles completos con cálculos desde la API
+        app = App.get_running_app()
+        app.api_request_async(
+            'GET', f'/api/clientes/{cliente["id"]}', self.mostrar_detalle_cliente,
+            clave='detalle_cliente'
+        )
+    
+    def mostrar_detalle_cliente(self, success, data):
+        """Muestra el diálogo de detalles con la respuesta de la API."""
         from kivymd.uix.dialog import MDDialog
         from kivymd.uix.button import MDRaisedButton, MDFlatButton
         
-        # Obtener detalles completos con cálculos desde la API
         app = App.get_running_app()
-        success, data = app.api_request('GET', f'/api/clientes/{cliente["id"]}')
         
         if not success:
             MDDialog(
@@ -363,49 +441,50 @@ Estado: {data.get('estado', 'activo').upper()}
             ).open()
             return
         
+        from kivymd.uix.dialog import MDDialog
         app = App.get_running_app()
-        # Obtener datos completos del cliente para mantener los demás campos
-        success, cliente = app.api_request('GET', f'/api/clientes/{cliente_id}')
         
-        if not success:
-            from kivymd.uix.dialog import MDDialog
-            MDDialog(
-                title="Error",
-                text="No se pudo cargar el cliente",
-                buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
-            ).open()
-            return
+        def actualizar(success, cliente):
+            if not success:
+                MDDialog(
+                    title="Error",
+                    text="No se pudo cargar el cliente",
+                    buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
+                ).open()
+                return
+            
+            # Actualizar solo nombre, cédula y teléfono
+            app.api_request_async('PUT', f'/api/clientes/{cliente_id}', terminar, {
+                'nombre': nombre,
+                'cedula': cedula,
+                'telefono': telefono,
+                'monto_prestado': cliente['monto_prestado'],
+                'fecha_prestamo': cliente['fecha_prestamo'],
+                'tipo_plazo': cliente['tipo_plazo'],
+                'tasa_interes': cliente['tasa_interes'],
+                'seguro': cliente['seguro'],
+                'cuota_minima': cliente['cuota_minima'],
+                'dias_plazo': cliente['dias_plazo']
+            })
+        
+        def terminar(success, data):
+            if success:
+                dialog.dismiss()
+                MDDialog(
+                    title="Éxito",
+                    text="Cliente actualizado correctamente",
+                    buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
+                ).open()
+                self.load_clientes()
+            else:
+                MDDialog(
+                    title="Error",
+                    text=f"No se pudo actualizar: {data}",
+                    buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
+                ).open()
         
-        # Actualizar solo nombre, cédula y teléfono
-        success, data = app.api_request('PUT', f'/api/clientes/{cliente_id}', {
-            'nombre': nombre,
-            'cedula': cedula,
-            'telefono': telefono,
-            'monto_prestado': cliente['monto_prestado'],
-            'fecha_prestamo': cliente['fecha_prestamo'],
-            'tipo_plazo': cliente['tipo_plazo'],
-            'tasa_interes': cliente['tasa_interes'],
-            'seguro': cliente['seguro'],
-            'cuota_minima': cliente['cuota_minima'],
-            'dias_plazo': cliente['dias_plazo']
-        })
-        
-        if success:
-            dialog.dismiss()
-            from kivymd.uix.dialog import MDDialog
-            MDDialog(
-                title="Éxito",
-                text="Cliente actualizado correctamente",
-                buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
-            ).open()
-            self.load_clientes()
-        else:
-            from kivymd.uix.dialog import MDDialog
-            MDDialog(
-                title="Error",
-                text=f"No se pudo actualizar: {data}",
-                buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
-            ).open()
+        # Obtener datos completos del cliente para mantener los demás campos
+        app.api_request_async('GET', f'/api/clientes/{cliente_id}', actualizar)
     
     def confirm_delete_cliente(self, cliente):
         """Confirma eliminación de cliente."""
@@ -438,32 +517,38 @@ Estado: {data.get('estado', 'activo').upper()}
     
     def do_delete_cliente(self, dialog, cliente_id):
         """Elimina (inactiva) el cliente."""
-        app = App.get_running_app()
-        success, data = app.api_request('DELETE', f'/api/clientes/{cliente_id}')
+        from kivymd.uix.dialog import MDDialog
+        
+        def terminar(success, data):
+            if success:
+                MDDialog(
+                    title="Éxito",
+                    text="Cliente eliminado correctamente",
+                    buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
+                ).open()
+                self.load_clientes()
+            else:
+                MDDialog(
+                    title="Error",
+                    text=f"No se pudo eliminar: {data}",
+                    buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
+                ).open()
         
         dialog.dismiss()
         
-        if success:
-            from kivymd.uix.dialog import MDDialog
-            MDDialog(
-                title="Éxito",
-                text="Cliente eliminado correctamente",
-                buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
-            ).open()
-            self.load_clientes()
-        else:
-            from kivymd.uix.dialog import MDDialog
-            MDDialog(
-                title="Error",
-                text=f"No se pudo eliminar: {data}",
-                buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
-            ).open()
+        app = App.get_running_app()
+        app.api_request_async('DELETE', f'/api/clientes/{cliente_id}', terminar)
     
     def show_historial_pagos(self, cliente_id):
         """Muestra historial de pagos del cliente."""
         app = App.get_running_app()
-        success, data = app.api_request('GET', f'/api/pagos/cliente/{cliente_id}')
-        
+        app.api_request_async(
+            'GET', f'/api/pagos/cliente/{cliente_id}', self.mostrar_historial_pagos,
+            clave='historial_cliente'
+        )
+    
+    def mostrar_historial_pagos(self, success, data):
+        """Muestra el diálogo con los pagos recibidos de la API."""
         if success and isinstance(data, list):
             total_pagado = sum(p.get('monto', 0) for p in data)
             historial_text = f"Total Pagado: ${total_pagado:,.0f}\n\n" + "\n".join([
@@ -10,6 +10,14 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.scrollview import ScrollView
 from kivy.metrics import dp
 from kivy.app import App
+from kivy.clock import Clock
+import uuid
+
+from src.ui_kivy.listas import ListaVirtual, FilaDosLineas, fila
+from src.ui_kivy.busqueda import BUSQUEDA_ESPERA, MIN_CARACTERES_SERVIDOR, normalizar
+
+# Clientes por página en el detalle de un cobrador
+CLIENTES_COBRADOR_PAGINA = 200
 
 
 class HomeScreen(MDScreen):
@@ -17,12 +25,25 @@ class HomeScreen(MDScreen):
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self.usuario_ui = None
+        self.marca_datos = None
     
     def on_enter(self):
-        """Se ejecuta al entrar a la pantalla."""
-        self.clear_widgets()
-        self.build_ui()
-        self.load_data()
+        """
+        Se ejecuta al entrar a la pantalla.
+        
+        La interfaz se construye una vez por sesión de usuario; al volver
+        solo se recargan los datos si cambiaron o ya no están vigentes.
+        """
+        app = App.get_running_app()
+        if self.usuario_ui != app.usuario_id:
+            self.clear_widgets()
+            self.build_ui()
+            self.usuario_ui = app.usuario_id
+            self.marca_datos = None
+        
+        if not app.datos_vigentes(self.marca_datos):
+            self.load_data()
     
     def build_ui(self):
         """Construye la interfaz de usuario."""
@@ -188,16 +209,22 @@ class HomeScreen(MDScreen):
     def load_data(self):
         """Carga el resumen del día y semanal (cobradores) o panel de supervisión (admin)."""
         app = App.get_running_app()
+        self.marca_datos = app.marca_datos()
         
         # Admin: cargar panel de supervisión
         if app.es_admin:
             self.load_panel_supervision()
             return
         
-        success_hoy, data_hoy = app.api_request('GET', '/api/pagos/resumen/hoy')
-        success_semanal, data_semanal = app.api_request('GET', '/api/pagos/resumen/semanal')
-        
-        if success_hoy:
+        # Resumen de hoy y de la semana en una sola petición
+        self.label_resumen.text = "Cargando resumen..."
+        app.api_request_async('GET', '/api/dashboard', self.mostrar_resumen, clave='home', revalidar=True)
+    
+    def mostrar_resumen(self, success, data):
+        """Muestra el resumen del día y de la semana recibido de la API."""
+        if success:
+            data_hoy = data['hoy']
+            data_semanal = data['semanal']
             resumen_text = f"""═══ RESUMEN DE HOY ═══
 
 Efectivo: ${data_hoy.get('efectivo', 0):,.0f}
@@ -207,67 +234,86 @@ Total Cobrado: ${data_hoy.get('total_cobrado', 0):,.0f}
 
 Pagos Registrados: {data_hoy.get('num_pagos', 0)}
 Clientes Activos: {data_hoy.get('clientes_activos', 0)}
-"""
-            
-            if success_semanal:
-                base = data_semanal.get('base', 0)
-                gastos = data_semanal.get('gastos', 0)
-                cobrado_semanal = data_semanal.get('total_cobrado', 0)
-                neto = cobrado_semanal - gastos
-                
-                resumen_text += f"""
+
 ═══ RESUMEN SEMANAL ═══
 
-Base: ${base:,.0f}
-Cobrado: ${cobrado_semanal:,.0f}
-Gastos: ${gastos:,.0f}
+Base: ${data_semanal.get('base', 0):,.0f}
+Cobrado: ${data_semanal.get('total_cobrado', 0):,.0f}
+Gastos: ${data_semanal.get('gastos', 0):,.0f}
 ━━━━━━━━━━━━━━━━━━━━
-Neto: ${neto:,.0f}
+Neto: ${data_semanal.get('neto', 0):,.0f}
 """
-            
-            self.label_resumen.text = resumen_text
         else:
-            self.label_resumen.text = "Error cargando resumen"
+            resumen_text = "Sin conexión: no se pudo cargar el resumen\n"
+            self.marca_datos = None
+        
+        # Lo registrado en el dispositivo que aún no llega al servidor
+        app = App.get_running_app()
+        pendiente = app.store.resumen_pendiente(app.usuario_id)
+        if pendiente['num_pagos'] or pendiente['num_gastos']:
+            resumen_text += f"""
+═══ PENDIENTE DE SINCRONIZAR ═══
+
+Pagos: {pendiente['num_pagos']} (${pendiente['total_pagos']:,.0f})
+Gastos: {pendiente['num_gastos']} (${pendiente['total_gastos']:,.0f})
+"""
+        
+        self.label_resumen.text = resumen_text
     
     def load_panel_supervision(self):
         """Carga el panel de supervisión con estadísticas y lista de cobradores."""
+        self.label_stats.text = "Cargando estadísticas..."
         app = App.get_running_app()
-        success, data = app.api_request('GET', '/api/usuarios/cobradores/resumen')
-        
+        app.api_request_async(
+            'GET', '/api/usuarios/cobradores/resumen', self.mostrar_supervision,
+            params={'limit': 500},
+            clave='home',
+            revalidar=True
+        )
+    
+    def mostrar_supervision(self, success, data):
+        """Muestra las estadísticas del equipo y los botones de cobradores."""
         if not success:
             self.label_stats.text = "Error cargando estadísticas"
+            self.marca_datos = None
             return
         
-        # Calcular totales
-        total_clientes = sum(c['clientes_activos'] for c in data)
-        total_cobrado = sum(c['cobrado_hoy'] for c in data)
-        total_base = sum(c['base_hoy'] for c in data)
-        total_gastos = sum(c['gastos_hoy'] for c in data)
-        ganancia_neta = total_cobrado - total_gastos
+        # Totales del equipo calculados en el servidor
+        totales = data['totales']
         
         # Actualizar estadísticas generales (formato compacto para móvil)
         stats_text = f"""═══ ESTADÍSTICAS ═══
-Cobradores: {len(data)} | Clientes: {total_clientes}
-Cobrado: ${total_cobrado:,.0f}
-Base: ${total_base:,.0f} | Gastos: ${total_gastos:,.0f}
+Cobradores: {totales['cobradores']} | Clientes: {totales['clientes_activos']}
+Cobrado: ${totales['cobrado']:,.0f}
+Base: ${totales['base']:,.0f} | Gastos: ${totales['gastos']:,.0f}
 ━━━━━━━━━━━━━━━━
-Ganancia: ${ganancia_neta:,.0f}"""
+Ganancia: ${totales['ganancia']:,.0f}"""
         self.label_stats.text = stats_text
         
-        # Limpiar y agregar botones de cobradores (más compactos)
-        self.cobradores_container.clear_widgets()
-        
-        for cobrador in data:
+        # Reutilizar los botones de cobradores ya creados: solo se crean o
+        # quitan los que sobran o faltan
+        botones = list(reversed(self.cobradores_container.children))
+        cobradores = data['cobradores']
+        
+        for btn in botones[len(cobradores):]:
+            self.cobradores_container.remove_widget(btn)
+        
+        for i, cobrador in enumerate(cobradores):
+            if i < len(botones):
+                btn = botones[i]
+            else:
+                btn = MDRaisedButton(
+                    size_hint_y=None,
+                    height=dp(45),
+                    md_bg_color=(0.3, 0.5, 0.7, 1),
+                    font_size='11sp'
+                )
+                btn.bind(on_release=lambda x: self.show_detalle_cobrador(x.cobrador))
+                self.cobradores_container.add_widget(btn)
+            
             # Texto más corto para móvil (2 líneas)
-            btn = MDRaisedButton(
-                text=f"{cobrador['nombre'][:20]}\n{cobrador['clientes_activos']} cli. | ${cobrador['cobrado_hoy']:,.0f}",
-                size_hint_y=None,
-                height=dp(45),
-                md_bg_color=(0.3, 0.5, 0.7, 1),
-                font_size='11sp'
-            )
-            btn.bind(on_release=lambda x, c=cobrador: self.show_detalle_cobrador(c))
-            self.cobradores_container.add_widget(btn)
+            btn.text = f"{cobrador['nombre'][:20]}\n{cobrador['clientes_activos']} cli. | ${cobrador['cobrado']:,.0f}"
+            btn.cobrador = cobrador
     
     def go_to_clientes(self, *args):
         """Navega a la pantalla de clientes."""
@@ -277,85 +323,122 @@ Ganancia: ${ganancia_neta:,.0f}"""
         """Navega a la pantalla de pagos."""
         self.manager.current = 'pagos'
     
-    def mostrar_clientes_tabla(self, clientes):
-        """Muestra los clientes en formato lista optimizado para móvil"""
-        self.content_clientes.clear_widgets()
-        
-        if not clientes:
-            lbl_empty = MDLabel(
-                text="No hay clientes",
-                size_hint_y=None,
-                height=dp(50),
-                halign='center'
-            )
-            self.content_clientes.add_widget(lbl_empty)
-            return
-        
-        # Mostrar cada cliente en formato compacto tipo tarjeta
-        for cliente in clientes:
-            # Mapeo de tipo_plazo
-            plazo_map = {
-                'diario': 'Diario',
-                'semanal': 'Semanal',
-                'quincenal': 'Quincenal',
-                'mensual': 'Mensual'
-            }
-            plazo_texto = plazo_map.get(cliente['tipo_plazo'], cliente['tipo_plazo'])
-            
-            fecha = cliente['fecha_prestamo'][:10] if cliente.get('fecha_prestamo') else 'N/A'
-            monto = f"${cliente['monto_prestado']:,.0f}"
-            abonado = f"${cliente.get('total_pagado', 0):,.0f}"
-            
-            # Formato de 2 líneas para móvil
-            linea1 = f"[b]{cliente['nombre'][:22]}[/b] | {cliente['telefono']}"
-            linea2 = f"Monto: {monto} | Abonado: {abonado} | {plazo_texto} | {fecha}"
-            
-            from kivymd.uix.card import MDCard
-            fila = MDCard(
-                orientation='vertical',
-                padding=(dp(8), dp(5)),
-                size_hint_y=None,
-                height=dp(48),
-                md_bg_color=(0.95, 0.95, 0.95, 1)
-            )
-            
-            lbl1 = MDLabel(
-                text=linea1,
-                size_hint_y=None,
-                height=dp(18),
-                font_size='11sp',
-                markup=True
-            )
-            lbl2 = MDLabel(
-                text=linea2,
-                size_hint_y=None,
-                height=dp(16),
-                font_size='10sp',
-                markup=True,
-                color=(0.3, 0.3, 0.3, 1)
-            )
-            fila.add_widget(lbl1)
-            fila.add_widget(lbl2)
-            self.content_clientes.add_widget(fila)
+    def fila_cliente_cobrador(self, cliente):
+        """Datos de la fila de un cliente en el detalle del cobrador (2 líneas)."""
+        # Mapeo de tipo_plazo
+        plazo_map = {
+            'diario': 'Diario',
+            'semanal': 'Semanal',
+            'quincenal': 'Quincenal',
+            'mensual': 'Mensual'
+        }
+        plazo_texto = plazo_map.get(cliente['tipo_plazo'], cliente['tipo_plazo'])
+        
+        fecha = cliente['fecha_prestamo'][:10] if cliente.get('fecha_prestamo') else 'N/A'
+        monto = f"${cliente['monto_prestado']:,.0f}"
+        abonado = f"${cliente.get('total_pagado', 0):,.0f}"
+        
+        # Formato de 2 líneas para móvil
+        return fila(
+            f"[b]{cliente['nombre'][:22]}[/b] | {cliente['telefono']}",
+            secondary_text=f"Monto: {monto} | Abonado: {abonado} | {plazo_texto} | {fecha}"
+        )
+    
+    def mostrar_clientes_tabla(self, filas):
+        """
+        Muestra las filas de clientes (solo cambia los datos de la lista).
+        
+        Si faltan páginas por cargar, agrega al final "Ver más..." para
+        que se note que la lista no está completa.
+        """
+        filas = list(filas) or [fila("No hay clientes", secondary_text="")]
+        if self.cursor_clientes_cobrador:
+            filas.append(fila(
+                "Ver más...",
+                lambda c=self.cursor_clientes_cobrador: self.cargar_mas_clientes_cobrador(c),
+                secondary_text=f"{len(self.clientes_cobrador_completos)} clientes cargados"
+            ))
+        self.lista_clientes_cobrador.data = filas
     
     def filtrar_clientes_cobrador(self, instance, value):
-        """Filtra los clientes por nombre o cédula"""
+        """
+        Filtra los clientes por nombre o cédula.
+        
+        Mientras falten páginas por cargar, la búsqueda también se hace en
+        el servidor (al dejar de escribir) para no perder clientes.
+        """
         if not hasattr(self, 'clientes_cobrador_completos'):
             return
         
-        if not value:
+        self._buscar_cobrador_servidor.cancel()
+        self.termino_cobrador = value.strip()
+        if not self.termino_cobrador:
             # Sin filtro, mostrar todos
-            self.mostrar_clientes_tabla(self.clientes_cobrador_completos)
+            self.mostrar_clientes_tabla([f for c, f in self.clientes_cobrador_completos])
             return
         
-        # Filtrar por nombre o cédula
-        value_lower = value.lower()
-        clientes_filtrados = [
-            c for c in self.clientes_cobrador_completos
-            if value_lower in c['nombre'].lower() or value_lower in c.get('cedula', '').lower()
+        # Filtrar por nombre o cédula: las filas ya están armadas, cada tecla
+        # solo cambia cuáles se muestran
+        self.mostrar_clientes_tabla(self.filas_filtradas_cobrador())
+        
+        if self.cursor_clientes_cobrador and len(self.termino_cobrador) >= MIN_CARACTERES_SERVIDOR:
+            self._buscar_cobrador_servidor()
+    
+    def filas_filtradas_cobrador(self):
+        """Filas de los clientes cargados que coinciden con el término actual."""
+        termino = normalizar(self.termino_cobrador)
+        return [
+            f for c, f in self.clientes_cobrador_completos
+            if termino in normalizar(c['nombre']) or termino in normalizar(c.get('cedula'))
         ]
+    
+    def buscar_clientes_cobrador_servidor(self, *args):
+        """Busca el término entre los clientes del cobrador que aún no se cargaron."""
+        termino = self.termino_cobrador
+        cobrador_id = self.cobrador_actual['id']
+        
+        def recibir(success, data):
+            if termino != self.termino_cobrador or not success or not isinstance(data, list):
+                return
+            cargados = {c['id'] for c, f in self.clientes_cobrador_completos}
+            extra = [
+                self.fila_cliente_cobrador(c) for c in data
+                if c['id'] not in cargados and c['usuario_id'] == cobrador_id
+            ]
+            self.mostrar_clientes_tabla(self.filas_filtradas_cobrador() + extra)
         
-        self.mostrar_clientes_tabla(clientes_filtrados)
+        App.get_running_app().api_request_async(
+            'GET', '/api/clientes/buscar', recibir,
+            params={'q': termino, 'usuario_id': cobrador_id, 'limit': 20},
+            clave='buscar_clientes_cobrador'
+        )
+    
+    def cargar_mas_clientes_cobrador(self, cursor):
+        """Pide la página siguiente de clientes del cobrador del detalle."""
+        cobrador_id = self.cobrador_actual['id']
+        
+        def recibir(success, pagina):
+            if self.cobrador_actual['id'] != cobrador_id:
+                return
+            if not success or not isinstance(pagina, dict):
+                # "Ver más..." sigue al final para reintentar
+                self.lista_clientes_cobrador.data = (
+                    [fila("Error cargando clientes", secondary_text="")] +
+                    self.lista_clientes_cobrador.data
+                )
+                return
+            
+            self.clientes_cobrador_completos.extend(
+                (c, self.fila_cliente_cobrador(c)) for c in pagina['items']
+            )
+            self.cursor_clientes_cobrador = pagina.get('next_cursor')
+            self.filtrar_clientes_cobrador(None, self.termino_cobrador)
+        
+        App.get_running_app().api_request_async(
+            'GET', '/api/clientes', recibir,
+            params={'usuario_id': cobrador_id, 'limit': CLIENTES_COBRADOR_PAGINA, 'cursor': cursor},
+            clave='detalle_cobrador'
+        )
     
     def show_detalle_cobrador(self, cobrador):
         """Muestra estadísticas y clientes de un cobrador específico"""
@@ -365,8 +448,15 @@ Ganancia: ${ganancia_neta:,.0f}"""
         
         # Obtener clientes del cobrador
         app = App.get_running_app()
-        success, clientes = app.api_request('GET', f'/api/clientes?usuario_id={cobrador["id"]}')
-        
+        app.api_request_async(
+            'GET', '/api/clientes',
+            lambda success, pagina: self.mostrar_detalle_cobrador(cobrador, success, pagina),
+            params={'usuario_id': cobrador['id'], 'limit': CLIENTES_COBRADOR_PAGINA},
+            clave='detalle_cobrador'
+        )
+    
+    def mostrar_detalle_cobrador(self, cobrador, success, pagina):
+        """Muestra el diálogo con las estadísticas y clientes del cobrador."""
         if not success:
             from kivymd.uix.dialog import MDDialog
             MDDialog(
@@ -376,9 +466,15 @@ Ganancia: ${ganancia_neta:,.0f}"""
             ).open()
             return
         
-        # Guardar datos para filtrado
-        self.clientes_cobrador_completos = clientes
+        # Guardar datos para filtrado (cada cliente con su fila ya armada)
+        clientes = pagina['items']
+        self.clientes_cobrador_completos = [(c, self.fila_cliente_cobrador(c)) for c in clientes]
+        self.cursor_clientes_cobrador = pagina.get('next_cursor')
         self.cobrador_actual = cobrador
+        self.termino_cobrador = ''
+        self._buscar_cobrador_servidor = Clock.create_trigger(
+            self.buscar_clientes_cobrador_servidor, BUSQUEDA_ESPERA
+        )
         
         # Crear contenedor principal (optimizado para móvil)
         from kivymd.uix.boxlayout import MDBoxLayout
@@ -388,9 +484,9 @@ Ganancia: ${ganancia_neta:,.0f}"""
         
         # Estadísticas del cobrador (compacto)
         stats_text = f"""═══ {cobrador['nombre'][:20]} ═══
-Clientes: {cobrador['clientes_activos']} | Cobrado: ${cobrador['cobrado_hoy']:,.0f}
-Base: ${cobrador['base_hoy']:,.0f} | Gastos: ${cobrador['gastos_hoy']:,.0f}
-Ganancia: ${cobrador['cobrado_hoy'] - cobrador['gastos_hoy']:,.0f}"""
+Clientes: {cobrador['clientes_activos']} | Cobrado: ${cobrador['cobrado']:,.0f}
+Base: ${cobrador['base']:,.0f} | Gastos: ${cobrador['gastos']:,.0f}
+Ganancia: ${cobrador['ganancia']:,.0f}"""
         
         lbl_stats = MDLabel(
             text=stats_text,
@@ -411,18 +507,19 @@ Ganancia: ${cobrador['cobrado_hoy'] - cobrador['gastos_hoy']:,.0f}"""
         self.search_field_cobrador.bind(text=self.filtrar_clientes_cobrador)
         container.add_widget(self.search_field_cobrador)
         
-        # Contenedor scrollable para lista de clientes
-        from kivy.uix.scrollview import ScrollView
-        scroll = ScrollView(size_hint_y=None, height=dp(315))
-        
-        self.content_clientes = MDBoxLayout(orientation='vertical', spacing=dp(3), size_hint_y=None)
-        self.content_clientes.bind(minimum_height=self.content_clientes.setter('height'))
+        # Lista virtualizada de clientes (solo se crean las filas visibles)
+        self.lista_clientes_cobrador = ListaVirtual(
+            FilaDosLineas,
+            alto_fila=dp(48),
+            espacio=dp(3),
+            size_hint_y=None,
+            height=dp(315)
+        )
         
         # Mostrar todos los clientes
-        self.mostrar_clientes_tabla(clientes)
+        self.mostrar_clientes_tabla([f for c, f in self.clientes_cobrador_completos])
         
-        scroll.add_widget(self.content_clientes)
-        container.add_widget(scroll)
+        container.add_widget(self.lista_clientes_cobrador)
 
         
         from kivymd.uix.dialog import MDDialog
@@ -457,6 +554,9 @@ Ganancia: ${cobrador['cobrado_hoy'] - cobrador['gastos_hoy']:,.0f}"""
         monto_field = MDTextField(hint_text="Monto de la base", mode="rectangle")
         content.add_widget(monto_field)
         
+        # Una clave por diálogo: reintentar tras un error de red no duplica
+        idempotency_key = uuid.uuid4().hex
+        
         dialog = MDDialog(
             title="Agregar Base del Día",
             type="custom",
@@ -465,25 +565,29 @@ Ganancia: ${cobrador['cobrado_hoy'] - cobrador['gastos_hoy']:,.0f}"""
                 MDFlatButton(text="CANCELAR", on_release=lambda x: dialog.dismiss()),
                 MDRaisedButton(
                     text="GUARDAR",
-                    on_release=lambda x: self.do_agregar_base(dialog, monto_field.text)
+                    on_release=lambda x: self.do_agregar_base(dialog, monto_field.text, idempotency_key)
                 )
             ]
         )
         dialog.open()
     
-    def do_agregar_base(self, dialog, monto):
+    def do_agregar_base(self, dialog, monto, idempotency_key=None):
         """Registra la base del día."""
         try:
             monto = float(monto)
         except ValueError:
             return
         
-        app = App.get_running_app()
-        success, data = app.api_request('POST', '/api/usuarios/base', {'monto': monto})
+        def terminar(success, data):
+            if success:
+                dialog.dismiss()
+                self.load_data()
         
-        if success:
-            dialog.dismiss()
-            self.load_data()
+        app = App.get_running_app()
+        app.api_request_async(
+            'POST', '/api/usuarios/base', terminar, {'monto': monto},
+            idempotency_key=idempotency_key
+        )
     
     def show_registrar_gasto(self, *args):
         """Muestra diálogo para registrar gasto."""
@@ -519,16 +623,17 @@ Ganancia: ${cobrador['cobrado_hoy'] - cobrador['gastos_hoy']:,.0f}"""
             monto = float(monto)
         except ValueError:
             return
+        if monto <= 0:
+            return
         
+        # Se guarda en el dispositivo y se envía al servidor cuando haya señal
         app = App.get_running_app()
-        success, data = app.api_request('POST', '/api/usuarios/gasto', {
-            'monto': monto,
-            'descripcion': descripcion
-        })
+        app.store.registrar_gasto(app.usuario_id, monto, descripcion)
+        app.marcar_datos_cambiados()
+        app.sync.sincronizar()
         
-        if success:
-            dialog.dismiss()
-            self.load_data()
+        dialog.dismiss()
+        self.load_data()
     
     def show_cambiar_password(self, *args):
         """Muestra diálogo para cambiar contraseña."""
@@ -591,36 +696,38 @@ Ganancia: ${cobrador['cobrado_hoy'] - cobrador['gastos_hoy']:,.0f}"""
             ).open()
             return
         
+        def terminar(success, data):
+            from kivymd.uix.dialog import MDDialog
+            if success:
+                MDDialog(
+                    title="Éxito",
+                    text="Contraseña actualizada correctamente",
+                    buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
+                ).open()
+            else:
+                MDDialog(
+                    title="Error",
+                    text=f"No se pudo cambiar la contraseña: {data}",
+                    buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
+                ).open()
+        
+        dialog.dismiss()
+        
         app = App.get_running_app()
-        success, data = app.api_request('PUT', '/api/usuarios/cambiar-password', {
+        app.api_request_async('PUT', '/api/usuarios/cambiar-password', terminar, {
             'password_actual': actual,
             'password_nueva': nueva
         })
-        
-        dialog.dismiss()
-        
-        if success:
-            from kivymd.uix.dialog import MDDialog
-            MDDialog(
-                title="Éxito",
-                text="Contraseña actualizada correctamente",
-                buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
-            ).open()
-        else:
-            from kivymd.uix.dialog import MDDialog
-            MDDialog(
-                title="Error",
-                text=f"No se pudo cambiar la contraseña: {data}",
-                buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
-            ).open()
     
     def show_reportes(self, *args):
         """Muestra reportes y estadísticas completas."""
         app = App.get_running_app()
         
-        # Obtener resumen semanal
-        success, data = app.api_request('GET', '/api/pagos/resumen/semanal')
-        
+        # Obtener resumen semanal (incluye el dinero en mano)
+        app.api_request_async('GET', '/api/dashboard', self.mostrar_reportes, clave='reportes')
+    
+    def mostrar_reportes(self, success, data):
+        """Muestra el diálogo de reportes con el resumen recibido de la API."""
         if not success:
             from kivymd.uix.dialog import MDDialog
             MDDialog(
@@ -630,13 +737,15 @@ Ganancia: ${cobrador['cobrado_hoy'] - cobrador['gastos_hoy']:,.0f}"""
             ).open()
             return
         
-        base = data.get('base', 0)
-        gastos = data.get('gastos', 0)
-        efectivo = data.get('efectivo', 0)
-        digital = data.get('digital', 0)
-        cobrado = data.get('total_cobrado', 0)
-        clientes_pagaron = data.get('clientes_pagaron', 0)
-        neto = data.get('neto', 0)
+        semanal = data['semanal']
+        base = semanal.get('base', 0)
+        gastos = semanal.get('gastos', 0)
+        efectivo = semanal.get('efectivo', 0)
+        digital = semanal.get('digital', 0)
+        cobrado = semanal.get('total_cobrado', 0)
+        clientes_pagaron = semanal.get('clientes_pagaron', 0)
+        neto = semanal.get('neto', 0)
+        en_mano = data['en_mano']
         
         reporte_text = f"""
 ╔═══════════════════════════╗
@@ -663,10 +772,10 @@ NETO (Cobrado - Gastos)
 
 EN MANO
    Base + Cobrado - Gastos:
-   ${base + cobrado - gastos:,.0f}
+   ${en_mano['total']:,.0f}
    
    (Menos Digital: ${digital:,.0f})
-   Efectivo Real: ${base + efectivo - gastos:,.0f}
+   Efectivo Real: ${en_mano['efectivo_real']:,.0f}
 """
         
         from kivymd.uix.dialog import MDDialog
@@ -681,9 +790,15 @@ EN MANO
     def show_panel_supervision(self, *args):
         """Muestra panel de supervisión con estadísticas de todos los cobradores (como v1)."""
         app = App.get_running_app()
-        success, data = app.api_request('GET', '/api/usuarios/cobradores/resumen')
-        
-        if not success or not data:
+        app.api_request_async(
+            'GET', '/api/usuarios/cobradores/resumen', self.mostrar_panel_supervision,
+            params={'limit': 500},
+            clave='panel_supervision'
+        )
+    
+    def mostrar_panel_supervision(self, success, data):
+        """Muestra el diálogo de supervisión con los datos recibidos de la API."""
+        if not success or not data.get('cobradores'):
             from kivymd.uix.dialog import MDDialog
             MDDialog(
                 title="Error",
@@ -692,24 +807,20 @@ EN MANO
             ).open()
             return
         
-        # Calcular totales
-        total_clientes = sum(c['clientes_activos'] for c in data)
-        total_cobrado = sum(c['cobrado_hoy'] for c in data)
-        total_base = sum(c['base_hoy'] for c in data)
-        total_gastos = sum(c['gastos_hoy'] for c in data)
-        ganancia_neta = total_cobrado - total_gastos
+        # Totales del equipo calculados en el servidor
+        totales = data['totales']
         
         # Crear texto del resumen general
         resumen_text = f"""═══ ESTADÍSTICAS GLOBALES ═══
 
-Total Cobradores: {len(data)}
-Total Clientes Activos: {total_clientes}
+Total Cobradores: {totales['cobradores']}
+Total Clientes Activos: {totales['clientes_activos']}
 
-Total Cobrado Hoy: ${total_cobrado:,.0f}
-Total Base: ${total_base:,.0f}
-Total Gastos: ${total_gastos:,.0f}
+Total Cobrado Hoy: ${totales['cobrado']:,.0f}
+Total Base: ${totales['base']:,.0f}
+Total Gastos: ${totales['gastos']:,.0f}
 ━━━━━━━━━━━━━━━━━━━━
-Ganancia Neta: ${ganancia_neta:,.0f}
+Ganancia Neta: ${totales['ganancia']:,.0f}
 """
         
         # Crear contenido con botones para cada cobrador
@@ -737,7 +848,7 @@ Ganancia Neta: ${ganancia_neta:,.0f}
         content.add_widget(sep)
         
         # Botón por cada cobrador
-        for cobrador in data:
+        for cobrador in data['cobradores']:
             btn = MDRaisedButton(
                 text=f"{cobrador['nombre']} - {cobrador['clientes_activos']} clientes",
                 size_hint_y=None,
@@ -67,13 +67,13 @@ class LoginScreen(MDScreen):
         layout.add_widget(self.password_field)
         
         # Botón de login
-        login_btn = MDRaisedButton(
+        self.login_btn = MDRaisedButton(
             text="INICIAR SESIÓN",
             size_hint_x=1,
             pos_hint={"center_x": 0.5},
             on_release=self.do_login
         )
-        layout.add_widget(login_btn)
+        layout.add_widget(self.login_btn)
         
         # Botón de registro
         register_btn = MDRaisedButton(
@@ -94,8 +94,24 @@ class LoginScreen(MDScreen):
         )
         layout.add_widget(version_label)
         
+        # Estado de la conexión con la API (se verifica tras mostrar el login)
+        self.estado_api_label = MDLabel(
+            text="",
+            halign="center",
+            font_style="Caption",
+            theme_text_color="Error"
+        )
+        layout.add_widget(self.estado_api_label)
+        
         self.add_widget(layout)
     
+    def mostrar_estado_api(self, conectado):
+        """Avisa si la API no responde (el login fallaría)."""
+        if conectado:
+            self.estado_api_label.text = ""
+        else:
+            self.estado_api_label.text = "Sin conexión con el servidor"
+    
     def do_login(self, *args):
         """Realiza el proceso de login."""
         username = self.username_field.text.strip()
@@ -105,17 +121,22 @@ class LoginScreen(MDScreen):
             self.show_dialog("Error", "Por favor ingresa usuario y contraseña")
             return
         
+        def terminar(success, message):
+            self.login_btn.disabled = False
+            if success:
+                self.mostrar_estado_api(True)
+                # Limpiar campos
+                self.username_field.text = ""
+                self.password_field.text = ""
+                # Ir a home
+                self.manager.current = 'home'
+            else:
+                self.show_dialog("Error de Login", message)
+        
+        # Evitar logins repetidos mientras se espera la respuesta
+        self.login_btn.disabled = True
         app = App.get_running_app()
-        success, message = app.login(username, password)
-        
-        if success:
-            # Limpiar campos
-            self.username_field.text = ""
-            self.password_field.text = ""
-            # Ir a home
-            self.manager.current = 'home'
-        else:
-            self.show_dialog("Error de Login", message)
+        app.login(username, password, terminar)
     
     def show_dialog(self, title, text):
         """Muestra un diálogo de alerta."""
@@ -181,31 +202,28 @@ class LoginScreen(MDScreen):
             return
         
         # Llamar directamente a la API sin token (registro público)
-        import requests
-        try:
-            response = requests.post(
-                'http://localhost:8000/api/auth/register',
+        def registrar():
+            response = app.http.request(
+                'POST',
+                '/api/auth/register',
                 json={
                     'username': username,
                     'password': password,
                     'nombre': nombre
-                },
-                timeout=10
+                }
             )
             
             if response.status_code == 200:
-                success = True
-                response_msg = "Usuario registrado correctamente"
+                return True, "Usuario registrado correctamente"
+            error_data = response.json()
+            return False, error_data.get('detail', 'Error desconocido')
+        
+        def terminar(success, response_msg):
+            if success:
+                dialog.dismiss()
+                self.show_dialog("Éxito", "Usuario registrado correctamente. Ya puedes iniciar sesión.")
             else:
-                success = False
-                error_data = response.json()
-                response_msg = error_data.get('detail', 'Error desconocido')
-        except Exception as e:
-            success = False
-            response_msg = f"Error de conexión: {str(e)}"
-        
-        if success:
-            dialog.dismiss()
-            self.show_dialog("Éxito", "Usuario registrado correctamente. Ya puedes iniciar sesión.")
-        else:
-            self.show_dialog("Error", f"No se pudo registrar: {response_msg}")
+                self.show_dialog("Error", f"No se pudo registrar: {response_msg}")
+        
+        app = App.get_running_app()
+        app.ejecutar_async(registrar, terminar)
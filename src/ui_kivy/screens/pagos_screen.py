@@ -3,7 +3,7 @@ Pantalla de registro de pagos
 """
 
 from kivymd.uix.screen import MDScreen
-from kivymd.uix.button import MDRaisedButton, MDIconButton
+from kivymd.uix.button import MDRaisedButton, MDIconButton, MDFlatButton
 from kivymd.uix.textfield import MDTextField
 from kivymd.uix.label import MDLabel
 from kivymd.uix.dialog import MDDialog
@@ -11,6 +11,10 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.metrics import dp
 from kivy.app import App
 
+from src.ui_kivy.busqueda import BuscadorClientes
+from src.ui_kivy.listas import ListaVirtual, fila
+from src.ui_kivy.local_store import TIPOS_PAGO
+
 
 class PagosScreen(MDScreen):
     """Pantalla de registro de pagos."""
@@ -18,14 +22,35 @@ class PagosScreen(MDScreen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.dialog = None
+        self.usuario_ui = None
+        self.marca_datos = None
+        self.vista = 'resumen'
     
     def on_enter(self):
-        """Se ejecuta al entrar a la pantalla."""
-        self.clear_widgets()
-        self.build_ui()
+        """
+        Se ejecuta al entrar a la pantalla.
+        
+        La interfaz se construye una vez por sesión de usuario; al volver
+        solo se recarga la vista actual (resumen o historial) si los datos
+        cambiaron o ya no están vigentes.
+        """
+        app = App.get_running_app()
+        if self.usuario_ui != app.usuario_id:
+            self.clear_widgets()
+            self.build_ui()
+            self.usuario_ui = app.usuario_id
+            self.marca_datos = None
+            self.vista = 'resumen'
+        
+        if not app.datos_vigentes(self.marca_datos):
+            if self.vista == 'historial':
+                self.show_historial()
+            else:
+                self.show_resumen()
     
     def build_ui(self):
         """Construye la interfaz de usuario."""
+        app = App.get_running_app()
         layout = BoxLayout(orientation='vertical', padding=dp(20), spacing=dp(15))
         
         # Header
@@ -70,33 +95,47 @@ class PagosScreen(MDScreen):
         # Variables para filtros
         self.filtro_pagos = {'tipo': None}
         
-        # Área de contenido
-        from kivy.uix.scrollview import ScrollView
-        scroll = ScrollView()
-        self.content_area = BoxLayout(orientation='vertical', spacing=dp(10), size_hint_y=None)
-        self.content_area.bind(minimum_height=self.content_area.setter('height'))
-        scroll.add_widget(self.content_area)
-        layout.add_widget(scroll)
+        # Área de contenido (el historial trae su propia lista con scroll)
+        self.content_area = BoxLayout(orientation='vertical', spacing=dp(10))
+        layout.add_widget(self.content_area)
         
         self.add_widget(layout)
-        
-        # Mostrar resumen por defecto
-        self.show_resumen()
     
     def show_resumen(self):
         """Muestra resumen de pagos del día."""
-        self.content_area.clear_widgets()
+        self.mostrar_cargando("Cargando resumen...")
         
         app = App.get_running_app()
-        success, data = app.api_request('GET', '/api/pagos/resumen/hoy')
+        self.vista = 'resumen'
+        self.marca_datos = app.marca_datos()
+        app.api_request_async(
+            'GET', '/api/pagos/resumen/hoy', self.mostrar_resumen,
+            clave='contenido_pagos',
+            revalidar=True
+        )
+    
+    def mostrar_resumen(self, success, data):
+        """Muestra el resumen del día recibido de la API."""
+        self.content_area.clear_widgets()
         
         if success:
-            resumen = MDLabel(
-                text=f"""RESUMEN DE HOY\n\nEfectivo: ${data.get('efectivo', 0):,.0f}\nDigital: ${data.get('digital', 0):,.0f}\nTotal: ${data.get('total_cobrado', 0):,.0f}\n\nPagos: {data.get('num_pagos', 0)}""",
-                size_hint_y=None,
-                height=dp(200)
-            )
-            self.content_area.add_widget(resumen)
+            texto = f"""RESUMEN DE HOY\n\nEfectivo: ${data.get('efectivo', 0):,.0f}\nDigital: ${data.get('digital', 0):,.0f}\nTotal: ${data.get('total_cobrado', 0):,.0f}\n\nPagos: {data.get('num_pagos', 0)}"""
+        else:
+            texto = "RESUMEN DE HOY\n\nSin conexión con el servidor"
+            self.marca_datos = None
+        
+        # Lo registrado en el dispositivo que aún no llega al servidor
+        app = App.get_running_app()
+        pendiente = app.store.resumen_pendiente(app.usuario_id)
+        if pendiente['num_pagos']:
+            texto += f"\n\nPendientes de sincronizar: {pendiente['num_pagos']} (${pendiente['total_pagos']:,.0f})"
+        
+        resumen = MDLabel(
+            text=texto,
+            size_hint_y=None,
+            height=dp(200)
+        )
+        self.content_area.add_widget(resumen)
     
     def show_registrar_pago(self, *args):
         """Muestra diálogo para registrar pago."""
@@ -121,8 +160,13 @@ class PagosScreen(MDScreen):
         monto_field = MDTextField(hint_text="Monto", mode="rectangle")
         content.add_widget(monto_field)
         
-        # Búsqueda en tiempo real
-        buscar_field.bind(text=lambda instance, value: self.buscar_cliente_pago(value, cliente_label))
+        # Búsqueda en tiempo real (local al instante, servidor al dejar de escribir)
+        buscador = BuscadorClientes(
+            lambda clientes: self.listar_clientes_pago(clientes, cliente_label),
+            limit=5,  # Máximo 5 resultados
+            clave='buscar_cliente_pago'
+        )
+        buscar_field.bind(text=lambda instance, value: buscador.buscar(value))
         
         # Botones de tipo de pago
         tipo_box = BoxLayout(size_hint_y=None, height=dp(50), spacing=dp(10))
@@ -144,24 +188,16 @@ class PagosScreen(MDScreen):
         )
         dialog.open()
     
-    def buscar_cliente_pago(self, termino, label):
-        """Busca clientes para registrar pago."""
-        if len(termino) < 2:
-            self.clientes_resultado.clear_widgets()
-            return
-        
-        app = App.get_running_app()
-        success, data = app.api_request('GET', f'/api/clientes?search={termino}')
-        
+    def listar_clientes_pago(self, clientes, label):
+        """Muestra los clientes encontrados para registrar el pago."""
+        from kivymd.uix.list import OneLineListItem
         self.clientes_resultado.clear_widgets()
-        if success and isinstance(data, list):
-            from kivymd.uix.list import OneLineListItem
-            for cliente in data[:5]:  # Máximo 5 resultados
-                item = OneLineListItem(
-                    text=f"{cliente['nombre']} - {cliente.get('cedula', 'S/C')}",
-                    on_release=lambda x, c=cliente, lbl=label: self.seleccionar_cliente_pago(c, lbl)
-                )
-                self.clientes_resultado.add_widget(item)
+        for cliente in clientes:
+            item = OneLineListItem(
+                text=f"{cliente['nombre']} - {cliente.get('cedula', 'S/C')}",
+                on_release=lambda x, c=cliente, lbl=label: self.seleccionar_cliente_pago(c, lbl)
+            )
+            self.clientes_resultado.add_widget(item)
     
     def seleccionar_cliente_pago(self, cliente, label):
         """Selecciona un cliente para el pago."""
@@ -183,19 +219,23 @@ class PagosScreen(MDScreen):
             self.show_dialog("Error", "Monto inválido")
             return
         
+        # Las mismas validaciones que la API: lo que no pasaría se avisa ahora
+        if monto <= 0:
+            self.show_dialog("Error", "El monto debe ser mayor a cero")
+            return
+        if tipo_pago not in TIPOS_PAGO:
+            self.show_dialog("Error", "Tipo de pago inválido")
+            return
+        
+        # Se guarda en el dispositivo y se envía al servidor cuando haya señal
         app = App.get_running_app()
-        success, data = app.api_request('POST', '/api/pagos', {
-            'cliente_id': cliente_id,
-            'monto': monto,
-            'tipo_pago': tipo_pago
-        })
+        app.store.registrar_pago(app.usuario_id, self.cliente_seleccionado, monto, tipo_pago)
+        app.marcar_datos_cambiados()
+        app.sync.sincronizar()
         
-        if success:
-            dialog.dismiss()
-            self.show_dialog("Éxito", "Pago registrado correctamente")
-            self.show_resumen()
-        else:
-            self.show_dialog("Error", str(data))
+        dialog.dismiss()
+        self.show_dialog("Éxito", "Pago registrado correctamente")
+        self.show_resumen()
     
     def show_filtros_pagos(self, *args):
         """Muestra diálogo de filtros para pagos."""
@@ -235,74 +275,129 @@ class PagosScreen(MDScreen):
             self.filter_dialog_pagos.dismiss()
         self.show_historial()
     
-    def show_historial(self, *args):
-        """Muestra historial de pagos con opción de eliminar."""
-        self.content_area.clear_widgets()
+    def show_historial(self, *args, cursor=None):
+        """
+        Muestra historial de pagos con opción de eliminar.
         
+        Args:
+            cursor: next_cursor para agregar la página siguiente
+        """
         app = App.get_running_app()
+        if not cursor:
+            self.mostrar_cargando("Cargando pagos...")
+            self.vista = 'historial'
+            self.marca_datos = app.marca_datos()
         
-        # Aplicar filtros si existen
-        url = '/api/pagos'
+        # Filtro por tipo de pago aplicado en el servidor
+        params = {'limit': 30}
         if hasattr(self, 'filtro_pagos') and self.filtro_pagos.get('tipo'):
-            # Necesitaríamos un endpoint que soporte filtro por tipo
-            # Por ahora filtramos en el cliente
-            pass
-        
-        success, data = app.api_request('GET', url)
-        
-        if success and isinstance(data, list):
-            # Filtrar en cliente si es necesario
-            if hasattr(self, 'filtro_pagos') and self.filtro_pagos.get('tipo'):
-                data = [p for p in data if p.get('tipo_pago') == self.filtro_pagos['tipo']]
-            
-            from kivymd.uix.list import MDList, ThreeLineIconListItem
-            from kivymd.uix.button import MDIconButton
-            lista = MDList()
-            
-            for pago in data[:30]:  # Últimos 30 pagos
-                # Solo cobradores pueden eliminar (al hacer clic)
-                if app.es_admin:
-                    item = ThreeLineIconListItem(
-                        text=f"${pago.get('monto', 0):,.0f} - {pago.get('tipo_pago', 'N/A').upper()}",
-                        secondary_text=f"Cliente: {pago.get('cliente_nombre', 'N/A')}",
-                        tertiary_text=f"Fecha: {pago.get('fecha', 'N/A')}"
-                    )
-                else:
-                    item = ThreeLineIconListItem(
-                        text=f"${pago.get('monto', 0):,.0f} - {pago.get('tipo_pago', 'N/A').upper()}",
-                        secondary_text=f"Cliente: {pago.get('cliente_nombre', 'N/A')}",
-                        tertiary_text=f"Fecha: {pago.get('fecha', 'N/A')}",
-                        on_release=lambda x, p=pago: self.confirm_delete_pago(p)
-                    )
-                lista.add_widget(item)
-            
-            if not data:
-                from kivymd.uix.label import MDLabel
+            params['tipo_pago'] = self.filtro_pagos['tipo']
+        if cursor:
+            params['cursor'] = cursor
+        
+        app.api_request_async(
+            'GET', '/api/pagos',
+            lambda success, data: self.mostrar_historial(success, data, cursor),
+            params=params,
+            clave='contenido_pagos'
+        )
+    
+    def mostrar_historial(self, success, data, cursor):
+        """
+        Agrega una página de pagos al historial.
+        
+        Las páginas siguientes solo agregan datos a la lista virtualizada:
+        los widgets de las filas visibles se reutilizan.
+        
+        Args:
+            success: Si la petición fue exitosa
+            data: Respuesta paginada ({'items', 'next_cursor'})
+            cursor: Cursor con el que se pidió la página (None si es la primera)
+        """
+        app = App.get_running_app()
+        if not cursor:
+            self.content_area.clear_widgets()
+            self.historial_lista = None
+            self.historial_total = 0
+        
+        if not success or not isinstance(data, dict):
+            self.marca_datos = None
+            # En páginas siguientes queda el pie "Ver más" para reintentar
+            if not cursor:
                 self.content_area.add_widget(MDLabel(
-                    text="No hay pagos registrados",
+                    text="Error cargando pagos",
                     halign="center",
                     size_hint_y=None,
                     height=dp(100)
                 ))
-            else:
-                self.content_area.add_widget(lista)
-                
-                # Agregar total
-                total = sum(p.get('monto', 0) for p in data)
-                from kivymd.uix.label import MDLabel
-                
-                # Texto según el rol
-                if app.es_admin:
-                    footer_text = f"\nTotal: ${total:,.0f}\n(Vista de solo lectura)"
-                else:
-                    footer_text = f"\nTotal: ${total:,.0f}\n(Click en un pago para eliminarlo)"
-                
-                self.content_area.add_widget(MDLabel(
-                    text=footer_text,
-                    halign="center",
-                    size_hint_y=None,
-                    height=dp(80)
-                ))
+            return
+        
+        pagos = data['items']
+        if not app.es_admin:
+            app.store.guardar_pagos(app.usuario_id, pagos)
+        from kivymd.uix.list import ThreeLineListItem
+        
+        # Quitar el pie de la página anterior (se vuelve a agregar al final)
+        if cursor and getattr(self, 'historial_footer', None) is not None:
+            self.content_area.remove_widget(self.historial_footer)
+        
+        if not pagos and self.historial_lista is None:
+            self.content_area.add_widget(MDLabel(
+                text="No hay pagos registrados",
+                halign="center",
+                size_hint_y=None,
+                height=dp(100)
+            ))
+            return
+        
+        if self.historial_lista is None:
+            self.historial_lista = ListaVirtual(ThreeLineListItem, alto_fila=dp(88))
+            self.content_area.add_widget(self.historial_lista)
+        
+        # Solo cobradores pueden eliminar (al hacer clic)
+        self.historial_lista.data = self.historial_lista.data + [
+            fila(
+                f"${pago.get('monto', 0):,.0f} - {pago.get('tipo_pago', 'N/A').upper()}",
+                None if app.es_admin else (lambda p=pago: self.confirm_delete_pago(p)),
+                secondary_text=f"Cliente: {pago.get('cliente_nombre', 'N/A')}",
+                tertiary_text=f"Fecha: {pago.get('fecha', 'N/A')}"
+            )
+            for pago in pagos
+        ]
+        
+        # Total de los pagos mostrados
+        self.historial_total += sum(p.get('monto', 0) for p in pagos)
+        
+        # Texto según el rol
+        if app.es_admin:
+            footer_text = f"Total mostrado: ${self.historial_total:,.0f}\n(Vista de solo lectura)"
+        else:
+            footer_text = f"Total mostrado: ${self.historial_total:,.0f}\n(Click en un pago para eliminarlo)"
+        
+        self.historial_footer = BoxLayout(orientation='vertical', size_hint_y=None, height=dp(100))
+        self.historial_footer.add_widget(MDLabel(
+            text=footer_text,
+            halign="center",
+            size_hint_y=None,
+            height=dp(50)
+        ))
+        if data.get('next_cursor'):
+            self.historial_footer.add_widget(MDRaisedButton(
+                text="VER MÁS",
+                pos_hint={"center_x": 0.5},
+                on_release=lambda x, c=data['next_cursor']: self.show_historial(cursor=c)
+            ))
+        self.content_area.add_widget(self.historial_footer)
+    
+    def mostrar_cargando(self, texto):
+        """Vacía el área de contenido y muestra un indicador de carga."""
+        self.content_area.clear_widgets()
+        self.content_area.add_widget(MDLabel(
+            text=texto,
+            halign="center",
+            size_hint_y=None,
+            height=dp(100)
+        ))
     
     def show_dialog(self, title, text):
         """Muestra un diálogo."""
@@ -343,21 +438,21 @@ class PagosScreen(MDScreen):
     
     def do_delete_pago(self, dialog, pago_id):
         """Elimina el pago."""
-        app = App.get_running_app()
-        success, data = app.api_request('DELETE', f'/api/pagos/{pago_id}')
+        def terminar(success, data):
+            if success:
+                self.show_historial()  # Recargar
+            else:
+                from kivymd.uix.dialog import MDDialog
+                MDDialog(
+                    title="Error",
+                    text=f"No se pudo eliminar el pago: {data}",
+                    buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
+                ).open()
         
         dialog.dismiss()
         
-        if success:
-            self.show_historial()  # Recargar
-            self.show_resumen()  # Actualizar resumen
-        else:
-            from kivymd.uix.dialog import MDDialog
-            MDDialog(
-                title="Error",
-                text=f"No se pudo eliminar el pago: {data}",
-                buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
-            ).open()
+        app = App.get_running_app()
+        app.api_request_async('DELETE', f'/api/pagos/{pago_id}', terminar)
     
     def go_back(self, *args):
         """Regresa a la pantalla anterior."""
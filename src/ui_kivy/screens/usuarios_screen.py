@@ -56,9 +56,16 @@ class UsuariosScreen(MDScreen):
     
     def load_usuarios(self):
         """Carga la lista de usuarios."""
-        app = App.get_running_app()
-        success, data = app.api_request('GET', '/api/usuarios')
+        self.usuarios_list.clear_widgets()
+        self.usuarios_list.add_widget(MDLabel(text="Cargando usuarios...", halign="center"))
         
+        app = App.get_running_app()
+        app.api_request_async(
+            'GET', '/api/usuarios', self.mostrar_usuarios, clave='usuarios', revalidar=True
+        )
+    
+    def mostrar_usuarios(self, success, data):
+        """Muestra la lista de usuarios recibida de la API."""
         self.usuarios_list.clear_widgets()
         
         if success and isinstance(data, list):
@@ -128,28 +135,29 @@ class UsuariosScreen(MDScreen):
             ).open()
             return
         
+        def terminar(success, data):
+            if success:
+                dialog.dismiss()
+                MDDialog(
+                    title="Éxito",
+                    text="Usuario creado correctamente",
+                    buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
+                ).open()
+                self.load_usuarios()
+            else:
+                MDDialog(
+                    title="Error",
+                    text=f"No se pudo crear el usuario: {data}",
+                    buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
+                ).open()
+        
         app = App.get_running_app()
-        success, data = app.api_request('POST', '/api/usuarios', {
+        app.api_request_async('POST', '/api/usuarios', terminar, {
             'username': username,
             'password': password,
             'nombre': nombre,
             'es_admin': es_admin
         })
-        
-        if success:
-            dialog.dismiss()
-            MDDialog(
-                title="Éxito",
-                text="Usuario creado correctamente",
-                buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
-            ).open()
-            self.load_usuarios()
-        else:
-            MDDialog(
-                title="Error",
-                text=f"No se pudo crear el usuario: {data}",
-                buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
-            ).open()
     
     def show_usuario_detail(self, usuario):
         """Muestra detalles y opciones para un usuario."""
@@ -196,24 +204,25 @@ Rol: {'Administrador' if usuario.get('es_admin') else 'Cobrador'}
     
     def do_delete_usuario(self, dialog, usuario_id):
         """Elimina el usuario."""
-        app = App.get_running_app()
-        success, data = app.api_request('DELETE', f'/api/usuarios/{usuario_id}')
+        def terminar(success, data):
+            if success:
+                MDDialog(
+                    title="Éxito",
+                    text="Usuario eliminado correctamente",
+                    buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
+                ).open()
+                self.load_usuarios()
+            else:
+                MDDialog(
+                    title="Error",
+                    text=f"No se pudo eliminar el usuario: {data}",
+                    buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
+                ).open()
         
         dialog.dismiss()
         
-        if success:
-            MDDialog(
-                title="Éxito",
-                text="Usuario eliminado correctamente",
-                buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
-            ).open()
-            self.load_usuarios()
-        else:
-            MDDialog(
-                title="Error",
-                text=f"No se pudo eliminar el usuario: {data}",
-                buttons=[MDFlatButton(text="OK", on_release=lambda x: x.parent.parent.parent.parent.dismiss())]
-            ).open()
+        app = App.get_running_app()
+        app.api_request_async('DELETE', f'/api/usuarios/{usuario_id}', terminar)
     
     def go_back(self, *args):
         """Regresa a la pantalla anterior."""
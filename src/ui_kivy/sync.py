@@ -0,0 +1,236 @@
+"""
+Motor de sincronización de la app.
+
+En cada ronda, en segundo plano:
+1. Envía a la API, por lotes, las operaciones que las pantallas dejaron
+   en la cola de LocalStore
+2. Trae de GET /api/sync solo lo que cambió en el servidor desde la ronda
+   anterior y lo aplica a la copia local
+
+Corre cada SYNC_INTERVALO segundos mientras haya sesión, y también justo
+después de cada registro local. Si no hay conexión, la cola se conserva y
+se reintenta después.
+"""
+
+import os
+import logging
+
+import requests
+from kivy.clock import Clock
+
+logger = logging.getLogger(__name__)
+
+# Segundos entre intentos de sincronización
+SYNC_INTERVALO = float(os.getenv('SYNC_INTERVALO', '30'))
+
+# Operaciones enviadas por ronda (los pagos van en un solo POST /api/pagos/batch)
+SYNC_LOTE = 200
+
+
+class SyncEngine:
+    """
+    Sincroniza la base local con la API.
+
+    Usage:
+        sync = SyncEngine(app, store)
+        sync.iniciar()       # al iniciar sesión
+        sync.sincronizar()   # tras guardar algo localmente
+        sync.detener()       # al cerrar sesión
+    """
+
+    def __init__(self, app, store):
+        """
+        Args:
+            app: Aplicación (da la sesión HTTP, el token y ejecutar_async)
+            store: LocalStore con la cola de operaciones
+        """
+        self.app = app
+        self.store = store
+        self.en_curso = False
+        self._evento = None
+
+    def iniciar(self):
+        """Programa la sincronización periódica y hace una ronda inmediata."""
+        self.detener()
+        self._evento = Clock.schedule_interval(self.sincronizar, SYNC_INTERVALO)
+        self.sincronizar()
+
+    def detener(self):
+        """Deja de sincronizar (la cola se conserva para la próxima sesión)."""
+        if self._evento is not None:
+            self._evento.cancel()
+            self._evento = None
+
+    def sincronizar(self, *args):
+        """Inicia una ronda de sincronización si hay sesión y no hay otra en curso."""
+        if self.en_curso or not self.app.token:
+            return
+
+        self.en_curso = True
+        usuario_id = self.app.usuario_id
+        # Admin no guarda copia local: la suya abarcaría a todos los cobradores
+        traer_cambios = not self.app.es_admin
+        headers = self.app.get_headers()
+        self.app.ejecutar_async(
+            lambda: self._ronda(usuario_id, headers, traer_cambios),
+            self._terminar,
+            clave='sync',
+            mostrar_carga=False
+        )
+
+    def _ronda(self, usuario_id, headers, traer_cambios):
+        """
+        Envía la cola y trae los cambios del servidor (hilo de trabajo).
+
+        Returns:
+            tuple: (success, {'enviadas', 'recibidos'} o mensaje de error)
+        """
+        success, enviadas = self._enviar_lote(usuario_id, headers)
+        if not success:
+            return False, enviadas
+
+        recibidos = 0
+        if traer_cambios:
+            success, recibidos = self._traer_cambios(usuario_id, headers)
+            if not success:
+                return False, recibidos
+
+        return True, {'enviadas': enviadas, 'recibidos': recibidos}
+
+    def _enviar_lote(self, usuario_id, headers):
+        """
+        Envía las operaciones del lote: los pagos juntos y el resto en orden.
+
+        Se detiene en el primer fallo de conexión o del servidor para no
+        alterar el orden de la cola; los rechazos definitivos (4xx) se
+        sacan de la cola para que no bloqueen a las demás.
+
+        Returns:
+            tuple: (success, número de operaciones enviadas o mensaje de error)
+        """
+        operaciones = self.store.pendientes(usuario_id, SYNC_LOTE)
+
+        # Los pagos viajan juntos en un solo POST /api/pagos/batch
+        pagos = [op for op in operaciones if op['tipo'] == 'pago']
+        enviadas = 0
+        if pagos:
+            success, resultado = self._enviar_pagos(pagos, headers)
+            if not success:
+                return False, resultado
+            enviadas += resultado
+
+        for operacion in operaciones:
+            if operacion['tipo'] == 'pago':
+                continue
+            try:
+                response = self.app.http.request(
+                    operacion['metodo'],
+                    operacion['endpoint'],
+                    headers={**headers, 'Idempotency-Key': operacion['clave']},
+                    json=operacion['datos']
+                )
+            except requests.exceptions.RequestException as e:
+                self.store.reintentar_despues(operacion, str(e))
+                return False, "Sin conexión"
+
+            if response.status_code in (200, 201):
+                self.store.confirmar(operacion, response.json())
+                enviadas += 1
+            elif response.status_code == 401:
+                # Token vencido: se reintenta tras el próximo login
+                return False, "Sesión expirada"
+            elif 400 <= response.status_code < 500:
+                try:
+                    detalle = response.json().get('detail', response.text)
+                except ValueError:
+                    detalle = response.text
+                self.store.rechazar(operacion, str(detalle))
+            else:
+                self.store.reintentar_despues(operacion, f"HTTP {response.status_code}")
+                return False, f"Error del servidor ({response.status_code})"
+
+        return True, enviadas
+
+    def _enviar_pagos(self, pagos, headers):
+        """
+        Envía los pagos en cola en un solo lote.
+
+        El servidor responde el resultado de cada pago: los aceptados se
+        confirman y los rechazados (ej: cliente eliminado) salen de la cola.
+
+        Returns:
+            tuple: (success, número de pagos registrados o mensaje de error)
+        """
+        try:
+            response = self.app.http.request(
+                'POST', '/api/pagos/batch',
+                headers=headers,
+                json={'pagos': [
+                    {**op['datos'], 'idempotency_key': op['clave']} for op in pagos
+                ]}
+            )
+        except requests.exceptions.RequestException as e:
+            for operacion in pagos:
+                self.store.reintentar_despues(operacion, str(e))
+            return False, "Sin conexión"
+
+        if response.status_code == 401:
+            return False, "Sesión expirada"
+        if response.status_code != 200:
+            for operacion in pagos:
+                self.store.reintentar_despues(operacion, f"HTTP {response.status_code}")
+            return False, f"Error del servidor ({response.status_code})"
+
+        registrados = 0
+        for operacion, resultado in zip(pagos, response.json()['resultados']):
+            if resultado['success']:
+                self.store.confirmar(operacion, resultado['pago'])
+                registrados += 1
+            else:
+                self.store.rechazar(operacion, resultado['error'])
+        return True, registrados
+
+    def _traer_cambios(self, usuario_id, headers):
+        """
+        Pide a la API lo que cambió desde el último cursor y lo aplica.
+
+        Returns:
+            tuple: (success, número de registros recibidos o mensaje de error)
+        """
+        cursor = self.store.obtener_cursor(usuario_id)
+        try:
+            response = self.app.http.request(
+                'GET', '/api/sync',
+                headers=headers,
+                params={'since': cursor} if cursor else None
+            )
+        except requests.exceptions.RequestException:
+            return False, "Sin conexión"
+
+        if response.status_code != 200:
+            return False, f"Error obteniendo cambios ({response.status_code})"
+
+        return True, self.store.aplicar_cambios(usuario_id, response.json())
+
+    def _terminar(self, success, resultado):
+        """Registra el resultado de la ronda (hilo de la UI)."""
+        self.en_curso = False
+        
+        # Lo que el servidor no aceptará nunca se avisa en vez de perderse
+        rechazadas = self.store.rechazadas(self.app.usuario_id)
+        if rechazadas:
+            self.app.avisar_rechazadas(rechazadas)
+        
+        if success:
+            if resultado['enviadas'] or resultado['recibidos']:
+                self.app.cache.limpiar()
+                self.app.marcar_datos_cambiados()
+                logger.info(
+                    f"🔄 Sincronización: {resultado['enviadas']} operaciones enviadas, "
+                    f"{resultado['recibidos']} cambios recibidos"
+                )
+            # Si el lote estaba lleno puede quedar más en cola
+            if resultado['enviadas'] >= SYNC_LOTE:
+                Clock.schedule_once(self.sincronizar)
+        else:
+            logger.warning(f"⚠️ Sincronización pospuesta: {resultado}")
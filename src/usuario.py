@@ -7,10 +7,13 @@ usar psycopg2 y el pool de conexiones.
 """
 
 import bcrypt
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Dict, Optional, List
 from psycopg2 import IntegrityError
 
+from src.config import SecurityConfig
+from src.db.resumen_diario import HISTORIAL_SQL
+
 class Usuario:
     """
     Clase para gestionar todas las operaciones relacionadas con los usuarios (cobradores).
@@ -44,7 +47,7 @@ class Usuario:
         Returns:
             bool: True si el usuario se creó exitosamente, False si el username ya existe
         """
-        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(SecurityConfig.BCRYPT_ROUNDS))
         try:
             self.db.execute('''
                 INSERT INTO usuarios (username, password, nombre, es_admin)
@@ -99,60 +102,32 @@ class Usuario:
         Returns:
             Dict con base, cobrado, prestado, gastos, etc.
         """
-        fecha_actual = datetime.now().date()
-        
-        # Obtener base semanal
-        base_result = self.db.fetch_one('''
-            SELECT monto FROM bases_semanales 
-            WHERE usuario_id = %s AND fecha = %s
-        ''', (usuario_id, fecha_actual))
-        base = float(base_result['monto']) if base_result else 0.0
-
-        # Obtener total cobrado
-        cobrado_result = self.db.fetch_one('''
-            SELECT COALESCE(SUM(p.monto), 0) as total
-            FROM pagos p
-            JOIN clientes c ON p.cliente_id = c.id
-            WHERE c.usuario_id = %s AND p.fecha = %s
-        ''', (usuario_id, fecha_actual))
-        cobrado = float(cobrado_result['total']) if cobrado_result else 0.0
-
-        # Obtener total prestado y seguros
-        prestado_result = self.db.fetch_one('''
-            SELECT COALESCE(SUM(monto_prestado), 0) as prestado,
-                   COALESCE(SUM(seguro), 0) as seguros
-            FROM clientes
-            WHERE usuario_id = %s AND fecha_prestamo = %s
-        ''', (usuario_id, fecha_actual))
-        prestado = float(prestado_result['prestado']) if prestado_result else 0.0
-        seguros = float(prestado_result['seguros']) if prestado_result else 0.0
-
-        # Obtener gastos
-        gastos_result = self.db.fetch_one('''
-            SELECT COALESCE(SUM(monto), 0) as total
-            FROM gastos_semanales
-            WHERE usuario_id = %s AND fecha = %s
-        ''', (usuario_id, fecha_actual))
-        gastos = float(gastos_result['total']) if gastos_result else 0.0
-
-        # Obtener pagos digitales
-        digital_result = self.db.fetch_one('''
-            SELECT COALESCE(SUM(p.monto), 0) as total
-            FROM pagos p
-            JOIN clientes c ON p.cliente_id = c.id
-            WHERE c.usuario_id = %s AND p.fecha = %s AND p.tipo_pago = 'digital'
-        ''', (usuario_id, fecha_actual))
-        digital = float(digital_result['total']) if digital_result else 0.0
+        with self.db.transaction():
+            fecha_actual = datetime.now().date()
+            
+            # Todo sale de la fila del día en el resumen diario
+            resumen = self.db.fetch_one('''
+                SELECT base, efectivo, digital, prestado, seguros, gastos
+                FROM resumen_diario
+                WHERE usuario_id = %s AND fecha = %s
+            ''', (usuario_id, fecha_actual))
+            base = float(resumen['base']) if resumen else 0.0
+            efectivo = float(resumen['efectivo']) if resumen else 0.0
+            digital = float(resumen['digital']) if resumen else 0.0
+            cobrado = efectivo + digital
+            prestado = float(resumen['prestado']) if resumen else 0.0
+            seguros = float(resumen['seguros']) if resumen else 0.0
+            gastos = float(resumen['gastos']) if resumen else 0.0
 
-        return {
-            'base': base,
-            'cobrado': cobrado,
-            'prestado': prestado,
-            'seguros': seguros,
-            'gastos': gastos,
-            'digital': digital,
-            'efectivo': cobrado - digital
-        }
+            return {
+                'base': base,
+                'cobrado': cobrado,
+                'prestado': prestado,
+                'seguros': seguros,
+                'gastos': gastos,
+                'digital': digital,
+                'efectivo': efectivo
+            }
 
     def obtener_usuario_por_id(self, usuario_id: int) -> Optional[Dict]:
         """
@@ -185,25 +160,26 @@ class Usuario:
         Returns:
             bool: True si el usuario fue eliminado, False si no se pudo
         """
-        # Verificar si quien ejecuta es administrador
-        admin = self.db.fetch_one(
-            'SELECT es_admin FROM usuarios WHERE id = %s',
-            (admin_id,)
-        )
-        if not admin or not admin['es_admin']:
-            return False
+        with self.db.transaction():
+            # Verificar si quien ejecuta es administrador
+            admin = self.db.fetch_one(
+                'SELECT es_admin FROM usuarios WHERE id = %s',
+                (admin_id,)
+            )
+            if not admin or not admin['es_admin']:
+                return False
 
-        # Verificar que no se intente eliminar un admin
-        usuario = self.db.fetch_one(
-            'SELECT es_admin FROM usuarios WHERE id = %s',
-            (usuario_id,)
-        )
-        if not usuario or usuario['es_admin']:
-            return False
-            
-        # Eliminar el usuario
-        self.db.execute('DELETE FROM usuarios WHERE id = %s', (usuario_id,))
-        return True
+            # Verificar que no se intente eliminar un admin
+            usuario = self.db.fetch_one(
+                'SELECT es_admin FROM usuarios WHERE id = %s',
+                (usuario_id,)
+            )
+            if not usuario or usuario['es_admin']:
+                return False
+                
+            # Eliminar el usuario
+            self.db.execute('DELETE FROM usuarios WHERE id = %s', (usuario_id,))
+            return True
 
     def es_administrador(self, usuario_id: int) -> bool:
         """
@@ -232,80 +208,79 @@ class Usuario:
         Returns:
             Dict con la información de actividad
         """
-        if fecha is None:
-            fecha = datetime.now().date()
+        with self.db.transaction():
+            if fecha is None:
+                fecha = datetime.now().date()
 
-        # Obtener información básica del cobrador
-        usuario = self.db.fetch_one('''
-            SELECT nombre, username, es_admin 
-            FROM usuarios 
-            WHERE id = %s
-        ''', (usuario_id,))
-        
-        # Contar clientes activos
-        clientes_result = self.db.fetch_one('''
-            SELECT COUNT(*) as total
-            FROM clientes 
-            WHERE usuario_id = %s AND estado = 'activo'
-        ''', (usuario_id,))
-        clientes_activos = clientes_result['total'] if clientes_result else 0
-
-        # Obtener total prestado hoy
-        prestado_result = self.db.fetch_one('''
-            SELECT COALESCE(SUM(monto_prestado), 0) as total
-            FROM clientes
-            WHERE usuario_id = %s AND fecha_prestamo = %s
-        ''', (usuario_id, fecha))
-        prestado_hoy = float(prestado_result['total']) if prestado_result else 0.0
-
-        # Obtener total cobrado hoy
-        cobrado_result = self.db.fetch_one('''
-            SELECT COALESCE(SUM(p.monto), 0) as total
-            FROM pagos p
-            JOIN clientes c ON p.cliente_id = c.id
-            WHERE c.usuario_id = %s AND p.fecha = %s
-        ''', (usuario_id, fecha))
-        cobrado_hoy = float(cobrado_result['total']) if cobrado_result else 0.0
+            # Obtener información básica del cobrador
+            usuario = self.db.fetch_one('''
+                SELECT nombre, username, es_admin 
+                FROM usuarios 
+                WHERE id = %s
+            ''', (usuario_id,))
+            
+            # Contar clientes activos
+            clientes_result = self.db.fetch_one('''
+                SELECT COUNT(*) as total
+                FROM clientes 
+                WHERE usuario_id = %s AND estado = 'activo'
+            ''', (usuario_id,))
+            clientes_activos = clientes_result['total'] if clientes_result else 0
 
-        # Obtener gastos de hoy
-        gastos_result = self.db.fetch_one('''
-            SELECT COALESCE(SUM(monto), 0) as total
-            FROM gastos_semanales
-            WHERE usuario_id = %s AND fecha = %s
-        ''', (usuario_id, fecha))
-        gastos_hoy = float(gastos_result['total']) if gastos_result else 0.0
+            # Prestado, cobrado y gastos del día desde el resumen diario
+            resumen = self.db.fetch_one('''
+                SELECT prestado, efectivo + digital AS cobrado, gastos
+                FROM resumen_diario
+                WHERE usuario_id = %s AND fecha = %s
+            ''', (usuario_id, fecha))
+            prestado_hoy = float(resumen['prestado']) if resumen else 0.0
+            cobrado_hoy = float(resumen['cobrado']) if resumen else 0.0
+            gastos_hoy = float(resumen['gastos']) if resumen else 0.0
 
-        return {
-            'nombre': usuario['nombre'],
-            'username': usuario['username'],
-            'es_admin': usuario['es_admin'],
-            'clientes_activos': clientes_activos,
-            'prestado_hoy': prestado_hoy,
-            'cobrado_hoy': cobrado_hoy,
-            'gastos_hoy': gastos_hoy
-        }
+            return {
+                'nombre': usuario['nombre'],
+                'username': usuario['username'],
+                'es_admin': usuario['es_admin'],
+                'clientes_activos': clientes_activos,
+                'prestado_hoy': prestado_hoy,
+                'cobrado_hoy': cobrado_hoy,
+                'gastos_hoy': gastos_hoy
+            }
 
-    def obtener_historial_cobrador(self, usuario_id: int, dias: int = 7) -> List[Dict]:
+    def obtener_historial_cobrador(self, usuario_id: int, dias: int = 7,
+                                   hasta: Optional[date] = None) -> List[Dict]:
         """
         Obtiene el historial de actividades de un cobrador.
         
+        Una sola consulta genera la serie de días y la cruza con el
+        resumen diario; los días sin movimiento aparecen en cero.
+        
         Args:
             usuario_id: ID del cobrador
             dias: Número de días hacia atrás para obtener el historial
+            hasta: Último día del historial como date, sin hora (por defecto, hoy)
             
         Returns:
-            List[Dict]: Lista de actividades diarias
+            List[Dict]: Lista de actividades diarias (la más reciente primero)
         """
-        historial = []
-        fecha_actual = datetime.now().date()
+        hasta = hasta or datetime.now().date()
+        desde = hasta - timedelta(days=dias - 1)
         
-        for i in range(dias):
-            fecha = fecha_actual - timedelta(days=i)
-            actividad = self.obtener_actividad_cobrador(usuario_id, fecha)
-            actividad['fecha'] = fecha.isoformat()
-            historial.append(actividad)
-            
-        return historial
+        filas = self.db.fetch_all(HISTORIAL_SQL, (usuario_id, desde, hasta, usuario_id))
+        
+        return [
+            {
+                'fecha': fila['fecha'].isoformat(),
+                'nombre': fila['nombre'],
+                'username': fila['username'],
+                'es_admin': fila['es_admin'],
+                'clientes_activos': fila['clientes_activos'],
+                'prestado_hoy': float(fila['prestado']),
+                'cobrado_hoy': float(fila['cobrado']),
+                'gastos_hoy': float(fila['gastos'])
+            }
+            for fila in filas
+        ]
 
     def cambiar_password(self, usuario_id: int, password_actual: str, password_nueva: str) -> bool:
         """
@@ -319,25 +294,26 @@ class Usuario:
         Returns:
             bool: True si se cambió correctamente, False si la contraseña actual es incorrecta
         """
-        # Validar contraseña actual
-        usuario = self.db.fetch_one(
-            'SELECT password FROM usuarios WHERE id = %s',
-            (usuario_id,)
-        )
-        
-        if not usuario:
-            return False
+        with self.db.transaction():
+            # Validar contraseña actual
+            usuario = self.db.fetch_one(
+                'SELECT password FROM usuarios WHERE id = %s',
+                (usuario_id,)
+            )
             
-        if not bcrypt.checkpw(password_actual.encode('utf-8'), usuario['password'].encode('utf-8')):
-            return False
-        
-        # Hash de la nueva contraseña
-        new_hashed = bcrypt.hashpw(password_nueva.encode('utf-8'), bcrypt.gensalt())
-        
-        # Actualizar contraseña
-        self.db.execute(
-            'UPDATE usuarios SET password = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s',
-            (new_hashed.decode('utf-8'), usuario_id)
-        )
-        
-        return True
+            if not usuario:
+                return False
+                
+            if not bcrypt.checkpw(password_actual.encode('utf-8'), usuario['password'].encode('utf-8')):
+                return False
+            
+            # Hash de la nueva contraseña
+            new_hashed = bcrypt.hashpw(password_nueva.encode('utf-8'), bcrypt.gensalt(SecurityConfig.BCRYPT_ROUNDS))
+            
+            # Actualizar contraseña
+            self.db.execute(
+                'UPDATE usuarios SET password = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s',
+                (new_hashed.decode('utf-8'), usuario_id)
+            )
+            
+            return True
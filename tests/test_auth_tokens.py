@@ -0,0 +1,118 @@
+"""
+Pruebas de la caché de tokens verificados (src/api/middleware/auth.py).
+"""
+
+import asyncio
+from collections import OrderedDict
+from datetime import timedelta
+
+import pytest
+
+# src.api importa el servidor completo: se necesitan las dependencias de la API
+for modulo in ('fastapi', 'jose', 'bcrypt', 'psycopg', 'psycopg_pool', 'psycopg2'):
+    pytest.importorskip(modulo)
+
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from src.api.middleware import auth
+from src.api.middleware.auth import create_access_token, estadisticas_tokens
+
+
+@pytest.fixture(autouse=True)
+def cache_vacia(monkeypatch):
+    monkeypatch.setattr(auth, '_tokens_verificados', OrderedDict())
+    monkeypatch.setattr(auth, '_cache_aciertos', 0)
+    monkeypatch.setattr(auth, '_cache_fallos', 0)
+
+
+@pytest.fixture
+def decodificaciones(monkeypatch):
+    """Cuenta las veces que se decodifica y verifica un JWT."""
+    llamadas = []
+    decode = auth.jwt.decode
+
+    def contar(*args, **kwargs):
+        llamadas.append(args[0])
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth.jwt, 'decode', contar)
+    return llamadas
+
+
+def usuario_actual(token):
+    credenciales = HTTPAuthorizationCredentials(scheme='Bearer', credentials=token)
+    return asyncio.run(auth.get_current_user(credenciales))
+
+
+def token_de(usuario_id, **kwargs):
+    return create_access_token(
+        {'usuario_id': usuario_id, 'username': f'u{usuario_id}', 'es_admin': False}, **kwargs
+    )
+
+
+def test_segundo_uso_no_decodifica(decodificaciones):
+    token = token_de(7)
+
+    primero = usuario_actual(token)
+    segundo = usuario_actual(token)
+
+    assert primero == segundo == {'usuario_id': 7, 'username': 'u7', 'es_admin': False}
+    assert decodificaciones == [token]
+    assert estadisticas_tokens()['aciertos'] == 1
+    assert estadisticas_tokens()['fallos'] == 1
+    assert estadisticas_tokens()['tasa_aciertos'] == 0.5
+
+
+def test_la_ruta_no_altera_la_cache():
+    token = token_de(7)
+
+    usuario_actual(token)['es_admin'] = True
+
+    assert usuario_actual(token)['es_admin'] is False
+
+
+def test_entrada_vence_con_el_token(decodificaciones, monkeypatch):
+    token = token_de(7, expires_delta=timedelta(minutes=5))
+    usuario_actual(token)
+    exp = auth._tokens_verificados[token][1]
+
+    monkeypatch.setattr(auth.time, 'time', lambda: exp)
+    usuario_actual(token)
+
+    # Vencida en la caché: se vuelve a verificar (jose usa el reloj real)
+    assert decodificaciones == [token, token]
+    assert estadisticas_tokens()['aciertos'] == 0
+
+
+def test_token_vencido_o_invalido_no_se_guarda():
+    for token in (token_de(7, expires_delta=timedelta(seconds=-10)), 'no.es.jwt'):
+        with pytest.raises(HTTPException) as error:
+            usuario_actual(token)
+        assert error.value.status_code == 401
+
+    assert estadisticas_tokens()['entradas'] == 0
+
+
+def test_token_sin_usuario_se_rechaza():
+    token = create_access_token({'username': 'sin_id'})
+
+    with pytest.raises(HTTPException) as error:
+        usuario_actual(token)
+
+    assert error.value.status_code == 401
+    assert estadisticas_tokens()['entradas'] == 0
+
+
+def test_descarta_el_menos_usado(monkeypatch, decodificaciones):
+    monkeypatch.setattr(auth, 'TOKEN_CACHE_MAX', 2)
+    uno, dos, tres = token_de(1), token_de(2), token_de(3)
+
+    usuario_actual(uno)
+    usuario_actual(dos)
+    usuario_actual(uno)
+    usuario_actual(tres)
+
+    assert list(auth._tokens_verificados) == [uno, tres]
+    usuario_actual(dos)
+    assert decodificaciones == [uno, dos, tres, dos]
@@ -0,0 +1,81 @@
+"""
+Pruebas del índice local de clientes (src/ui_kivy/busqueda.py).
+"""
+
+import pytest
+
+pytest.importorskip('kivy')
+
+from src.ui_kivy.busqueda import IndiceClientes, normalizar
+
+CLIENTES = [
+    {'id': 1, 'nombre': 'José Pérez', 'cedula': '1.020.304', 'telefono': '300 111 2233'},
+    {'id': 2, 'nombre': 'Josefina Peña Álvarez', 'cedula': '998877', 'telefono': None},
+    {'id': 3, 'nombre': 'María Gómez', 'cedula': None, 'telefono': '(310) 555-0000'},
+    {'id': 4, 'nombre': 'Pedro Josa', 'cedula': '445566', 'telefono': '3001112233'},
+]
+
+
+def ids(clientes):
+    return [cliente['id'] for cliente in clientes]
+
+
+def test_normalizar_quita_tildes_y_mayusculas():
+    assert normalizar('  Peña ÁLVAREZ ') == 'pena alvarez'
+    assert normalizar(None) == ''
+
+
+def test_busca_por_prefijo_de_cada_palabra():
+    indice = IndiceClientes(CLIENTES)
+
+    assert ids(indice.buscar('jose')) == [1, 2]
+    assert ids(indice.buscar('jos')) == [1, 2, 4]
+    assert ids(indice.buscar('alv')) == [2]
+
+
+def test_todas_las_palabras_deben_coincidir():
+    indice = IndiceClientes(CLIENTES)
+
+    assert ids(indice.buscar('jose pe')) == [1, 2]
+    assert ids(indice.buscar('pe jose')) == [1, 2]
+    assert ids(indice.buscar('jose gomez')) == []
+
+
+def test_ignora_tildes_del_termino():
+    indice = IndiceClientes(CLIENTES)
+
+    assert ids(indice.buscar('PÉREZ')) == [1]
+    assert ids(indice.buscar('maria')) == [3]
+
+
+def test_busca_cedula_y_telefono_sin_separadores():
+    indice = IndiceClientes(CLIENTES)
+
+    assert ids(indice.buscar('1020')) == [1]
+    assert ids(indice.buscar('300111')) == [1, 4]
+    assert ids(indice.buscar('310555')) == [3]
+
+
+def test_separadores_del_termino_numerico_se_ignoran():
+    indice = IndiceClientes(CLIENTES)
+
+    assert ids(indice.buscar('1.020.3')) == [1]
+    assert ids(indice.buscar('300-111')) == [1, 4]
+    assert ids(indice.buscar('(310) 555-0')) == []
+    assert ids(indice.buscar('(310)555-0')) == [3]
+    assert ids(indice.buscar('jose -')) == [1, 2]
+
+
+def test_resultados_ordenados_por_nombre_y_limitados():
+    indice = IndiceClientes(CLIENTES)
+
+    assert ids(indice.buscar('jos', limit=2)) == [1, 2]
+    assert len(indice) == 4
+
+
+def test_termino_vacio_no_encuentra_nada():
+    indice = IndiceClientes(CLIENTES)
+
+    assert indice.buscar('') == []
+    assert indice.buscar('   ') == []
+    assert IndiceClientes([]).buscar('jose') == []
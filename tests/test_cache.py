@@ -0,0 +1,113 @@
+"""
+Pruebas de la caché de respuestas de la app (src/ui_kivy/cache.py).
+"""
+
+import pytest
+
+from src.ui_kivy import cache
+from src.ui_kivy.cache import RespuestaCache, ttl_endpoint
+
+
+class Reloj:
+    """Reemplazo de time.monotonic que avanza solo cuando se le pide."""
+
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self):
+        return self.ahora
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(cache.time, 'monotonic', reloj)
+    return reloj
+
+
+def test_ttl_gana_el_prefijo_mas_largo():
+    assert ttl_endpoint('/api/pagos') == cache.CACHE_TTL['/api/pagos']
+    assert ttl_endpoint('/api/pagos/resumen') == cache.CACHE_TTL['/api/pagos/resumen']
+    assert ttl_endpoint('/api/pagos/cliente/3') == cache.CACHE_TTL['/api/pagos']
+
+
+def test_ttl_sin_cache():
+    assert ttl_endpoint('/api/sync') == 0
+    # Un prefijo solo cuenta hasta una barra
+    assert ttl_endpoint('/api/pagosx') == 0
+
+
+def test_vigente_y_vencida(reloj):
+    respuestas = RespuestaCache()
+    respuestas.guardar('/api/usuarios', None, ['ana'])
+
+    assert respuestas.obtener('/api/usuarios') == (['ana'], True)
+
+    reloj.ahora += cache.CACHE_TTL['/api/usuarios']
+    # Vencida: se sigue entregando para mostrarla mientras se revalida
+    assert respuestas.obtener('/api/usuarios') == (['ana'], False)
+
+
+def test_parametros_distinguen_respuestas(reloj):
+    respuestas = RespuestaCache()
+    respuestas.guardar('/api/clientes', {'estado': 'activo', 'limit': 50}, 'activos')
+
+    assert respuestas.obtener('/api/clientes', {'limit': '50', 'estado': 'activo'}) == ('activos', True)
+    assert respuestas.obtener('/api/clientes', {'estado': 'pagado', 'limit': 50}) is None
+    assert respuestas.obtener('/api/clientes') is None
+
+
+def test_endpoint_sin_ttl_no_se_guarda(reloj):
+    respuestas = RespuestaCache()
+    respuestas.guardar('/api/sync', None, {'cambios': []})
+
+    assert respuestas.obtener('/api/sync') is None
+
+
+def test_descarta_la_menos_usada(reloj):
+    respuestas = RespuestaCache(max_entradas=2)
+    respuestas.guardar('/api/clientes/1', None, 1)
+    respuestas.guardar('/api/clientes/2', None, 2)
+    respuestas.obtener('/api/clientes/1')
+    respuestas.guardar('/api/clientes/3', None, 3)
+
+    assert respuestas.obtener('/api/clientes/2') is None
+    assert respuestas.obtener('/api/clientes/1') == (1, True)
+    assert respuestas.obtener('/api/clientes/3') == (3, True)
+
+
+def test_invalidar_pago(reloj):
+    respuestas = RespuestaCache()
+    for endpoint in ('/api/pagos', '/api/clientes', '/api/dashboard',
+                     '/api/usuarios/cobradores/resumen', '/api/usuarios/5/historial',
+                     '/api/usuarios'):
+        respuestas.guardar(endpoint, None, endpoint)
+
+    respuestas.invalidar('/api/pagos/15')
+
+    assert respuestas.obtener('/api/pagos') is None
+    assert respuestas.obtener('/api/clientes') is None
+    assert respuestas.obtener('/api/dashboard') is None
+    assert respuestas.obtener('/api/usuarios/cobradores/resumen') is None
+    assert respuestas.obtener('/api/usuarios/5/historial') is None
+    assert respuestas.obtener('/api/usuarios') == ('/api/usuarios', True)
+
+
+def test_invalidar_gasto_borra_resumen_de_pagos(reloj):
+    respuestas = RespuestaCache()
+    respuestas.guardar('/api/pagos/resumen', None, 'resumen')
+    respuestas.guardar('/api/clientes', None, 'clientes')
+
+    respuestas.invalidar('/api/usuarios/gasto')
+
+    assert respuestas.obtener('/api/pagos/resumen') is None
+    assert respuestas.obtener('/api/clientes') == ('clientes', True)
+
+
+def test_invalidar_recurso_desconocido_limpia_todo(reloj):
+    respuestas = RespuestaCache()
+    respuestas.guardar('/api/clientes', None, 'clientes')
+
+    respuestas.invalidar('/api/otro/1')
+
+    assert respuestas.obtener('/api/clientes') is None
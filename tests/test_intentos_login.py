@@ -0,0 +1,116 @@
+"""
+Pruebas del bloqueo de login en memoria (src/api/intentos_login.py).
+"""
+
+import asyncio
+
+import pytest
+
+# src.api importa el servidor completo: se necesitan las dependencias de la API
+for modulo in ('fastapi', 'jose', 'bcrypt', 'psycopg', 'psycopg_pool', 'psycopg2'):
+    pytest.importorskip(modulo)
+
+from fastapi import HTTPException
+
+from src.api import intentos_login
+from src.api.intentos_login import IntentosMemoria, claves_intento
+from src.config import SecurityConfig
+
+
+class Reloj:
+    """Reemplazo de time.monotonic que avanza solo cuando se le pide."""
+
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self):
+        return self.ahora
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(intentos_login.time, 'monotonic', reloj)
+    monkeypatch.setattr(SecurityConfig, 'MAX_LOGIN_ATTEMPTS', 3)
+    monkeypatch.setattr(SecurityConfig, 'MAX_LOGIN_ATTEMPTS_IP', 5)
+    monkeypatch.setattr(SecurityConfig, 'LOCKOUT_DURATION', 300)
+    return reloj
+
+
+def fallar(intentos, claves, veces, reloj, cada=1.0):
+    for _ in range(veces):
+        asyncio.run(intentos.registrar_fallo(claves))
+        reloj.ahora += cada
+
+
+def test_claves_por_usuario_e_ip(reloj):
+    assert claves_intento(' Ana ', '10.0.0.1') == [('usuario:ana', 3), ('ip:10.0.0.1', 5)]
+
+
+def test_bloquea_al_llegar_al_maximo(reloj):
+    intentos = IntentosMemoria()
+    claves = claves_intento('ana', '10.0.0.1')
+
+    fallar(intentos, claves, 2, reloj)
+    assert asyncio.run(intentos.bloqueo(claves)) == 0
+
+    fallar(intentos, claves, 1, reloj)
+    # El primer fallo fue en 1000 y ahora es 1003: faltan 297 segundos
+    assert asyncio.run(intentos.bloqueo(claves)) == pytest.approx(297)
+
+
+def test_ventana_deslizante(reloj):
+    intentos = IntentosMemoria()
+    claves = claves_intento('ana', '10.0.0.1')
+    fallar(intentos, claves, 3, reloj, cada=100)
+
+    # Fallos en 1000, 1100 y 1200: al salir el de 1000 se desbloquea
+    reloj.ahora = 1299
+    assert asyncio.run(intentos.bloqueo(claves)) == pytest.approx(1)
+    reloj.ahora = 1300
+    assert asyncio.run(intentos.bloqueo(claves)) == 0
+
+
+def test_ip_bloquea_aunque_cambie_el_usuario(reloj):
+    intentos = IntentosMemoria()
+    for i in range(5):
+        fallar(intentos, claves_intento(f'usuario{i}', '10.0.0.1'), 1, reloj)
+
+    assert asyncio.run(intentos.bloqueo(claves_intento('otro', '10.0.0.1'))) > 0
+    assert asyncio.run(intentos.bloqueo(claves_intento('otro', '10.0.0.2'))) == 0
+
+
+def test_limpiar_olvida_solo_la_clave(reloj):
+    intentos = IntentosMemoria()
+    claves = claves_intento('ana', '10.0.0.1')
+    fallar(intentos, claves, 3, reloj)
+
+    asyncio.run(intentos.limpiar('usuario:ana'))
+
+    assert asyncio.run(intentos.bloqueo(claves)) == 0
+    assert list(intentos._fallos['ip:10.0.0.1']) == [1000.0, 1001.0, 1002.0]
+
+
+def test_memoria_acotada(reloj):
+    intentos = IntentosMemoria(max_claves=4)
+    for i in range(5):
+        fallar(intentos, claves_intento(f'usuario{i}', f'10.0.0.{i}'), 1, reloj)
+
+    assert len(intentos._fallos) == 4
+    assert 'usuario:usuario4' in intentos._fallos
+    assert 'usuario:usuario0' not in intentos._fallos
+
+
+def test_verificar_bloqueo_responde_429(reloj, monkeypatch):
+    intentos = IntentosMemoria()
+    monkeypatch.setattr(intentos_login, 'intentos', intentos)
+    claves = claves_intento('ana', '10.0.0.1')
+
+    asyncio.run(intentos_login.verificar_bloqueo(claves))
+    fallar(intentos, claves, 3, reloj, cada=0)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(intentos_login.verificar_bloqueo(claves))
+
+    assert error.value.status_code == 429
+    assert error.value.headers['Retry-After'] == '301'
@@ -0,0 +1,53 @@
+"""
+Pruebas de la paginación por cursor (src/api/pagination.py).
+"""
+
+from datetime import date
+
+import pytest
+
+# src.api importa el servidor completo: se necesitan las dependencias de la API
+for modulo in ('fastapi', 'jose', 'bcrypt', 'psycopg', 'psycopg_pool', 'psycopg2'):
+    pytest.importorskip(modulo)
+
+from fastapi import HTTPException
+
+from src.api.pagination import build_page, decode_cursor, encode_cursor
+
+
+def test_cursor_ida_y_vuelta():
+    cursor = encode_cursor(date(2024, 3, 15), 987)
+
+    assert decode_cursor(cursor) == (date(2024, 3, 15), 987)
+
+
+def test_cursor_seguro_para_urls():
+    cursor = encode_cursor(date(2024, 12, 31), 2 ** 40)
+
+    assert all(c.isalnum() or c in '-_=' for c in cursor)
+    assert decode_cursor(cursor) == (date(2024, 12, 31), 2 ** 40)
+
+
+@pytest.mark.parametrize('cursor', ['', 'no-es-base64!', 'MjAyNC0wMy0xNQ==', 'eHx5'])
+def test_cursor_invalido_responde_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+
+    assert error.value.status_code == 400
+
+
+def test_build_page_con_pagina_siguiente():
+    filas = [{'id': i, 'fecha': date(2024, 1, 10 - i)} for i in range(1, 5)]
+
+    pagina = build_page(filas, 3, 'fecha')
+
+    assert pagina['items'] == filas[:3]
+    assert decode_cursor(pagina['next_cursor']) == (date(2024, 1, 7), 3)
+
+
+def test_build_page_ultima_pagina():
+    filas = [{'id': 1, 'fecha': date(2024, 1, 1)}]
+
+    pagina = build_page(filas, 3, 'fecha')
+
+    assert pagina == {'items': filas, 'next_cursor': None}